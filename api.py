@@ -0,0 +1,9 @@
+"""Run the GreenFlow JSON API: ``python api.py`` (or ``flask --app api run``)."""
+import os
+
+from greenflow.api import create_app
+
+app = create_app()
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), threaded=True)
@@ -1,7 +1,8 @@
 import streamlit as st
-import time
-from datetime import datetime, timedelta
-import random
+
+from greenflow import metrics, views
+from greenflow.core import get_metrics_server, get_storage
+from greenflow.storage import DEMO_EMAIL
 
 # ==========================================
 # 1. CONFIGURATION (MUST BE FIRST)
@@ -13,41 +14,19 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ==========================================
-# 2. DATA & ASSETS
-# ==========================================
-PLANTS_DB = {
-    "cherry_tomatoes": {"name": "Cherry Tomatoes", "days_to_harvest": 60, "icon": "🍅", "ph": "5.8-6.5", "tips": "Needs support stakes."},
-    "spinach": {"name": "Spinach", "days_to_harvest": 40, "icon": "🥬", "ph": "6.0-7.0", "tips": "Harvest outer leaves first."},
-    "lettuce": {"name": "Lettuce", "days_to_harvest": 30, "icon": "🥗", "ph": "5.5-6.5", "tips": "Keep water temp below 24°C."},
-    "strawberry": {"name": "Strawberry", "days_to_harvest": 90, "icon": "🍓", "ph": "5.5-6.5", "tips": "Hand pollination required."},
-    "basil": {"name": "Basil", "days_to_harvest": 25, "icon": "🌿", "ph": "5.5-6.5", "tips": "Harvest to prevent flowering."}
-}
-
-PACKAGES = {
-    'starter': {'name': 'Starter Kit', 'price': 9999, 'plants_count': 4, 'area': '2x2 ft', 'desc': 'Perfect for beginners. Includes pump, reservoir, and nutrients.'},
-    'professional': {'name': 'Professional Setup', 'price': 24999, 'plants_count': 12, 'area': '4x4 ft', 'desc': 'High-yield system with automated lighting control.'},
-    'commercial': {'name': 'Commercial System', 'price': 59999, 'plants_count': 30, 'area': '8x8 ft', 'desc': 'Full-scale farm setup with IoT monitoring capabilities.'}
-}
-
-BOT_RESPONSES = {
-    'hello': 'Hello! I am the GreenFlow AI. How is your garden growing?',
-    'ph': 'Ideal pH is usually 5.8-6.5. If too high, use pH Down.',
-    'water': 'Maintain pH between 5.5-6.5. Change water every 3-4 weeks.',
-    'cost': 'Starter kits begin at ₹9,999. Check the Store tab.',
-    'default': 'I can help with pH, lighting, or pests. What do you need?'
-}
+# Counted and timed per process; scrape http://127.0.0.1:9108/metrics.
+get_metrics_server()
+metrics.SCRIPT_RUNS.inc(app="app2")
 
-def get_bot_response(user_input):
-    user_input = user_input.lower()
-    for key, response in BOT_RESPONSES.items():
-        if key in user_input: return response
-    return BOT_RESPONSES['default']
+# Catalogs and pages are shared with app.py: see greenflow/data/catalog.json
+# and greenflow/views/. The overview, store and settings keep this console's
+# own layouts (greenflow/views/console_*.py).
 
 # ==========================================
-# 3. CSS STYLING
+# 2. CSS STYLING
 # ==========================================
-st.markdown("""
+with metrics.timer(metrics.STEP_SECONDS, step="css"):
+    st.markdown("""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;700&display=swap');
 
@@ -124,18 +103,16 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # ==========================================
-# 4. SESSION STATE
+# 3. SESSION STATE
 # ==========================================
-if 'user_garden' not in st.session_state:
-    st.session_state.user_garden = [
-        {"type": "cherry_tomatoes", "planted_at": datetime.now() - timedelta(days=45)},
-        {"type": "lettuce", "planted_at": datetime.now() - timedelta(days=10)},
-    ]
-if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
+# This console always shows the demo account.
+if 'current_user' not in st.session_state:
+    user = get_storage().get_user_by_email(DEMO_EMAIL)
+    user.pop('password')
+    st.session_state.current_user = user
 
 # ==========================================
-# 5. SIDEBAR NAVIGATION
+# 4. SIDEBAR NAVIGATION
 # ==========================================
 with st.sidebar:
     st.markdown("""
@@ -152,127 +129,6 @@ with st.sidebar:
     st.markdown("<small style='opacity:0.5;'>v2.0.6 Stable</small>", unsafe_allow_html=True)
 
 # ==========================================
-# 6. PAGE ROUTING
+# 5. PAGE ROUTING
 # ==========================================
-
-# --- SYSTEM OVERVIEW (DASHBOARD) ---
-if menu == "System Overview":
-    st.markdown('<p style="color:#4CAF50; font-weight:700; letter-spacing:2px; margin-bottom:0;">SYSTEM ACTIVE</p>', unsafe_allow_html=True)
-    st.markdown('# SYSTEM OVERVIEW', unsafe_allow_html=True)
-
-    st.markdown("### 🧠 GreenFlow Intelligence Hub")
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        with st.container(border=True): st.metric("Temperature", "24°C", "1.2°C")
-    with col2:
-        with st.container(border=True): st.metric("Humidity", "65%", "-2%")
-    with col3:
-        with st.container(border=True): st.metric("Water pH", "6.2", "OK")
-    with col4:
-        with st.container(border=True): st.metric("TDS / EC", "850 ppm", "Normal")
-
-    st.markdown("### 🔔 Live Intelligence Alerts")
-    st.warning("⚠️ Tank water level is at 40%. Intelligence suggests refilling within 48 hours.")
-    
-    st.markdown("### 📈 Growth Analytics")
-    st.line_chart({"Week": [1, 2, 3, 4], "Height (cm)": [5, 12, 18, 25]}, x="Week", y="Height (cm)")
-
-# --- MY GARDEN ---
-elif menu == "My Garden":
-    st.markdown("<h1>🌱 My Garden Status</h1>", unsafe_allow_html=True)
-    
-    grid_cols = st.columns(3)
-    for i, plant in enumerate(st.session_state.user_garden):
-        plant_info = PLANTS_DB.get(plant['type'], {})
-        days_passed = (datetime.now() - plant['planted_at']).days
-        
-        with grid_cols[i % 3]:
-            with st.container(border=True):
-                st.markdown(f"### {plant_info.get('icon')} {plant_info.get('name')}")
-                st.write(f"**Age:** {days_passed} Days")
-                st.progress(min(1.0, days_passed / 60))
-                st.caption(plant_info.get('tips'))
-
-    st.markdown("---")
-    st.markdown("### ➕ Add New Plant")
-    with st.container(border=True):
-        with st.form("add_plant_form"):
-            col_a, col_b = st.columns([3, 1])
-            with col_a:
-                new_plant_type = st.selectbox("Select Plant Type", list(PLANTS_DB.keys()), format_func=lambda x: PLANTS_DB[x]['name'])
-            with col_b:
-                st.write("")
-                st.write("")
-                submitted = st.form_submit_button("Plant Seed 🌱")
-            
-            if submitted:
-                st.session_state.user_garden.append({
-                    "type": new_plant_type,
-                    "planted_at": datetime.now()
-                })
-                st.success(f"Successfully planted {PLANTS_DB[new_plant_type]['name']}!")
-                time.sleep(1)
-                st.rerun()
-
-# --- STORE ---
-elif menu == "Store":
-    st.markdown("<h1>🛒 Subscription Kits</h1>", unsafe_allow_html=True)
-    cols = st.columns(3)
-    for idx, (key, pkg) in enumerate(PACKAGES.items()):
-        with cols[idx]:
-            with st.container(border=True):
-                st.header(pkg['name'])
-                st.subheader(f"₹{pkg['price']:,}")
-                st.write(pkg['desc'])
-                st.write(f"**Contains:** {pkg['plants_count']} plants")
-                st.button(f"Purchase Now", key=f"btn_{key}", use_container_width=True)
-
-# --- AI EXPERT ---
-elif menu == "AI Expert":
-    st.markdown("<h1>🤖 AI Expert Assistant</h1>", unsafe_allow_html=True)
-    st.markdown("")  # Add spacing after title
-    
-    # FIX: Use a container to properly separate messages from input
-    with st.container():
-        # Display existing chat messages
-        for message in st.session_state.chat_history:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
-    
-    # Add divider with spacing
-    st.divider()
-    
-    # FIX: Chat input placed in its own container for proper spacing
-    st.markdown("")  # Extra spacing
-    if prompt := st.chat_input("Ask about your garden or hydroponic system..."):
-        # Add user message
-        st.session_state.chat_history.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
-        
-        # Get bot response
-        time.sleep(0.5)
-        response = get_bot_response(prompt)
-        st.session_state.chat_history.append({"role": "assistant", "content": response})
-        
-        with st.chat_message("assistant"):
-            st.markdown(response)
-
-# --- SETTINGS ---
-elif menu == "Settings":
-    st.markdown("<h1>⚙️ Account Settings</h1>", unsafe_allow_html=True)
-    
-    with st.container(border=True):
-        st.markdown("### 👤 User Profile")
-        st.text_input("Display Name", value="Demo User")
-        st.text_input("Email Address", value="demo@greenflow.com")
-        
-        st.markdown("### 🔔 Preferences")
-        st.checkbox("Receive weekly plant care tips via email", value=True)
-        st.checkbox("Enable SMS alerts for water levels", value=False)
-        
-    st.markdown("---")
-    
-    if st.button("Reset Application Data", use_container_width=True):
-        st.session_state.clear()
-        st.rerun()
+views.render(menu, views.CONSOLE_PAGES)
@@ -0,0 +1,71 @@
+"""Alert engine throughput: gardens x sensors x Hz on one core.
+
+    python benchmarks/bench_alerts.py
+    python benchmarks/bench_alerts.py --gardens 10000 --hz 4 --seconds 30
+
+Replays ``--seconds`` of simulated feeder ticks for ``--gardens`` gardens at
+``--hz`` samples per second through :meth:`AlertEngine.ingest` and reports
+samples/s, per-tick latency against the tick budget, and how many alerts
+fired after de-duplication versus the raw number of breaching samples.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.alerts import AlertEngine  # noqa: E402
+from greenflow.telemetry import SENSORS, SimulatedFeeder  # noqa: E402
+
+
+class Capture:
+    """Stands in for TelemetryStore, keeping the feeder's ticks."""
+
+    def __init__(self):
+        self.ticks = []
+
+    def append_many(self, batches):
+        self.ticks.append(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gardens", type=int, default=5000)
+    parser.add_argument("--hz", type=float, default=2.0)
+    parser.add_argument("--seconds", type=int, default=60)
+    args = parser.parse_args()
+
+    engine = AlertEngine(capacity=args.gardens)
+    # Generate the ticks up front so only the engine is timed.
+    capture = Capture()
+    feeder = SimulatedFeeder(capture, range(args.gardens), interval=1.0 / args.hz, seed=0)
+    start = int(time.time())
+    n_ticks = int(args.seconds * args.hz)
+    for k in range(n_ticks):
+        feeder.tick(now=start + k // args.hz)
+
+    latencies, fired = [], 0
+    t0 = time.perf_counter()
+    for batches in capture.ticks:
+        t1 = time.perf_counter()
+        fired += len(engine.ingest(batches))
+        latencies.append(time.perf_counter() - t1)
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    samples = n_ticks * args.gardens
+    budget = 1.0 / args.hz
+    active = sum(len(engine.active(g)) for g in range(args.gardens))
+    print(f"gardens x sensors:  {args.gardens:,} x {len(SENSORS)} at {args.hz:g} Hz, {n_ticks} ticks")
+    print(f"rules per garden:   {len(engine.rules)}")
+    print(f"throughput:         {samples / elapsed:,.0f} garden samples/s "
+          f"({samples * len(SENSORS) / elapsed:,.0f} readings/s)")
+    print(f"tick latency:       p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(0.99 * len(latencies))] * 1000:.2f} ms (budget {budget * 1000:.0f} ms)")
+    print(f"alerts fired:       {fired:,} (active now: {active:,})")
+
+
+if __name__ == "__main__":
+    main()
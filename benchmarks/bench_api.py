@@ -0,0 +1,146 @@
+"""Load test for the JSON API: req/s and latency percentiles per endpoint.
+
+    python benchmarks/bench_api.py                     # in-process server, temp DB
+    python benchmarks/bench_api.py -n 5000 -c 16
+    python benchmarks/bench_api.py --url http://localhost:5000
+
+Without ``--url`` the app is served by werkzeug's threaded server on a free
+port in this process, against a throwaway database, with the chat rate limit
+lifted so ``/api/chat`` times answers rather than refusals. Each client thread
+keeps one keep-alive connection open, like a mobile client would. ``429``
+replies (a running server's chat limit) are counted apart from errors.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Client:
+    def __init__(self, host, port, token=None):
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def request(self, method, path, body=None, headers=None):
+        payload = json.dumps(body) if body is not None else None
+        self.conn.request(method, path, payload, {**self.headers, **(headers or {})})
+        response = self.conn.getresponse()
+        data = response.read()
+        return response.status, response.headers, data
+
+
+def run_endpoint(host, port, token, n, concurrency, method, path, body=None, headers=None):
+    """Fire ``n`` requests over ``concurrency`` connections; returns (req/s, latencies, errors, limited)."""
+    latencies, errors, limited = [], [0], [0]
+    lock = threading.Lock()
+    per_thread = [n // concurrency + (i < n % concurrency) for i in range(concurrency)]
+
+    def worker(count):
+        client, local, failed, refused = Client(host, port, token), [], 0, 0
+        for _ in range(count):
+            t0 = time.perf_counter()
+            status, _, _ = client.request(method, path, body, headers)
+            local.append(time.perf_counter() - t0)
+            refused += status == 429
+            failed += status >= 400 and status != 429
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+            limited[0] += refused
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in per_thread if c]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return n / elapsed, latencies, errors[0], limited[0]
+
+
+def start_local_server(db_path):
+    os.environ["GREENFLOW_DB"] = db_path
+    from werkzeug.serving import make_server
+
+    from greenflow import core
+    from greenflow.api import create_app
+
+    limiter = core.get_chat_limiter()
+    limiter.rate = limiter.burst = 1e9  # as bench_apps does: one client, far faster than anyone types
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no per-request access log
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=50, help="requests for /api/login (scrypt-bound)")
+    parser.add_argument("--url", help="benchmark a running server instead of an in-process one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port, server = parts.hostname, parts.port or 80, None
+        else:
+            server = start_local_server(os.path.join(tmp, "bench.db"))
+            host, port = server.server_address[:2]
+
+        from greenflow.storage import DEMO_EMAIL, DEMO_PASSWORD
+
+        credentials = {"email": DEMO_EMAIL, "password": DEMO_PASSWORD}
+        status, _, data = Client(host, port).request("POST", "/api/login", credentials)
+        if status != 200:
+            sys.exit(f"login failed: {status} {data[:200]!r}")
+        login = json.loads(data)
+        token, user_id = login["token"], login["user"]["id"]
+        _, headers, _ = Client(host, port).request("GET", "/api/plants")
+        plants_etag = headers["ETag"]
+
+        endpoints = [
+            ("GET /api/plants", "GET", "/api/plants", None, None, args.n),
+            ("GET /api/plants (304)", "GET", "/api/plants", None, {"If-None-Match": plants_etag}, args.n),
+            ("GET /api/packages", "GET", "/api/packages", None, None, args.n),
+            ("GET /api/user", "GET", "/api/user", None, None, args.n),
+            ("GET /api/garden/<id>", "GET", f"/api/garden/{user_id}", None, None, args.n),
+            ("POST /api/chat", "POST", "/api/chat", {"message": "what ph for basil?"}, None, args.n),
+            ("POST /api/login", "POST", "/api/login", credentials, None, args.logins),
+        ]
+
+        print(f"{'endpoint':<24} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'429':>5}")
+        for label, method, path, body, headers, n in endpoints:
+            rps, latencies, errors, limited = run_endpoint(
+                host, port, token, n, args.concurrency, method, path, body, headers
+            )
+            print(
+                f"{label:<24} {n:>9,} {rps:>9,.0f} {percentile(latencies, 0.50) * 1000:>8.2f}"
+                f" {percentile(latencies, 0.99) * 1000:>8.2f} {errors:>7} {limited:>5}"
+            )
+
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Concurrent sessions of the Streamlit apps: per-page rerun latency and per-session memory.
+
+    python benchmarks/bench_apps.py
+    python benchmarks/bench_apps.py --sessions 16 --plants 120 --chat 400
+    python benchmarks/bench_apps.py --app app2.py
+    python benchmarks/bench_apps.py --save before.json        # on the baseline commit
+    python benchmarks/bench_apps.py --compare before.json     # later; exits 1 on a regression
+    python benchmarks/bench_apps.py --baseline HEAD~1         # both, against a worktree of HEAD~1
+
+Each session is its own ``AppTest`` on its own thread, all in one process
+against one database, the way the sessions of a single ``streamlit run``
+share process-wide resources. A session logs in as its own user (``app.py``
+only) who owns ``--plants`` plants and ``--chat`` chat turns, then visits
+every page ``--rounds`` times and sends one chat message per round. Every
+``run()`` is timed as a rerun of the page it lands on.
+
+Session memory is what each session's ``st.session_state`` keeps alive
+that no other session shares (process-wide caches are not counted).
+``app2.py`` has no login, so its sessions get no seeded data and its results
+leave ``--plants`` and ``--chat`` out of their parameters.
+
+``--baseline`` runs this same script against a ``git worktree`` of the
+given revision. The harness imports ``greenflow`` from that tree and seeds
+through its storage API, so it can only go back as far as that API: the
+original single-file apps, blocking ``time.sleep`` calls and all, predate
+it and can't be measured this way.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APP_PAGES = {
+    "app.py": ["Dashboard", "My Garden", "Store", "AI Expert", "Consultation"],
+    "app2.py": ["System Overview", "My Garden", "Store", "AI Expert", "Settings"],
+}
+SEEDED_PARAMS = {"app.py": ("plants", "chat"), "app2.py": ()}  # what each app's sessions are seeded with
+PASSWORD = "bench-password"
+CHAT_PROMPTS = ["what ph for tomatoes", "my basil is wilting", "how much light for lettuce", "pests on mint"]
+REGRESSION_FLOOR = 0.005  # seconds; smaller differences are noise
+P99_MIN_RUNS = 20  # fewer runs make p99 just the slowest one
+
+
+# ==========================================
+# SEEDING
+# ==========================================
+def seed(sessions, plants, chat):
+    """One user per session with a garden and chat history; returns their emails."""
+    from greenflow.auth import hash_password
+    from greenflow.catalog import get_catalog
+    from greenflow.core import get_storage
+
+    storage = get_storage()
+    plant_types = list(get_catalog().plants)
+    password = hash_password(PASSWORD)
+    rng, now, emails = random.Random(0), int(time.time()), []
+    for i in range(sessions):
+        email = f"bench{i}@example.com"
+        user_id = storage.create_user(email, f"Bench User {i}", password)
+        storage.add_plants(
+            user_id, rng.choices(plant_types, k=plants), [now - rng.randrange(0, 90 * 86400) for _ in range(plants)]
+        )
+        for turn in range(chat):
+            storage.append_chat(user_id, "user" if turn % 2 == 0 else "assistant", f"turn {turn} " + "leaf " * 30)
+        emails.append(email)
+    return emails
+
+
+def lift_chat_limit():
+    """Rounds send faster than anyone types; time the answers, not the rate limiter's refusals."""
+    from greenflow import core
+
+    if hasattr(core, "get_chat_limiter"):  # trees from before the limiter (--baseline) have none
+        limiter = core.get_chat_limiter()
+        limiter.rate = limiter.burst = 1e9
+
+
+# ==========================================
+# SESSIONS
+# ==========================================
+def share_test_runtime():
+    """Let ``AppTest`` runs overlap.
+
+    Each run installs a mock ``Runtime`` singleton and sets it back to ``None``
+    when it finishes, which would pull it out from under runs still going on
+    other threads. Keep handing out the last one installed instead.
+
+    Each run also patches ``config.get_option`` to turn ``global.appTest`` on
+    and restores what it found on exit. Overlapping runs then restore each
+    other's patches mid-run, and widgets stop recording the ``format_func``
+    that AppTest looks up later. So the option is turned on once, for the
+    whole process.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" in last:
+            return last["runtime"]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+
+
+class Session:
+    def __init__(self, app_path, email, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(app_path, default_timeout=timeout)
+        self.email = email
+        self.timings = []  # (page, seconds)
+        self.errors = []
+
+    def timed(self, page, step):
+        t0 = time.perf_counter()
+        step()
+        self.timings.append((page, time.perf_counter() - t0))
+        if self.at.exception:
+            self.errors.append((page, self.at.exception[0].message))
+
+    def login(self):
+        at = self.at
+        self.timed("Login", at.run)
+        for attempt in range(20):  # the authenticator's bounded queue turns some concurrent logins away (AuthBusy)
+            at.text_input[0].input(self.email)
+            at.text_input[1].input(PASSWORD)
+            self.timed("Login submit", at.button[0].click().run)
+            if at.session_state["logged_in"]:
+                return
+            time.sleep(0.05 * (attempt + 1))
+        self.errors.append(("Login", "could not log in"))
+
+    def visit(self, pages, rng):
+        at = self.at
+        for page in pages:
+            self.timed(page, at.sidebar.radio[0].set_value(page).run)
+            if at.chat_input:
+                self.timed(f"{page} send", at.chat_input[0].set_value(rng.choice(CHAT_PROMPTS)).run)
+
+
+def run_sessions(root, app, emails, rounds, timeout):
+    app_path = os.path.join(root, app)
+    pages = APP_PAGES[app]
+    share_test_runtime()
+    sessions = [Session(app_path, email, timeout) for email in emails]
+
+    def drive(n, session):
+        rng = random.Random(n)
+        if app == "app.py":
+            session.login()
+        else:
+            session.timed(pages[0], session.at.run)
+        for _ in range(rounds):
+            session.visit(pages, rng)
+
+    threads = [threading.Thread(target=drive, args=(n, s)) for n, s in enumerate(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sessions, time.perf_counter() - t0
+
+
+# ==========================================
+# MEASUREMENT
+# ==========================================
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def reachable(roots):
+    """``{id: size}`` of every object reachable from ``roots``."""
+    seen, stack = {}, list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen[id(obj)] = sys.getsizeof(obj, 0)
+        stack.extend(gc.get_referents(obj))
+    return seen
+
+
+def session_bytes(sessions):
+    """Bytes reachable from each session's state and from no other session's."""
+    graphs = []
+    for session in sessions:
+        state = session.at.session_state
+        graphs.append(reachable([state[key] for key in state]))
+    owners = {}
+    for graph in graphs:
+        for key in graph:
+            owners[key] = owners.get(key, 0) + 1
+    return [sum(size for key, size in graph.items() if owners[key] == 1) for graph in graphs]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(sessions, wall, args):
+    by_page = {}
+    for session in sessions:
+        for page, seconds in session.timings:
+            by_page.setdefault(page, []).append(seconds)
+    memory = session_bytes(sessions) if len(sessions) > 1 else []
+    return {
+        "commit": git_revision(args.root),
+        "app": args.app,
+        "params": {k: getattr(args, k) for k in ("sessions", *SEEDED_PARAMS[args.app], "rounds")},
+        "wall": wall,
+        "pages": {
+            page: {"n": len(v), "p50": percentile(v, 0.5), "p99": percentile(v, 0.99)} for page, v in by_page.items()
+        },
+        "session_bytes": {"p50": percentile(memory, 0.5), "max": max(memory)} if memory else None,
+        "errors": [f"{page}: {message}" for s in sessions for page, message in s.errors],
+    }
+
+
+def git_revision(root):
+    try:
+        rev = subprocess.run(["git", "-C", root, "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "-C", root, "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return rev + ("+dirty" if dirty else "")
+
+
+# ==========================================
+# REPORTING
+# ==========================================
+def report(result):
+    p = result["params"]
+    seeded = f", {p['plants']} plants, {p['chat']} chat turns each" if "plants" in p else ""
+    print(f"{result['app']} @ {result['commit']}: {p['sessions']} sessions x {p['rounds']} rounds"
+          f"{seeded}  ({result['wall']:.1f} s)")
+    print(f"  {'page':<22} {'runs':>5} {'p50 ms':>9} {'p99 ms':>9}")
+    for page, stats in result["pages"].items():
+        print(f"  {page:<22} {stats['n']:>5} {stats['p50'] * 1000:>9.1f} {stats['p99'] * 1000:>9.1f}")
+    if result["session_bytes"]:
+        mem = result["session_bytes"]
+        print(f"  session state          p50 {mem['p50'] / 1024:,.1f} KiB  max {mem['max'] / 1024:,.1f} KiB")
+    for error in result["errors"][:10]:
+        print(f"  ERROR {error}")
+
+
+def compare(base, result, threshold):
+    """Print per-page deltas; returns the pages that regressed by more than ``threshold``."""
+    if base["params"] != result["params"] or base["app"] != result["app"]:
+        print(f"\n  note: baseline ran {base['app']} with {base['params']}; numbers are not like for like")
+    print(f"\n  vs {base['commit']}:  {'page':<22} {'p50 ms':>17} {'p99 ms':>17}")
+    regressed = []
+    for page, now in result["pages"].items():
+        before = base["pages"].get(page)
+        if before is None:
+            continue
+        flags = []
+        for q in ("p50", "p99"):
+            if q == "p99" and min(now["n"], before["n"]) < P99_MIN_RUNS:
+                continue
+            if now[q] - before[q] > max(REGRESSION_FLOOR, threshold * before[q]):
+                flags.append(q)
+        if flags:
+            regressed.append(page)
+        print(f"  {'':<{len(base['commit']) + 5}}{page:<22} "
+              f"{before['p50'] * 1000:>7.1f} -> {now['p50'] * 1000:>7.1f} {before['p99'] * 1000:>7.1f} -> {now['p99'] * 1000:>7.1f}"
+              f"{'  REGRESSED ' + '/'.join(flags) if flags else ''}")
+    if base.get("session_bytes") and result.get("session_bytes"):
+        print(f"  session state p50 {base['session_bytes']['p50'] / 1024:,.1f} -> "
+              f"{result['session_bytes']['p50'] / 1024:,.1f} KiB")
+    return regressed
+
+
+def run_baseline(ref, args):
+    """Run this script against a worktree of ``ref``; returns its saved result."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tree, saved = os.path.join(tmp, "tree"), os.path.join(tmp, "baseline.json")
+        subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", "--quiet", tree, ref], check=True)
+        try:
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__), "--root", tree, "--app", args.app, "--save", saved,
+                "--sessions", str(args.sessions), "--plants", str(args.plants), "--chat", str(args.chat),
+                "--rounds", str(args.rounds), "--timeout", str(args.timeout),
+            ], check=True)
+            with open(saved) as f:
+                return json.load(f)
+        finally:
+            subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", tree], check=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", choices=sorted(APP_PAGES), default="app.py")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--plants", type=int, default=40, help="plants in each session's garden")
+    parser.add_argument("--chat", type=int, default=200, help="chat turns already stored for each user")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over every page per session")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds one rerun may take")
+    parser.add_argument("--root", default=ROOT, help="tree whose app to run (default: this one)")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier --save to compare against")
+    parser.add_argument("--baseline", help="git revision to run first and compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    base = run_baseline(args.baseline, args) if args.baseline else None
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+
+    root = args.root = os.path.abspath(args.root)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Storage reads its path at import, so this must precede every greenflow import.
+        os.environ["GREENFLOW_DB"] = os.path.join(tmp, "bench.db")
+        sys.path.insert(0, root)
+        os.chdir(root)
+        emails = seed(args.sessions, args.plants, args.chat) if SEEDED_PARAMS[args.app] else [None] * args.sessions
+        lift_chat_limit()
+        sessions, wall = run_sessions(root, args.app, emails, args.rounds, args.timeout)
+        result = summarize(sessions, wall, args)
+
+    report(result)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+    if base is not None and compare(base, result, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Concurrent booking contention on a handful of popular consultation slots.
+
+    python benchmarks/bench_bookings.py
+    python benchmarks/bench_bookings.py --sessions 64 --attempts 50 --hot-days 3
+
+Each session thread repeatedly books a random slot on one of the first
+``--hot-days`` days, as a different user every time, so most attempts race
+for the same few seats. Sessions are spread over ``--processes`` schedulers
+sharing one database, each with its own index, as separate app processes
+would be, so the in-memory fast path cannot hide a race. Afterwards the table is checked for overbooked
+slots and duplicate or non-increasing reference IDs. A second part books
+out ``--full-days`` days and compares the disjoint-set "next available"
+lookup with a linear scan over the slots.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.bookings import SLOTS, Scheduler, SlotFull  # noqa: E402
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.storage import Storage  # noqa: E402
+
+
+def contention(schedulers, users, attempts, hot_days):
+    """Returns (booked ids in completion order per thread, full count, seconds)."""
+    today = date.today()
+    sessions = len(users) // attempts
+    booked, full, lock = [], [0], threading.Lock()
+
+    def session(seed):
+        rng, ids, misses = random.Random(seed), [], 0
+        scheduler = schedulers[seed % len(schedulers)]
+        for i in range(attempts):
+            day = today + timedelta(days=rng.randrange(hot_days))
+            try:
+                ids.append(scheduler.book(users[seed * attempts + i], day, rng.randrange(len(SLOTS)), "Bench", "000").id)
+            except SlotFull:
+                misses += 1
+        with lock:
+            booked.append(ids)
+            full[0] += misses
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return booked, full[0], time.perf_counter() - t0
+
+
+def linear_next(scheduler, day, slot):
+    n = day.toordinal() * len(SLOTS) + slot
+    while scheduler._counts.get(n, 0) >= scheduler.capacity:
+        n += 1
+    return date.fromordinal(n // len(SLOTS)), n % len(SLOTS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=40)
+    parser.add_argument("--hot-days", type=int, default=2)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--full-days", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "bookings.db"), catalog=load_catalog().plant_index)
+        users = [storage.create_user(f"bench{i}@example.com", "Bench", "-")
+                 for i in range(args.sessions * args.attempts)]
+        schedulers = [Scheduler(storage) for _ in range(args.processes)]
+        scheduler = schedulers[0]
+        booked, full, wall = contention(schedulers, users, args.attempts, args.hot_days)
+
+        with storage.connection() as conn:
+            worst = conn.execute(
+                "SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM bookings GROUP BY day, slot)"
+            ).fetchone()[0]
+            total = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        ids = [i for per_thread in booked for i in per_thread]
+        seats = args.hot_days * len(SLOTS) * scheduler.capacity
+        print(f"contention  {args.sessions * args.attempts:,} attempts in {wall:.2f} s  "
+              f"booked {len(ids)} of {seats} seats  turned away {full:,}")
+        print(f"            rows {total}  fullest slot {worst}/{scheduler.capacity}  "
+              f"unique ids {len(set(ids)) == len(ids)}  "
+              f"increasing per session {all(a < b for t in booked for a, b in zip(t, t[1:]))}")
+
+        # Book out a long run of days directly in the index, then query from random points in it.
+        start = date.today().toordinal()
+        for n in range(start * len(SLOTS), (start + args.full_days) * len(SLOTS)):
+            scheduler._set_count(n, scheduler.capacity)
+        rng = random.Random(0)
+        probes = [(date.fromordinal(start + rng.randrange(args.full_days)), rng.randrange(len(SLOTS)))
+                  for _ in range(args.queries)]
+        for label, lookup in (("linear", lambda d, s: linear_next(scheduler, d, s)), ("dsu", scheduler.next_available)):
+            t0 = time.perf_counter()
+            answers = [lookup(d, s) for d, s in probes]
+            elapsed = time.perf_counter() - t0
+            print(f"next-free   {label:<6} {args.queries:,} queries over {args.full_days:,} full days  "
+                  f"{elapsed * 1e6 / args.queries:9.2f} µs/query  first {answers[0]}")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Bulk garden import/export: rows/s and memory for a large file, versus adding plants one at a time.
+
+    python benchmarks/bench_bulk.py
+    python benchmarks/bench_bulk.py --rows 1000000 --format jsonl
+
+Writes a ``--rows`` file for one farm (about 1% of rows invalid), imports it
+with :func:`greenflow.bulk.import_plants`, then exports the garden and its
+history back to disk. "one at a time" is what the Add New Plant form does
+per click, ``Storage.add_plant`` with its own transaction, timed over
+``--single`` rows. Memory is the growth of peak RSS during each step; most
+of what the import keeps is the garden itself (its arrays and the
+in-memory harvest calendar), not the file.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.bulk import export_history, export_plants, import_plants  # noqa: E402
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.storage import Storage  # noqa: E402
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_file(path, fmt, rows, plants, rng):
+    now = int(time.time())
+    names = [plants[key]["name"] for key in plants] + list(plants)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            f.write("tower,type,planted_at,quantity\n")
+        for n in range(rows):
+            plant_type = rng.choice(names) if rng.random() > 0.01 else "Cactus"
+            planted_at = now - rng.randrange(120 * 86400)
+            tower = f"T{n // 30:05d}"
+            if fmt == "csv":
+                f.write(f"{tower},{plant_type},{planted_at},1\n")
+            else:
+                f.write(json.dumps({"tower": tower, "type": plant_type, "planted_at": planted_at}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--single", type=int, default=500, help="rows to time through add_plant")
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f"farm.{args.format}")
+        write_file(source, args.format, args.rows, catalog.plants, rng)
+        print(f"file     {args.rows:,} rows  {os.path.getsize(source) / 1e6:.1f} MB {args.format}")
+
+        storage = Storage(os.path.join(tmp, "bulk.db"), catalog=catalog.plant_index)
+        storage.harvest_calendar()  # kept in sync by every add, as in the apps
+        single = storage.create_user("single@example.com", "Single", "-")
+        types = list(catalog.plants)
+        t0 = time.perf_counter()
+        for _ in range(args.single):
+            storage.add_plant(single, rng.choice(types))
+        elapsed = time.perf_counter() - t0
+        print(f"one at a time  {args.single / elapsed:9,.0f} rows/s")
+
+        farm = storage.create_user("farm@example.com", "Farm", "-")
+        before = peak_rss_mb()
+        with open(source, encoding="utf-8", newline="") as f:
+            report = import_plants(storage, farm, f, args.format, plants=catalog.plants)
+        print(f"import         {report.rows_per_second:9,.0f} rows/s  {report.plants:,} plants, "
+              f"{report.rejected:,} rejected in {report.seconds:.1f} s  peak RSS +{peak_rss_mb() - before:.0f} MB")
+
+        for label, export in (("export plants", export_plants), ("export history", export_history)):
+            before = peak_rss_mb()
+            t0 = time.perf_counter()
+            rows = size = 0
+            with open(os.path.join(tmp, "out"), "w", encoding="utf-8", newline="") as f:
+                for chunk in export(storage, farm, args.format):
+                    f.write(chunk)
+                    rows += chunk.count("\n")
+                    size += len(chunk)
+            elapsed = time.perf_counter() - t0
+            print(f"{label:<14} {rows / elapsed:9,.0f} rows/s  {rows:,} rows, {size / 1e6:.1f} MB "
+                  f"in {elapsed:.1f} s  peak RSS +{peak_rss_mb() - before:.0f} MB")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Chat answers per second without the response cache, with it cold and warm, and a coalesced burst.
+
+    python benchmarks/bench_chat.py
+    python benchmarks/bench_chat.py --messages 100000 --threads 8 --questions 2000
+
+Messages are drawn Zipf-style from ``--questions`` distinct questions, each
+asked in a few spellings that differ only in case and punctuation, and
+answered by ``--threads`` threads. "no cache" is what ``get_bot_response``
+did before the cache, a catalog lookup and an index query; "cold" and "warm"
+go through :func:`greenflow.core.get_bot_response` with an empty cache and
+then again over the same messages. Each row is run twice: against the
+keyword/TF-IDF index as it is, and against the same index slowed by
+``--latency`` seconds per answer, standing in for a model call (with
+``--messages / 100`` messages). The burst sends ``--threads`` copies of one
+new question at once to the slow engine and counts how many answers it
+computes.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SPELLINGS = (str.lower, str.capitalize, lambda q: q + "?", lambda q: q.upper() + "!!")
+
+
+def questions(count, rng):
+    from greenflow.catalog import get_catalog
+
+    catalog = get_catalog()
+    words = [w for p in catalog.plants.values() for w in p["name"].lower().split()]
+    words += ["ph", "water", "light", "pests", "nutrients", "harvest", "roots", "yellow", "leaves", "price"]
+    return [" ".join(rng.sample(words, rng.randrange(2, 6))) for _ in range(count)]
+
+
+def messages(pool, count, rng):
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    return [rng.choice(SPELLINGS)(q) for q in rng.choices(pool, weights, k=count)]
+
+
+def throughput(answer, texts, threads):
+    chunks = [texts[i::threads] for i in range(threads)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda chunk: [answer(t) for t in chunk], chunks))
+    return len(texts) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--questions", type=int, default=1_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per answer of the slow engine")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["GREENFLOW_DB"] = os.path.join(tmp, "chat.db")  # before greenflow.storage is imported
+        from greenflow import metrics
+        from greenflow.catalog import get_catalog
+        from greenflow.core import get_bot_response, get_chat_cache
+
+        rng = random.Random(0)
+        pool = questions(args.questions, rng)
+        index = get_catalog().chat_index
+        cache = get_chat_cache()
+        query = index.query
+        computed = []
+
+        def model(text):
+            computed.append(text)
+            time.sleep(args.latency)
+            return query(text)
+
+        print(f"{args.threads} threads, {args.questions:,} questions")
+        for engine, fn, count in (("index", query, args.messages), (f"{args.latency * 1000:.0f} ms model", model,
+                                                                   max(args.threads, args.messages // 100))):
+            index.query = fn
+            cache.clear()
+            texts = messages(pool, count, rng)
+            for label, answer in (
+                ("no cache", lambda text: get_catalog().chat_index.query(text)),
+                ("cold", get_bot_response),
+                ("warm", get_bot_response),
+            ):
+                before = {r: metrics.CHAT_CACHE.value(result=r) for r in ("hit", "miss", "coalesced")}
+                rate = throughput(answer, texts, args.threads)
+                after = {r: metrics.CHAT_CACHE.value(result=r) - before[r] for r in before}
+                lookups = sum(after.values())
+                hits = f"  hit rate {(after['hit'] + after['coalesced']) / lookups:6.1%}" if lookups else ""
+                print(f"{engine:<10} {label:<9} {count:>7,} messages {rate:10,.0f} answers/s{hits}")
+
+        computed.clear()
+        barrier = threading.Barrier(args.threads)
+
+        def ask(_):
+            barrier.wait()
+            return get_bot_response("a question nobody asked before")
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            list(executor.map(ask, range(args.threads)))
+        print(f"burst      {args.threads} identical questions -> {len(computed)} computed "
+              f"in {time.perf_counter() - t0:.2f} s ({args.latency:.2f} s each)")
+        index.query = query
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Throughput of the assistant's ChatIndex versus the old linear substring scan.
+
+    python benchmarks/bench_chat_index.py                 # 100k synthetic queries
+    python benchmarks/bench_chat_index.py --log chats.jsonl
+
+``--log`` replays a support chat log instead: one message per line, either
+plain text or JSON objects with ``role``/``content`` (only user turns are
+replayed). Answers can be written out with ``--out`` for offline review.
+
+Each index row starts from a fresh index. The index memoizes keyword
+answers per message, so "first sight" times the distinct messages alone:
+the full cost of tokenising, trie lookups and TF-IDF scoring. The
+index.query time is split between messages answered by keyword, which the
+linear scan stood for, and those that need the TF-IDF fallback the scan
+never had.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.chatbot import ChatIndex  # noqa: E402
+
+TEMPLATES = [
+    "hi", "hello there", "help", "how often should I change the water?",
+    "what ph for {plant}", "my {plant} leaves are turning yellow",
+    "when can I harvest {plant}", "how much light do {plant} need",
+    "pests on my {plant}", "how much does the starter kit cost",
+    "do you sell nutrients", "is premium worth it", "book a visit please",
+    "my phone app crashed", "water is cloudy and smells", "thanks!",
+]
+
+
+def linear_scan(bot_responses, text):
+    text = text.lower()
+    for key, response in bot_responses.items():
+        if key in text:
+            return response
+    return bot_responses["default"]
+
+
+def synthetic_queries(n, plants_db, seed=0):
+    rng = random.Random(seed)
+    names = [p["name"].lower() for p in plants_db.values()]
+    return [rng.choice(TEMPLATES).format(plant=rng.choice(names)) for _ in range(n)]
+
+
+def read_log(path):
+    queries = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                if record.get("role", "user") == "user":
+                    queries.append(record["content"])
+            else:
+                queries.append(line)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=100_000, help="synthetic queries to run")
+    parser.add_argument("--log", help="replay a chat log instead of synthetic queries")
+    parser.add_argument("--out", help="write answers as JSON lines")
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    bot_responses, plants_db = catalog.bot_responses, catalog.plants
+    t0 = time.perf_counter()
+    index = ChatIndex(bot_responses, plants_db)
+    build = time.perf_counter() - t0
+
+    queries = read_log(args.log) if args.log else synthetic_queries(args.n, plants_db)
+    n = len(queries)
+
+    t0 = time.perf_counter()
+    for q in queries:
+        linear_scan(bot_responses, q)
+    scan = time.perf_counter() - t0
+
+    distinct = list(dict.fromkeys(queries))
+    index = ChatIndex(bot_responses, plants_db)
+    t0 = time.perf_counter()
+    for q in distinct:
+        index.query(q)
+    first = time.perf_counter() - t0
+
+    index = ChatIndex(bot_responses, plants_db)
+    keyword = [q for q in queries if index.exact_intents(q)]
+    fallback = [q for q in queries if not index.exact_intents(q)]
+    split = {}
+    for label, part in (("keyword", keyword), ("fallback", fallback)):
+        index = ChatIndex(bot_responses, plants_db)
+        t0 = time.perf_counter()
+        for q in part:
+            index.query(q)
+        split[label] = (len(part), time.perf_counter() - t0)
+    single = sum(seconds for _, seconds in split.values())
+
+    index = ChatIndex(bot_responses, plants_db)
+    t0 = time.perf_counter()
+    answers = index.query_batch(queries)
+    batch = time.perf_counter() - t0
+
+    print(f"queries:        {n:,}")
+    print(f"index build:    {build * 1000:.1f} ms ({len(index.names)} intents, {len(index.vocab)} terms)")
+    print(f"linear scan:    {n / scan:,.0f} q/s")
+    print(f"first sight:    {len(distinct) / first:,.0f} q/s ({len(distinct):,} distinct messages)")
+    print(f"index.query:    {n / single:,.0f} q/s")
+    for label, (count, seconds) in split.items():
+        if count:
+            print(f"  {label + ':':<13} {count / seconds:,.0f} q/s ({count:,} messages)")
+    print(f"query_batch:    {n / batch:,.0f} q/s")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            for q, a in zip(queries, answers):
+                fh.write(json.dumps({"query": q, "answer": a}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Garden event log: bytes per event, replay from scratch versus snapshot plus tail.
+
+    python benchmarks/bench_gardenlog.py
+    python benchmarks/bench_gardenlog.py --users 20 --events 20000
+
+Each user's garden goes through ``--events`` changes: plantings in batches,
+stage advances, partial and final harvests and removals. Reported are the
+on-disk cost of the log, the time to rebuild one garden's state with and
+without its latest snapshot, and the growth/yield queries, with the peak
+Python memory each of them allocates.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.storage import Storage  # noqa: E402
+
+
+def grow(storage, user_id, events, plant_types, rng):
+    """Drive ``events`` random garden changes through the public Storage API."""
+    live, now, done = [], int(time.time()) - 365 * 86400, 0
+    while done < events:
+        now += rng.randrange(3600, 86400)
+        roll = rng.random()
+        if len(live) < 8 or (roll < 0.3 and len(live) < 60):
+            batch = rng.randrange(1, 6)
+            live += storage.add_plants(user_id, rng.choices(plant_types, k=batch), [now] * batch)
+            done += batch
+        elif roll < 0.65:
+            storage.advance_stage(user_id, rng.choice(live))  # no-op once a plant is at its last stage
+            done += 1
+        elif roll < 0.9:
+            plant_id = live.pop(rng.randrange(len(live)))
+            final = rng.random() < 0.6
+            storage.harvest_plant(user_id, plant_id, rng.randrange(20, 600), final=final)
+            if not final:
+                live.append(plant_id)
+            done += 2 if final else 1
+        else:
+            storage.remove_plant(user_id, live.pop(rng.randrange(len(live))))
+            done += 1
+
+
+def database_bytes(conn):
+    conn.execute("VACUUM")
+    return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def measure(fn, repeat):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - t0) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "log.db"), catalog=catalog.plant_index)
+        users = [storage.create_user(f"log{i}@example.com", "Log", "-") for i in range(args.users)]
+        t0 = time.perf_counter()
+        for user_id in users:
+            grow(storage, user_id, args.events, list(catalog.plants), rng)
+        elapsed = time.perf_counter() - t0
+
+        with storage.connection() as conn:
+            logged = conn.execute("SELECT COUNT(*) FROM garden_events").fetchone()[0]
+            size = database_bytes(conn)
+            conn.execute("DROP TABLE garden_snapshots")
+            conn.execute("DROP TABLE garden_events")
+            without_log = database_bytes(conn)
+        storage.close()
+        print(f"log      {logged:,} events for {args.users} users in {elapsed:.2f} s  "
+              f"{(size - without_log) / logged:.1f} bytes/event on disk (incl. key and snapshots)")
+
+    # Rebuild against an intact copy of the database.
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "log.db"), catalog=catalog.plant_index)
+        user_id = storage.create_user("replay@example.com", "Replay", "-")
+        grow(storage, user_id, args.events, list(catalog.plants), random.Random(1))
+        state = storage.garden_state(user_id)
+        print(f"state    seq {state.seq:,}  live plants {len(state.plants)}  "
+              f"tail after snapshot {state.seq - state.snapshot_seq}")
+        for label, fn in (
+            ("full replay", lambda: storage.replay_garden_state(user_id, from_snapshot=False)),
+            ("snapshot+tail", lambda: storage.replay_garden_state(user_id)),
+            ("growth query", lambda: storage.growth_history(user_id)),
+            ("yield query", lambda: storage.harvest_yield(user_id)),
+        ):
+            _, seconds, peak = measure(fn, args.repeat)
+            print(f"{label:<14} {seconds * 1000:9.2f} ms  peak {peak / 1024:8.1f} KiB")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Harvest calendar on a million plants versus scanning every garden.
+
+    python benchmarks/bench_harvest.py
+    python benchmarks/bench_harvest.py --plants 5000000 --users 200000 --days 7
+
+"scan" is what answering the field team's question costs without an index:
+a vectorized status pass over every plant of every user. "calendar" is
+:meth:`HarvestCalendar.upcoming`. Incremental adds/removes (including the
+overlay merges they trigger) are timed as well.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.garden import SECONDS_PER_DAY  # noqa: E402
+from greenflow.harvest import HarvestCalendar  # noqa: E402
+
+
+def timed(fn, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plants", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=7, help="look-ahead for the upcoming query")
+    parser.add_argument("--updates", type=int, default=20_000, help="incremental adds and removes")
+    args = parser.parse_args()
+
+    catalog = load_catalog().plant_index
+    rng = np.random.default_rng(0)
+    now = int(time.time())
+    plant_ids = np.arange(1, args.plants + 1)
+    user_ids = rng.integers(1, args.users + 1, args.plants)
+    type_code = rng.integers(0, len(catalog.keys), args.plants).astype(np.int16)
+    plant_types = [catalog.keys[c] for c in type_code]
+    planted_at = now - rng.integers(0, 120 * SECONDS_PER_DAY, args.plants)
+
+    calendar = HarvestCalendar(catalog)
+    build, _ = timed(lambda: calendar.load(plant_ids, user_ids, plant_types, planted_at))
+
+    def scan():
+        ready_day = (planted_at + catalog.days_to_harvest[type_code] * SECONDS_PER_DAY) // SECONDS_PER_DAY
+        today = now // SECONDS_PER_DAY
+        return np.flatnonzero((ready_day >= today) & (ready_day <= today + args.days))
+
+    scan_time, hits = timed(scan, repeat=5)
+    query_time, window = timed(lambda: calendar.upcoming(args.days, now=now), repeat=5)
+    visits = len(np.unique(window.user_id))
+
+    next_id = args.plants + 1
+    t0 = time.perf_counter()
+    for i in range(args.updates):
+        calendar.add_many([next_id + i], int(user_ids[i]), [plant_types[i]], [now])
+        calendar.remove(int(plant_ids[i]))
+    updates = time.perf_counter() - t0
+    query_after, _ = timed(lambda: calendar.upcoming(args.days, now=now), repeat=5)
+
+    print(f"plants:              {args.plants:,} across {args.users:,} users")
+    print(f"build (sort):        {build * 1000:.0f} ms, "
+          f"{sum(c.nbytes for c in calendar._base) / 2**20:.1f} MiB")
+    print(f"ready in {args.days:>2} days:      {len(window.plant_id):,} plants, {visits:,} customers "
+          f"(scan found {len(hits):,})")
+    print(f"full scan:           {scan_time * 1000:.2f} ms")
+    print(f"calendar.upcoming:   {query_time * 1000:.2f} ms")
+    print(f"add+remove:          {2 * args.updates / updates:,.0f} updates/s "
+          f"(query after: {query_after * 1000:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
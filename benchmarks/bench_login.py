@@ -0,0 +1,112 @@
+"""Login storm: throughput, and the latency other sessions' reruns see meanwhile.
+
+    python benchmarks/bench_login.py --clients 32 --seconds 5
+
+A probe thread repeatedly does what a logged-in rerun does (validate the
+session token, compute garden progress) and records its latency. The probe
+runs alone first, then during a storm where ``--clients`` threads log in
+as fast as they can:
+
+* ``pool``   - through Authenticator, i.e. a bounded scrypt worker pool;
+* ``inline`` - every client hashes on its own thread, as the old
+               login_user did on each session's script thread.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.auth import AuthBusy, Authenticator, verify_password  # noqa: E402
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.storage import DEMO_EMAIL, DEMO_PASSWORD, Storage  # noqa: E402
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def probe(auth, storage, token, user_id, stop, latencies):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        auth.validate(token)
+        storage.garden(user_id).status()
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(0.005)
+
+
+def run_phase(name, login, clients, seconds, auth, storage, token, user_id):
+    stop = threading.Event()
+    latencies, logins, rejected = [], [0], [0]
+    lock = threading.Lock()
+
+    def client():
+        while not stop.is_set():
+            try:
+                ok = login()
+            except AuthBusy:
+                with lock:
+                    rejected[0] += 1
+                time.sleep(0.05)
+                continue
+            if ok:
+                with lock:
+                    logins[0] += 1
+
+    probe_thread = threading.Thread(target=probe, args=(auth, storage, token, user_id, stop, latencies))
+    probe_thread.start()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(clients, 1)) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+        time.sleep(seconds)
+        stop.set()
+    elapsed = time.perf_counter() - t0
+    probe_thread.join()
+
+    ms = [x * 1000 for x in latencies]
+    print(
+        f"{name:<8} logins/s {logins[0] / elapsed:8.1f}   busy {rejected[0]:6d}   "
+        f"probe p50 {statistics.median(ms):7.2f} ms   p99 {percentile(ms, 0.99):7.2f} ms   max {max(ms):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "bench.db"), catalog=load_catalog().plant_index)
+        storage.seed_demo()
+        auth = Authenticator(storage, workers=args.workers)
+        token = auth.login(DEMO_EMAIL, DEMO_PASSWORD)
+        user_id = auth.validate(token)["id"]
+        stored = storage.get_user_by_email(DEMO_EMAIL)["password"]
+
+        def pooled():
+            return auth.login(DEMO_EMAIL, DEMO_PASSWORD) is not None
+
+        def inline():
+            return verify_password(DEMO_PASSWORD, stored)
+
+        print(f"clients={args.clients} workers={args.workers} seconds={args.seconds}")
+        run_phase("idle", None, 0, args.seconds, auth, storage, token, user_id)
+        run_phase("pool", pooled, args.clients, args.seconds, auth, storage, token, user_id)
+        run_phase("inline", inline, args.clients, args.seconds, auth, storage, token, user_id)
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""One weekly care-tips run for many subscribers: digest building and batched sending.
+
+    python benchmarks/bench_notify.py
+    python benchmarks/bench_notify.py --users 100000 --workers 8 --batch 100
+
+Seeds ``--users`` users with up to ``--plants`` plants each (a few percent
+have opted out, a few have empty gardens), then:
+
+- builds every digest without sending, the way the weekly run does (one
+  grouped query, catalog text rendered once), and the old way on a sample
+  of users (a query per user, catalog looked up per plant), extrapolated;
+- sends them through :class:`greenflow.notify.Dispatcher` to
+  :mod:`greenflow.mailsink` in a separate process, which answers every
+  ``--fail-every``-th message with a 451 and hangs up on every
+  ``--drop-every``-th so the retries are exercised;
+- runs the week again, which should send nothing.
+"""
+import argparse
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import get_catalog  # noqa: E402
+from greenflow.garden import SECONDS_PER_DAY  # noqa: E402
+from greenflow.notify import Digest, DigestBuilder, Dispatcher, SMTPPool, send_weekly_digests, week_of  # noqa: E402
+from greenflow.notify import weekly_digests  # noqa: E402
+from greenflow.storage import Storage  # noqa: E402
+
+SAMPLE = 2_000
+
+
+def seed(storage, users, max_plants, plant_types, now, rng):
+    with storage.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (id, email, name, password, subscription, created_at) VALUES (?, ?, ?, 'x', 0, ?)",
+            ((i, f"user{i}@example.com", f"User {i}", now) for i in range(1, users + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO preferences (user_id, name, value) VALUES (?, 'weekly_tips', 0)",
+            ((i,) for i in range(1, users + 1) if rng.random() < 0.03),
+        )
+        plants = (
+            (i, rng.choice(plant_types), now - rng.randrange(90 * SECONDS_PER_DAY))
+            for i in range(1, users + 1) for _ in range(rng.choice((0, 1, 2, 3, max_plants)))
+        )
+        conn.executemany("INSERT INTO plants (user_id, type, planted_at) VALUES (?, ?, ?)", plants)
+        return conn.execute("SELECT COUNT(*) FROM plants").fetchone()[0]
+
+
+def per_user_digests(storage, plants_db, now, user_ids):
+    """The obvious version: a query per user and a catalog lookup per plant."""
+    for user_id in user_ids:
+        user = storage.get_user(user_id)
+        if not storage.get_preferences(user_id)["weekly_tips"]:
+            continue
+        with storage.connection() as conn:
+            rows = conn.execute("SELECT type, planted_at FROM plants WHERE user_id = ?", (user_id,)).fetchall()
+        lines = []
+        for plant_type, planted_at in rows:
+            plant = plants_db.get(plant_type, {})
+            ready_at = planted_at + plant.get("days_to_harvest", 60) * SECONDS_PER_DAY
+            lines.append(f"{plant.get('icon', '')} {plant.get('name', plant_type)}: "
+                         f"{'ready' if ready_at <= now else 'growing'}. {plant.get('tips', '')}")
+        yield Digest(user_id, user["email"], "Your garden this week", "\n".join(lines))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--plants", type=int, default=12, help="plants in the biggest gardens")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--fail-every", type=int, default=100)
+    parser.add_argument("--drop-every", type=int, default=500)
+    parser.add_argument("--backoff", type=float, default=0.05, help="first retry delay, seconds")
+    args = parser.parse_args()
+
+    plants_db = get_catalog().plants
+    now = int(time.time())
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "notify.db"))
+        t0 = time.perf_counter()
+        plants = seed(storage, args.users, args.plants, list(plants_db) + ["heirloom_squash"], now, rng)
+        print(f"seeded {args.users:,} users, {plants:,} plants in {time.perf_counter() - t0:.1f} s")
+
+        t0 = time.perf_counter()
+        sample = rng.sample(range(1, args.users + 1), min(SAMPLE, args.users))
+        count = sum(1 for _ in per_user_digests(storage, plants_db, now, sample))
+        per_user = (time.perf_counter() - t0) / len(sample)
+        print(f"build per user    {count:>7,} of a {len(sample):,} sample   "
+              f"{1 / per_user:>9,.0f} users/s  ~{per_user * args.users:6.1f} s for all")
+
+        t0 = time.perf_counter()
+        builder = DigestBuilder(plants_db, now)
+        count = sum(len(d.body) > 0 for d in weekly_digests(storage, builder, week_of(now)))
+        seconds = time.perf_counter() - t0
+        print(f"build one pass    {count:>7,} digests              "
+              f"{count / seconds:>9,.0f} users/s   {seconds:6.1f} s")
+
+        port = free_port()
+        sink = subprocess.Popen(
+            [sys.executable, "-u", "-m", "greenflow.mailsink", "--port", str(port),
+             "--fail-every", str(args.fail_every), "--drop-every", str(args.drop_every)],
+            cwd=ROOT, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            sink.stdout.readline()  # listening
+            pool = SMTPPool("127.0.0.1", port, size=args.workers)
+            dispatcher = Dispatcher(pool, args.workers, args.batch, backoff=args.backoff)
+            report = send_weekly_digests(storage, dispatcher, plants_db, now)
+            print(f"send              {report.sent:>7,} sent, {report.failed:,} failed, {report.retries:,} retries, "
+                  f"{pool.opened:,} connections  {report.per_second:>9,.0f} msgs/s   {report.seconds:6.1f} s")
+            again = send_weekly_digests(storage, dispatcher, plants_db, now)
+            print(f"same week again   {again.sent:>7,} sent                              {again.seconds:6.1f} s")
+            pool.close()
+        finally:
+            sink.terminate()
+            sink.wait()
+        storage.close()
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
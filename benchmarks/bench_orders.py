@@ -0,0 +1,98 @@
+"""Launch-day purchase spike: synchronous writes versus the batching order queue.
+
+    python benchmarks/bench_orders.py
+    python benchmarks/bench_orders.py --sessions 64 --clicks 200 --double-click 0.3
+
+Each session thread clicks "Buy" ``--clicks`` times; a ``--double-click``
+share of clicks is immediately repeated with the same idempotency key.
+"sync" commits every click in its own transaction on the clicking thread;
+"queue" calls :meth:`OrderQueue.submit` and lets the writer batch. Reported
+are per-click latency (what a Streamlit script thread waits) and the time
+until every order is on disk.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.orders import Order, OrderQueue  # noqa: E402
+from greenflow.storage import DEMO_EMAIL, Storage  # noqa: E402
+
+
+def spike(sessions, clicks, double_click, click):
+    """Run the click storm; returns (sorted latencies, wall seconds)."""
+    latencies, lock = [], threading.Lock()
+
+    def session(seed):
+        rng, local = random.Random(seed), []
+        for _ in range(clicks):
+            key = uuid.uuid4().hex
+            for _ in range(2 if rng.random() < double_click else 1):
+                t0 = time.perf_counter()
+                click(key)
+                local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sorted(latencies), time.perf_counter() - t0
+
+
+def report(label, latencies, wall, stored):
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000  # noqa: E731
+    print(f"{label:<6} clicks {len(latencies):>7,}  p50 {p(0.5):7.3f} ms  p99 {p(0.99):7.3f} ms  "
+          f"all durable after {wall:6.2f} s  orders stored {stored:,}")
+
+
+def count_orders(storage):
+    with storage.connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--clicks", type=int, default=100)
+    parser.add_argument("--double-click", type=float, default=0.2)
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    price = catalog.packages["starter"]["price"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("sync", "queue"):
+            storage = Storage(os.path.join(tmp, f"{label}.db"), catalog=catalog.plant_index)
+            storage.seed_demo()
+            user_id = storage.get_user_by_email(DEMO_EMAIL)["id"]
+
+            if label == "sync":
+                def click(key):
+                    storage.insert_orders([Order(key, user_id, {"starter": 1}, price, None, None)])
+                latencies, wall = spike(args.sessions, args.clicks, args.double_click, click)
+            else:
+                orders = OrderQueue(storage).start()
+                latencies, wall = spike(
+                    args.sessions, args.clicks, args.double_click,
+                    lambda key: orders.submit(key, user_id, {"starter": 1}, price),
+                )
+                t0 = time.perf_counter()
+                orders.stop()  # waits for the writer to drain
+                wall += time.perf_counter() - t0
+            report(label, latencies, wall, count_orders(storage))
+            storage.close()
+
+
+if __name__ == "__main__":
+    main()
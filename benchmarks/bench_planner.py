@@ -0,0 +1,66 @@
+"""Bulk quoting: hundreds of customer plant mixes in one batch call.
+
+    python benchmarks/bench_planner.py
+    python benchmarks/bench_planner.py --customers 2000 --max-plants 400
+
+"cold" builds a fresh planner per customer, so every quote recomputes its
+package covers from scratch, the way quoting one deal at a time did.
+"batch" quotes every mix through one planner with :meth:`quote_many`,
+sharing the memoized cover table and repeated mixes.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.planner import PackagePlanner  # noqa: E402
+
+
+def synthetic_mixes(n, plant_types, max_plants, rng):
+    mixes = []
+    for _ in range(n):
+        kinds = rng.choice(plant_types, size=rng.integers(1, len(plant_types) + 1), replace=False)
+        counts = rng.multinomial(int(rng.integers(1, max_plants + 1)), np.ones(len(kinds)) / len(kinds))
+        mixes.append({str(k): int(c) for k, c in zip(kinds, counts)})
+    return mixes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--max-plants", type=int, default=200, help="largest single order")
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    rng = np.random.default_rng(0)
+    mixes = synthetic_mixes(args.customers, list(catalog.plants), args.max_plants, rng)
+
+    t0 = time.perf_counter()
+    cold = [PackagePlanner(catalog.packages, catalog.plant_index).quote(mix) for mix in mixes]
+    cold_time = time.perf_counter() - t0
+
+    planner = PackagePlanner(catalog.packages, catalog.plant_index)
+    t0 = time.perf_counter()
+    batch = planner.quote_many(mixes)
+    batch_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    planner.quote_many(mixes)
+    warm_time = time.perf_counter() - t0
+
+    assert [q.total for q in cold] == [q.total for q in batch]
+    revenue = sum(q.total for q in batch)
+    print(f"customers:      {args.customers:,} (up to {args.max_plants} plants each), quoted ₹{revenue:,}")
+    print(f"cold, one by one: {cold_time * 1000:8.1f} ms  ({args.customers / cold_time:,.0f} quotes/s)")
+    print(f"quote_many:       {batch_time * 1000:8.1f} ms  ({args.customers / batch_time:,.0f} quotes/s)")
+    print(f"repeat batch:     {warm_time * 1000:8.1f} ms  (memoized mixes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Reservoir planning for commercial-scale gardens and catalogs.
+
+    python benchmarks/bench_reservoirs.py
+    python benchmarks/bench_reservoirs.py --types 100000 --plants 200000
+
+Compares :func:`plan_reservoirs` (greedy interval sweep) with the first-fit
+grouping installers do by hand: take plants one at a time and drop each into
+the first reservoir whose window it still overlaps. Both plans are checked
+for validity; the sweep's reservoir count is optimal.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.garden import PlantCatalog  # noqa: E402
+from greenflow.reservoirs import plan_reservoirs  # noqa: E402
+
+
+def synthetic_catalog(n_types, rng):
+    low = rng.uniform(4.5, 7.2, n_types).round(1)
+    width = rng.uniform(0.4, 1.5, n_types).round(1)
+    return PlantCatalog({
+        f"plant_{i}": {"name": f"Plant {i}", "ph": f"{lo:.1f}-{lo + w:.1f}", "days_to_harvest": 60}
+        for i, (lo, w) in enumerate(zip(low, width))
+    })
+
+
+def first_fit(type_code, catalog):
+    windows = []
+    for code in type_code.tolist():
+        lo, hi = catalog.ph_low[code], catalog.ph_high[code]
+        for g, (wlo, whi) in enumerate(windows):
+            if lo <= whi and hi >= wlo:
+                windows[g] = (max(lo, wlo), min(hi, whi))
+                break
+        else:
+            windows.append((lo, hi))
+    return windows
+
+
+def check(reservoirs, type_code, catalog):
+    seen = np.zeros(len(type_code), dtype=bool)
+    for r in reservoirs:
+        codes = type_code[r.rows]
+        assert r.ph_low <= r.ph_high
+        assert (catalog.ph_low[codes] <= r.ph_low).all() and (catalog.ph_high[codes] >= r.ph_high).all()
+        seen[r.rows] = True
+    assert seen.all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--types", type=int, default=10_000, help="catalog size")
+    parser.add_argument("--plants", type=int, default=50_000, help="plants in the garden")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t0 = time.perf_counter()
+    catalog = synthetic_catalog(args.types, rng)
+    parse = time.perf_counter() - t0
+    type_code = rng.integers(0, args.types, args.plants)
+
+    t0 = time.perf_counter()
+    reservoirs = plan_reservoirs(type_code, catalog)
+    sweep = time.perf_counter() - t0
+    check(reservoirs, type_code, catalog)
+
+    t0 = time.perf_counter()
+    by_hand = first_fit(type_code, catalog)
+    manual = time.perf_counter() - t0
+
+    print(f"catalog:       {args.types:,} types, pH parsed in {parse * 1000:.0f} ms")
+    print(f"sweep:         {args.plants:,} plants -> {len(reservoirs)} reservoirs in {sweep * 1000:.1f} ms")
+    print(f"first-fit:     {args.plants:,} plants -> {len(by_hand)} reservoirs in {manual * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-session memory with session-local data versus the shared Storage.
+
+    python benchmarks/bench_session_memory.py --sessions 10 100 1000
+
+"before" rebuilds what every session used to hold in st.session_state
+(its own users_db, user_garden and chat_history). "after" logs each session
+into the shared Storage, which leaves only the login in session state while
+gardens and chats stay in the database and the process-wide garden cache.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from greenflow.catalog import load_catalog  # noqa: E402
+from greenflow.storage import DEMO_EMAIL, Storage  # noqa: E402
+
+CHAT_TURNS = 20
+
+
+def session_before():
+    return {
+        "users_db": {DEMO_EMAIL: {"name": "Demo User", "password": "password123", "subscription": False}},
+        "logged_in": True,
+        "current_user": {"name": "Demo User", "password": "password123", "subscription": False},
+        "user_garden": [
+            {"type": "cherry_tomatoes", "planted_at": datetime.now() - timedelta(days=45)},
+            {"type": "lettuce", "planted_at": datetime.now() - timedelta(days=10)},
+            {"type": "basil", "planted_at": datetime.now() - timedelta(days=20)},
+        ],
+        "chat_history": [
+            {"role": "user" if i % 2 else "assistant", "content": f"message {i} " * 12}
+            for i in range(CHAT_TURNS)
+        ],
+    }
+
+
+def session_after(storage):
+    user = storage.get_user_by_email(DEMO_EMAIL)
+    user.pop("password")
+    storage.garden(user["id"])  # what the My Garden page touches
+    return {"logged_in": True, "current_user": user}
+
+
+def measure(make_session, n):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessions = [make_session() for _ in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del sessions
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "bench.db"), catalog=load_catalog().plant_index)
+        storage.seed_demo()
+        user_id = storage.get_user_by_email(DEMO_EMAIL)["id"]
+        for i in range(CHAT_TURNS):
+            storage.append_chat(user_id, "user" if i % 2 else "assistant", f"message {i} " * 12)
+
+        print(f"{'sessions':>9} {'before B/session':>17} {'after B/session':>16}")
+        for n in args.sessions:
+            t0 = time.perf_counter()
+            before = measure(session_before, n)
+            after = measure(lambda: session_after(storage), n)
+            print(f"{n:>9} {before / n:>17,.0f} {after / n:>16,.0f}   ({time.perf_counter() - t0:.2f}s)")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Marketing pages: transfer size and server CPU per request, raw send_file versus the built site.
+
+    python benchmarks/bench_site.py
+    python benchmarks/bench_site.py --requests 5000 --mbps 0.4
+
+"before" serves ``greenflow-v6.html`` with ``send_file`` the way ``/`` used
+to; "after" is :func:`greenflow.api.create_app` serving the output of
+:mod:`greenflow.site`. A first visit downloads the page and everything it
+references from us; a repeat visit revalidates the page with its ETag and,
+for the built site, reuses the immutable CSS/JS without asking. Transfer
+times are bodies only at ``--mbps``, ignoring round trips and headers.
+CDN fonts and Chart.js are the same for both and not counted.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask, send_file  # noqa: E402
+
+from greenflow.api import create_app  # noqa: E402
+from greenflow.site import SITE_PAGES, get_site  # noqa: E402
+
+BROWSER = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+def before_app():
+    app = Flask(__name__)
+
+    @app.get("/")
+    def index():
+        return send_file(os.path.join(ROOT, SITE_PAGES["/"]))
+
+    return app
+
+
+def visit(client, urls, etags=None):
+    """GET every url; returns (body bytes, {url: etag})."""
+    total, seen = 0, {}
+    for url in urls:
+        headers = dict(BROWSER)
+        if etags and url in etags:
+            headers["If-None-Match"] = etags[url]
+        response = client.get(url, headers=headers)
+        total += len(response.get_data())
+        seen[url] = response.headers.get("ETag")
+    return total, seen
+
+
+def cpu_per_request(client, url, headers, requests):
+    t0 = time.process_time()
+    for _ in range(requests):
+        client.get(url, headers=headers).close()
+    return (time.process_time() - t0) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--mbps", type=float, default=1.6, help="link speed for the transfer-time estimate")
+    args = parser.parse_args()
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    site = get_site()
+    assets = [url for url in site if url.startswith("/assets/greenflow-v6")]
+    seconds = lambda n: n * 8 / (args.mbps * 1e6)  # noqa: E731
+
+    for label, app, urls in (("before", before_app(), ["/"]), ("after", create_app(), ["/", *assets])):
+        client = app.test_client()
+        first, etags = visit(client, urls)
+        # Repeat visit: the page is revalidated; immutable assets aren't requested at all.
+        repeat, _ = visit(client, ["/"], etags)
+        full = cpu_per_request(client, "/", BROWSER, args.requests)
+        revalidate = cpu_per_request(client, "/", {**BROWSER, "If-None-Match": etags["/"]}, args.requests)
+        print(f"{label:<6} first visit {first:>7,} B ({seconds(first) * 1000:5.0f} ms)  "
+              f"repeat {repeat:>6,} B  CPU/request {full * 1e6:6.0f} µs full, {revalidate * 1e6:6.0f} µs 304")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Cold start and per-rerun time of the Streamlit apps, via Streamlit's AppTest.
+
+    python benchmarks/bench_startup.py app.py app2.py --reruns 20
+
+Cold start is the first run of the script in a fresh interpreter (imports,
+catalogs, shared resources). Per-rerun is the median/p90 of repeated reruns
+on each page of an already-warm session.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_COLD = """
+import time, sys
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+AppTest.from_file(sys.argv[1], default_timeout=60).run()
+print((time.perf_counter() - t1) * 1000)
+"""
+
+
+def cold_start(app, samples):
+    times = []
+    for _ in range(samples):
+        out = subprocess.run(
+            [sys.executable, "-c", _COLD, os.path.join(ROOT, app)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def login(at):
+    """Log the demo account in if the app starts on a login form."""
+    if at.sidebar.radio:
+        return
+    at.text_input[0].input("demo@greenflow.com")
+    at.text_input[1].input("password123")
+    at.button[0].click().run()
+
+
+def reruns(app, count):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, app), default_timeout=60).run()
+    login(at)
+    results = {}
+    for page in at.sidebar.radio[0].options:
+        at.sidebar.radio[0].set_value(page).run()
+        times = []
+        for _ in range(count):
+            t0 = time.perf_counter()
+            at.run()
+            times.append((time.perf_counter() - t0) * 1000)
+        if at.exception:
+            raise RuntimeError(f"{app} {page}: {at.exception}")
+        times.sort()
+        results[page] = (statistics.median(times), times[int(0.9 * (len(times) - 1))])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("apps", nargs="*", default=["app.py", "app2.py"])
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--cold-samples", type=int, default=3)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    report = {}
+    for app in args.apps:
+        cold = cold_start(app, args.cold_samples)
+        pages = reruns(app, args.reruns)
+        report[app] = {"cold_ms": statistics.median(cold), "pages": pages}
+        print(f"{app}: cold start {statistics.median(cold):.0f} ms (median of {len(cold)})")
+        for page, (p50, p90) in pages.items():
+            print(f"    {page:<16} rerun p50 {p50:6.1f} ms   p90 {p90:6.1f} ms")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
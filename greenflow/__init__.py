@@ -0,0 +1 @@
+"""Shared building blocks for the GreenFlow Streamlit apps."""
@@ -0,0 +1,19 @@
+"""Email address checks shared by sign-up and the mail dispatcher.
+
+Addresses are written into message headers as stored, so only a single
+bare ``local@domain`` mailbox is accepted: no display name, no list, no
+whitespace or control characters (a CR/LF would start a new header).
+"""
+from email.utils import parseaddr
+
+MAX_ADDRESS_LENGTH = 254
+
+
+def valid_address(address):
+    """Whether ``address`` is one bare ``local@domain`` mailbox, safe to write into a ``To:`` header as is."""
+    if not isinstance(address, str) or len(address) > MAX_ADDRESS_LENGTH:
+        return False
+    if not address.isprintable() or any(c.isspace() for c in address):
+        return False
+    local, _, domain = address.rpartition("@")
+    return bool(local and domain) and parseaddr(address)[1] == address
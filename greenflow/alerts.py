@@ -0,0 +1,236 @@
+"""Streaming alert rules over live sensor samples.
+
+Rules are either thresholds on a reading or thresholds on its rate of change
+(a per-minute slope, exponentially smoothed over about ``RATE_WINDOW``
+seconds whatever the sample rate). Both kinds clear only once the
+metric is back inside the limits by a ``hysteresis`` margin, so a reading
+hovering at the edge does not flap. All per-garden state (last reading,
+smoothed rates, active flags, last firing time and per-garden limits) lives
+in ``(gardens, rules)`` NumPy arrays, and a feeder tick is evaluated for
+every garden at once: constant work per sample, no Python loop per rule.
+
+A rule fires on the transition into the active state, and a re-trigger
+within ``cooldown`` seconds of its previous firing is suppressed, which
+de-duplicates both repeated samples and flapping sensors.
+"""
+import logging
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from greenflow import metrics
+from greenflow.telemetry import SENSOR_INDEX, SENSORS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COOLDOWN = 15 * 60
+RATE_WINDOW = 60.0  # seconds; time constant of the smoothed rate of change
+
+Rule = namedtuple("Rule", "name sensor kind low high hysteresis severity message")
+Alert = namedtuple("Alert", "garden_id rule severity since value message")
+
+# Plant-specific pH limits replace the ``ph_window`` defaults per garden.
+DEFAULT_RULES = (
+    Rule("tank_low", "water_level", "threshold", 35.0, np.inf, 5.0, "warning",
+         "Tank water level is at {value:.0f}%. Consider refilling soon."),
+    Rule("tank_draining", "water_level", "rate", -2.0, np.inf, 0.5, "warning",
+         "Tank level is falling {value:+.1f}%/min. Check for leaks."),
+    Rule("ph_window", "ph", "threshold", 5.5, 6.5, 0.1, "warning",
+         "Water pH {value:.1f} is outside {low:.1f}-{high:.1f} for your plants."),
+    Rule("ph_swing", "ph", "rate", -0.5, 0.5, 0.1, "warning",
+         "Water pH is moving fast ({value:+.2f}/min). Check the dosing pump."),
+    Rule("ec_range", "tds", "threshold", 400.0, 1400.0, 50.0, "warning",
+         "TDS / EC at {value:.0f} ppm is outside {low:.0f}-{high:.0f} ppm."),
+    Rule("temperature_range", "temperature", "threshold", 16.0, 30.0, 1.0, "error",
+         "Water temperature {value:.1f}°C is outside {low:.0f}-{high:.0f}°C."),
+)
+
+
+def ph_window(type_codes, catalog):
+    """pH limits suiting every plant type in ``type_codes`` (a :class:`PlantCatalog`'s codes).
+
+    The overlap of the plants' ranges, or their span if they don't overlap.
+    ``None`` if no plant has a usable range.
+    """
+    codes = np.unique(np.asarray(type_codes, dtype=np.int64))
+    lows, highs = catalog.ph_low[codes], catalog.ph_high[codes]
+    known = ~np.isnan(lows)
+    if not known.any():
+        return None
+    lows, highs = lows[known], highs[known]
+    if lows.max() <= highs.min():
+        return float(lows.max()), float(highs.min())
+    return float(lows.min()), float(highs.max())
+
+
+class AlertEngine:
+    """Evaluates :class:`Rule` s for many gardens over batches of samples."""
+
+    def __init__(self, rules=DEFAULT_RULES, capacity=64, cooldown=DEFAULT_COOLDOWN):
+        self.rules = tuple(rules)
+        self.rule_index = {rule.name: i for i, rule in enumerate(self.rules)}
+        self.cooldown = cooldown
+        self._sensor = np.array([SENSOR_INDEX[r.sensor] for r in self.rules])
+        self._is_rate = np.array([r.kind == "rate" for r in self.rules])
+        self._hysteresis = np.array([r.hysteresis for r in self.rules], dtype=np.float64)
+        self._default_low = np.array([r.low for r in self.rules], dtype=np.float64)
+        self._default_high = np.array([r.high for r in self.rules], dtype=np.float64)
+
+        self._slots = {}  # garden_id -> row in the state arrays
+        self._garden_ids = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        n_rules = len(self.rules)
+        self._last = np.full((capacity, len(SENSORS)), np.nan)
+        self._last_ts = np.zeros(capacity, dtype=np.int64)
+        self._rate = np.full((capacity, n_rules), np.nan)
+        self._value = np.full((capacity, n_rules), np.nan)
+        self._low = np.tile(self._default_low, (capacity, 1))
+        self._high = np.tile(self._default_high, (capacity, 1))
+        self._active = np.zeros((capacity, n_rules), dtype=bool)
+        self._since = np.zeros((capacity, n_rules), dtype=np.int64)
+        self._fired_at = np.full((capacity, n_rules), np.iinfo(np.int64).min // 2, dtype=np.int64)
+
+    def _grow(self):
+        old = len(self._last_ts)
+        arrays = {name: getattr(self, name) for name in (
+            "_last", "_last_ts", "_rate", "_value", "_low", "_high", "_active", "_since", "_fired_at")}
+        self._allocate(2 * old)
+        for name, values in arrays.items():
+            getattr(self, name)[:old] = values
+
+    def _slot(self, garden_id):
+        slot = self._slots.get(garden_id)
+        if slot is None:
+            slot = self._slots[garden_id] = len(self._garden_ids)
+            self._garden_ids.append(garden_id)
+            if slot >= len(self._last_ts):
+                self._grow()
+        return slot
+
+    # --- Configuration ---
+    def set_limits(self, garden_id, rule, low, high):
+        """Override one rule's limits for one garden (e.g. its plants' pH window)."""
+        with self._lock:
+            slot, i = self._slot(garden_id), self.rule_index[rule]
+            self._low[slot, i], self._high[slot, i] = low, high
+
+    def reset_limits(self, garden_id, rule):
+        """Back to ``rule``'s defaults for one garden."""
+        i = self.rule_index[rule]
+        self.set_limits(garden_id, rule, self._default_low[i], self._default_high[i])
+
+    def subscribe(self, listener):
+        """Call ``listener(alerts)`` with every batch of newly fired alerts."""
+        self._listeners.append(listener)
+
+    # --- Evaluation ---
+    def process(self, garden_ids, ts, values):
+        """Evaluate one sample per garden; ``garden_ids`` must be distinct.
+
+        ``values`` has shape ``(len(garden_ids), len(SENSORS))``. Returns the
+        alerts that fired.
+        """
+        ts = np.asarray(ts, dtype=np.int64).reshape(-1)
+        values = np.asarray(values, dtype=np.float64).reshape(len(ts), -1)
+        with self._lock:
+            slots = np.fromiter((self._slot(g) for g in garden_ids), np.int64, len(ts))
+            x = values[:, self._sensor]
+            dt = (ts - self._last_ts[slots]).astype(np.float64)[:, None]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                slope = np.where(dt > 0, (x - self._last[slots][:, self._sensor]) * 60.0 / dt, np.nan)
+            weight = -np.expm1(-np.maximum(dt, 0.0) / RATE_WINDOW)
+            prev_rate = self._rate[slots]
+            # A garden's first slope is blended with zero, not trusted outright.
+            rate = np.where(np.isnan(slope), prev_rate, weight * slope + (1 - weight) * np.nan_to_num(prev_rate))
+            metric = np.where(self._is_rate, rate, x)
+
+            low, high, active = self._low[slots], self._high[slots], self._active[slots]
+            with np.errstate(invalid="ignore"):
+                breach = (metric < low) | (metric > high)
+                clear = (metric >= low + self._hysteresis) & (metric <= high - self._hysteresis)
+            now_active = np.where(active, ~clear, breach)
+            rising = now_active & ~active
+            fire = rising & (ts[:, None] - self._fired_at[slots] >= self.cooldown)
+
+            self._last[slots] = values
+            self._last_ts[slots] = ts
+            self._rate[slots] = rate
+            self._value[slots] = metric
+            self._active[slots] = now_active
+            self._since[slots] = np.where(rising, ts[:, None], self._since[slots])
+            self._fired_at[slots] = np.where(fire, ts[:, None], self._fired_at[slots])
+
+            rows, cols = np.nonzero(fire)
+            alerts = [
+                self._alert(self._garden_ids[slots[r]], c, int(ts[r]), metric[r, c], low[r, c], high[r, c])
+                for r, c in zip(rows.tolist(), cols.tolist())
+            ]
+        if alerts:
+            for listener in self._listeners:
+                try:
+                    listener(alerts)
+                except Exception:
+                    logger.exception("alert listener failed")
+        return alerts
+
+    def ingest(self, batches):
+        """Evaluate ``{garden_id: (ts, values)}`` as produced by a feeder tick.
+
+        Multi-row batches are replayed row by row, all gardens at a time.
+        """
+        if not batches:
+            return []
+        garden_ids = list(batches)
+        depth = max(len(ts) for ts, _ in batches.values())
+        alerts = []
+        for k in range(depth):
+            ids = [g for g in garden_ids if k < len(batches[g][0])]
+            ts = [batches[g][0][k] for g in ids]
+            values = np.stack([np.asarray(batches[g][1])[k] for g in ids])
+            alerts.extend(self.process(ids, ts, values))
+        return alerts
+
+    # --- Queries ---
+    def _alert(self, garden_id, i, since, value, low, high):
+        rule = self.rules[i]
+        return Alert(garden_id, rule.name, rule.severity, since, float(value),
+                     rule.message.format(value=value, low=low, high=high))
+
+    def active(self, garden_id):
+        """Alerts currently raised for ``garden_id``, in rule order."""
+        with self._lock:
+            slot = self._slots.get(garden_id)
+            if slot is None:
+                return []
+            return [
+                self._alert(garden_id, i, int(self._since[slot, i]), self._value[slot, i],
+                            self._low[slot, i], self._high[slot, i])
+                for i in np.flatnonzero(self._active[slot]).tolist()
+            ]
+
+
+def sms_relay(storage, send=None):
+    """Listener texting water-level alerts to users who enabled SMS alerts.
+
+    ``send(user, text)`` defaults to logging the message; plug a gateway in
+    there. Every user watches the shared demo tower, so recipients are all
+    opted-in users.
+    """
+    send = send or (lambda user, text: logger.info("SMS to %s: %s", user["email"], text))
+
+    def relay(alerts):
+        water = [a for a in alerts if a.rule.startswith("tank_")]
+        if not water:
+            return
+        users = storage.users_opted_in("sms_water_alerts")
+        for user in users:
+            for alert in water:
+                send(user, alert.message)
+        metrics.NOTIFICATIONS.inc(len(users) * len(water), channel="sms", result="sent")
+
+    return relay
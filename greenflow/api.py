@@ -0,0 +1,443 @@
+"""Headless JSON API over the same storage, auth and catalogs as the Streamlit apps.
+
+Clients log in with ``POST /api/login`` and send the returned token as
+``Authorization: Bearer <token>``. The catalog endpoints are serialized once
+per catalog version and served with an ETag so repeat requests cost a
+header comparison and a ``304``. The marketing pages and their assets are
+built once per process by :mod:`greenflow.site` and served from memory.
+Every request is counted and timed per route; ``GET /metrics`` exports the
+process's metrics to loopback clients and the field team.
+"""
+import codecs
+import hashlib
+import hmac
+import json
+import math
+import os
+import threading
+import time
+
+import numpy as np
+from flask import Flask, Response, g, jsonify, request
+
+from greenflow import metrics
+from greenflow.auth import AuthBusy
+from greenflow.bulk import FORMATS, MIMETYPES, export_history, export_plants, import_plants, parse_planted_at
+from greenflow.catalog import get_catalog
+from greenflow.core import get_authenticator, get_bot_response, get_chat_limiter, get_orders, get_storage
+from greenflow.garden import SECONDS_PER_DAY
+from greenflow.site import ASSET_PREFIX, get_site
+
+CATALOG_MAX_AGE = 300
+GARDEN_PAGE_LIMIT = 500
+HARVEST_MAX_DAYS = 90
+OPS_KEY = os.environ.get("GREENFLOW_OPS_KEY")  # field-team endpoints are off without it
+LOOPBACK = ("127.0.0.1", "::1")
+
+
+def _error(message, status):
+    return jsonify({"error": message}), status
+
+
+def _json_object():
+    """The request body if it is a JSON object, else ``None`` (missing, malformed or another JSON type)."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
+
+def _is_count(value):
+    """A JSON integer; ``True``/``False`` are ints in Python but not counts."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+# ==========================================
+# PRE-SERIALIZED CATALOG RESPONSES
+# ==========================================
+_serialized = {}
+_serialized_lock = threading.Lock()
+
+
+def _catalog_body(name):
+    """``(body, etag)`` for a catalog section, rebuilt only when the catalog reloads."""
+    catalog = get_catalog()
+    key = (name, catalog.mtime)
+    cached = _serialized.get(key)
+    if cached is None:
+        payload = {"version": catalog.version, name: getattr(catalog, name)}
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        cached = (body, hashlib.sha1(body).hexdigest())
+        with _serialized_lock:
+            for stale in [k for k in _serialized if k[0] == name]:
+                del _serialized[stale]
+            _serialized[key] = cached
+    return cached
+
+
+def _cached_json(name):
+    body, etag = _catalog_body(name)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={CATALOG_MAX_AGE}"
+    return response
+
+
+def _site_file(url):
+    """A built page or asset, gzipped when the client accepts it, ``304`` when unchanged."""
+    asset = get_site().get(url)
+    if asset is None:
+        return _error("not found", 404)
+    if request.if_none_match.contains(asset.etag):
+        response = Response(status=304)
+    elif asset.gzip is not None and request.accept_encodings["gzip"]:
+        response = Response(asset.gzip, mimetype=asset.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(asset.body, mimetype=asset.mimetype)
+    response.set_etag(asset.etag)
+    response.headers["Cache-Control"] = asset.cache_control
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# ==========================================
+# AUTH HELPERS
+# ==========================================
+def _bearer_token():
+    header = request.headers.get("Authorization", "")
+    return header[7:] if header.startswith("Bearer ") else None
+
+
+def _require_user():
+    """Resolve the bearer token into ``g.user``; returns an error response or ``None``."""
+    g.user = get_authenticator().validate(_bearer_token())
+    if g.user is None:
+        return _error("authentication required", 401)
+    return None
+
+
+def _require_ops():
+    supplied = request.headers.get("X-Ops-Key", "")
+    if not OPS_KEY or not hmac.compare_digest(supplied.encode("utf-8"), OPS_KEY.encode("utf-8")):
+        return _error("operations key required", 403)
+    return None
+
+
+def _order_json(order):
+    return {
+        "id": order.id, "key": order.key.split(":", 1)[1], "status": order.status,
+        "packages": order.items, "total": order.total,
+    }
+
+
+def _system_json(system):
+    window = {} if math.isnan(system.ph_low) else {"ph_low": system.ph_low, "ph_high": system.ph_high}
+    return {"package": system.package, "plants": system.plants, "ph_low": None, "ph_high": None, **window}
+
+
+def _garden_json(user_id, offset=0, limit=GARDEN_PAGE_LIMIT):
+    plants_db = get_catalog().plants
+    garden = get_storage().garden(user_id)
+    status = garden.status()
+    rows = range(offset, min(len(garden), offset + limit))
+    return {
+        "id": user_id,
+        "plants_count": len(garden),
+        "ready_count": int(status.ready.sum()),
+        "offset": offset,
+        "plants": [
+            {
+                "type": garden.plant_type(i),
+                "name": plants_db.get(garden.plant_type(i), {}).get("name", "Unknown"),
+                "planted_at": int(garden.planted_at[i]),
+                "days_passed": int(status.days_passed[i]),
+                "total_days": int(status.total_days[i]),
+                "progress": round(float(status.progress[i]), 4),
+                "days_left": int(status.days_left[i]),
+                "ready": bool(status.ready[i]),
+            }
+            for i in rows
+        ],
+    }
+
+
+def create_app():
+    app = Flask(__name__)
+    app.json.ensure_ascii = False
+
+    # --- Metrics ---
+    if metrics.ENABLED:
+        @app.before_request
+        def start_timer():
+            g.started = time.perf_counter()
+
+        @app.after_request
+        def record(response):
+            # The rule, not the path, so /api/orders/<key> stays one series.
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - g.started, route=route)
+            metrics.HTTP_REQUESTS.inc(route=route, status=str(response.status_code))
+            return response
+
+    @app.get("/metrics")
+    def metrics_text():
+        if request.remote_addr not in LOOPBACK and (error := _require_ops()) is not None:
+            return error
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+    # --- Site ---
+    @app.get("/")
+    @app.get("/haryali")
+    def index():
+        return _site_file(request.path)
+
+    @app.get(f"{ASSET_PREFIX}<name>")
+    def asset(name):
+        return _site_file(request.path)
+
+    # --- Catalogs ---
+    @app.get("/api/plants")
+    def plants():
+        return _cached_json("plants")
+
+    @app.get("/api/packages")
+    def packages():
+        return _cached_json("packages")
+
+    @app.post("/api/quotes")
+    def quotes():
+        """Low-cost packages for each ``{"mix": {plant_type: count}}`` in ``orders``."""
+        if (data := _json_object()) is None:
+            return _error("the request body must be a JSON object", 400)
+        orders = data.get("orders")
+        if not isinstance(orders, list) or not all(
+            isinstance(o, dict) and isinstance(o.get("mix"), dict)
+            and all(_is_count(n) and n >= 0 for n in o["mix"].values())
+            for o in orders
+        ):
+            return _error('orders must be a list of {"mix": {plant_type: count}} with whole counts', 400)
+        try:
+            results = get_catalog().planner.quote_many([o["mix"] for o in orders])
+        except (TypeError, ValueError) as exc:
+            return _error(str(exc), 400)
+        return jsonify({"quotes": [
+            {"total": q.total, "packages": q.packages, "systems": [_system_json(s) for s in q.systems]}
+            for q in results
+        ]})
+
+    # --- Accounts ---
+    @app.post("/api/register")
+    def register():
+        if (data := _json_object()) is None:
+            return _error("the request body must be a JSON object", 400)
+        email, name, password = data.get("email"), data.get("name"), data.get("password")
+        if not all(isinstance(v, str) and v for v in (email, name, password)):
+            return _error("email, name and password are required strings", 400)
+        try:
+            user_id = get_authenticator().register(email, name, password)
+        except ValueError as exc:
+            return _error(str(exc), 400)
+        except AuthBusy:
+            return _error("too many requests, retry shortly", 503)
+        if user_id is None:
+            return _error("user already exists", 409)
+        return jsonify({"id": user_id}), 201
+
+    @app.post("/api/login")
+    def login():
+        if (data := _json_object()) is None:
+            return _error("the request body must be a JSON object", 400)
+        email, password = data.get("email", ""), data.get("password", "")
+        if not isinstance(email, str) or not isinstance(password, str):
+            return _error("email and password must be strings", 400)
+        try:
+            token = get_authenticator().login(email, password)
+        except AuthBusy:
+            return _error("too many requests, retry shortly", 503)
+        if token is None:
+            return _error("invalid email or password", 401)
+        return jsonify({"token": token, "user": get_authenticator().validate(token)})
+
+    @app.get("/api/user")
+    def user():
+        return _require_user() or jsonify(g.user)
+
+    @app.post("/api/logout")
+    def logout():
+        get_authenticator().revoke(_bearer_token())
+        return jsonify({"ok": True})
+
+    @app.post("/api/subscribe")
+    def subscribe():
+        if (error := _require_user()) is not None:
+            return error
+        storage, auth = get_storage(), get_authenticator()
+        storage.set_subscription(g.user["id"], True)
+        # Tokens cache the user dict, so swap in one that carries the new plan.
+        auth.revoke(_bearer_token())
+        token = auth.issue_token(storage.get_user(g.user["id"]))
+        return jsonify({"token": token, "user": auth.validate(token)})
+
+    # --- Orders ---
+    @app.post("/api/orders")
+    def place_order():
+        """Queue an order; retries with the same ``Idempotency-Key`` return the same order."""
+        if (error := _require_user()) is not None:
+            return error
+        key = request.headers.get("Idempotency-Key", "").strip()
+        if not key or len(key) > 128:
+            return _error("an Idempotency-Key header (up to 128 chars) is required", 400)
+        if (data := _json_object()) is None:
+            return _error("the request body must be a JSON object", 400)
+        items = data.get("packages")
+        packages = get_catalog().packages
+        if not isinstance(items, dict) or not items or any(
+            k not in packages or not _is_count(n) or n < 1 for k, n in items.items()
+        ):
+            return _error("packages must map package keys to positive quantities", 400)
+        total = sum(packages[k]["price"] * n for k, n in items.items())
+        # Scope keys per user so one client can't read another's order by guessing.
+        order = get_orders().submit(f"{g.user['id']}:{key}", g.user["id"], items, total)
+        return jsonify(_order_json(order)), 202 if order.id is None else 200
+
+    @app.get("/api/orders/<key>")
+    def order_status(key):
+        if (error := _require_user()) is not None:
+            return error
+        order = get_orders().status(f"{g.user['id']}:{key}")
+        if order is None:
+            return _error("no such order", 404)
+        return jsonify(_order_json(order))
+
+    # --- Garden ---
+    @app.post("/api/garden/create")
+    def garden_create():
+        if (error := _require_user()) is not None:
+            return error
+        if (data := _json_object()) is None:
+            return _error("the request body must be a JSON object", 400)
+        plants_db = get_catalog().plants
+        plants = data.get("plants") or []
+        if not isinstance(plants, list) or not plants or any(
+            not isinstance(p, dict) or not isinstance(p.get("type"), str) or p["type"] not in plants_db
+            for p in plants
+        ):
+            return _error("plants must be a non-empty list of known plant types", 400)
+        now = int(time.time())
+        try:
+            planted_at = [parse_planted_at(p.get("planted_at"), now) for p in plants]
+        except (ValueError, OverflowError) as exc:
+            return _error(str(exc), 400)
+        get_storage().add_plants(g.user["id"], [p["type"] for p in plants], planted_at)
+        return jsonify(_garden_json(g.user["id"])), 201
+
+    @app.get("/api/garden/<int:garden_id>")
+    def garden(garden_id):
+        if (error := _require_user()) is not None:
+            return error
+        if garden_id != g.user["id"]:
+            return _error("not your garden", 403)
+        offset = max(0, request.args.get("offset", 0, type=int))
+        limit = min(GARDEN_PAGE_LIMIT, max(1, request.args.get("limit", GARDEN_PAGE_LIMIT, type=int)))
+        return jsonify(_garden_json(garden_id, offset, limit))
+
+    @app.get("/api/garden/<int:garden_id>/history")
+    def garden_history(garden_id):
+        """Plant count per day it changed, and harvest yield per plant type."""
+        if (error := _require_user()) is not None:
+            return error
+        if garden_id != g.user["id"]:
+            return _error("not your garden", 403)
+        storage = get_storage()
+        return jsonify({
+            "id": garden_id,
+            "growth": [{"day": point.day, "plants": point.plants} for point in storage.growth_history(garden_id)],
+            "harvested": {
+                plant_type: {"harvests": totals.harvests, "grams": totals.grams}
+                for plant_type, totals in storage.harvest_yield(garden_id).items()
+            },
+        })
+
+    @app.post("/api/garden/import")
+    def garden_import():
+        """Stream CSV or JSON lines (``?format=``, or from the Content-Type) into the caller's garden."""
+        if (error := _require_user()) is not None:
+            return error
+        fmt = request.args.get("format") or (
+            "jsonl" if request.mimetype in ("application/x-ndjson", "application/jsonl") else "csv"
+        )
+        if fmt not in FORMATS:
+            return _error(f"format must be one of {', '.join(FORMATS)}", 400)
+        try:
+            report = import_plants(get_storage(), g.user["id"], codecs.iterdecode(request.stream, "utf-8-sig"), fmt)
+        except (UnicodeDecodeError, ValueError) as exc:
+            return _error(str(exc), 400)
+        return jsonify({
+            "rows": report.rows, "plants": report.plants, "rejected": report.rejected,
+            "errors": [{"line": line, "message": message} for line, message in report.errors],
+            "seconds": round(report.seconds, 3), "rows_per_second": round(report.rows_per_second),
+        })
+
+    @app.get("/api/garden/<int:garden_id>/export")
+    def garden_export(garden_id):
+        """The garden's plants, or its event log with ``?what=history``, streamed as CSV or JSON lines."""
+        if (error := _require_user()) is not None:
+            return error
+        if garden_id != g.user["id"]:
+            return _error("not your garden", 403)
+        fmt, what = request.args.get("format", "csv"), request.args.get("what", "plants")
+        if fmt not in FORMATS or what not in ("plants", "history"):
+            return _error("format must be csv or jsonl and what plants or history", 400)
+        export = export_history if what == "history" else export_plants
+        return Response(export(get_storage(), garden_id, fmt), mimetype=MIMETYPES[fmt], headers={
+            "Content-Disposition": f'attachment; filename="garden-{garden_id}-{what}.{fmt}"',
+        })
+
+    # --- Field team ---
+    @app.get("/api/harvest/upcoming")
+    def harvest_upcoming():
+        """Customers with plants ripening in the next ``days`` days, for visit scheduling."""
+        if (error := _require_ops()) is not None:
+            return error
+        days = min(HARVEST_MAX_DAYS, max(0, request.args.get("days", 7, type=int)))
+        overdue = request.args.get("overdue", "0") == "1"
+        window = get_storage().harvest_calendar().upcoming(days, overdue=overdue)
+        users, first, counts = np.unique(window.user_id, return_index=True, return_counts=True)
+        visits = sorted(
+            zip(window.ready_day[first].tolist(), users.tolist(), counts.tolist())
+        )
+        return jsonify({
+            "days": days,
+            "plants": len(window.plant_id),
+            "visits": [
+                {"user_id": uid, "plants": count,
+                 "first_ready": time.strftime("%Y-%m-%d", time.gmtime(day * SECONDS_PER_DAY))}
+                for day, uid, count in visits
+            ],
+        })
+
+    # --- Assistant ---
+    @app.post("/api/chat")
+    def chat():
+        if (error := _require_user()) is not None:
+            return error
+        if (data := _json_object()) is None:
+            return _error("the request body must be a JSON object", 400)
+        message = data.get("message")
+        if not isinstance(message, str) or not message.strip():
+            return _error("message is required", 400)
+        message = message.strip()
+        if wait := get_chat_limiter().take(g.user["id"]):
+            metrics.CHAT_RATE_LIMITED.inc()
+            response, status = _error("too many messages, slow down", 429)
+            response.headers["Retry-After"] = str(math.ceil(wait))
+            return response, status
+        response = get_bot_response(message)
+        storage = get_storage()
+        storage.append_chat(g.user["id"], "user", message)
+        storage.append_chat(g.user["id"], "assistant", response)
+        return jsonify({"response": response})
+
+    return app
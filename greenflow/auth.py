@@ -0,0 +1,197 @@
+"""Password hashing and signed session tokens.
+
+Passwords are hashed with salted scrypt on a small, bounded worker pool so a
+burst of logins costs at most ``workers`` cores and never runs on the
+Streamlit script thread that other sessions' reruns share the GIL with
+(scrypt itself releases the GIL). A successful login returns an HMAC-signed
+token; later reruns validate it from an in-process cache instead of
+re-checking credentials.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from greenflow import metrics
+from greenflow.addresses import valid_address
+
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+TOKEN_TTL = 30 * 60
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+LOGIN_TIMEOUT = 10.0
+TOKEN_CACHE_SIZE = 10_000
+
+
+class AuthBusy(Exception):
+    """Raised when the hashing pool already has ``max_pending`` jobs queued, or a job outlives its timeout."""
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Return ``scrypt$n$r$p$salt$key`` for storage in ``users.password``."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, dklen=KEY_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def is_hashed(stored):
+    return stored.startswith("scrypt$")
+
+
+def verify_password(password, stored):
+    """Check ``password`` against a stored hash (or a legacy plaintext value)."""
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    _, n, r, p, salt, key = stored.split("$")
+    expected = _unb64(key)
+    actual = hashlib.scrypt(
+        password.encode("utf-8"), salt=_unb64(salt), n=int(n), r=int(r), p=int(p), dklen=len(expected)
+    )
+    return hmac.compare_digest(actual, expected)
+
+
+class Authenticator:
+    """Logins, registrations and session tokens on top of :class:`~greenflow.storage.Storage`."""
+
+    def __init__(self, storage, secret=None, workers=DEFAULT_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, token_ttl=TOKEN_TTL):
+        self.storage = storage
+        env_secret = os.environ.get("GREENFLOW_SECRET")
+        self._secret = secret or (env_secret.encode("utf-8") if env_secret else secrets.token_bytes(32))
+        self.token_ttl = token_ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="greenflow-auth")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._tokens = {}  # token -> (user, expires_at)
+        self._revoked = {}  # token -> expires_at, until it would have expired anyway
+        self._tokens_lock = threading.Lock()
+        self._dummy_hash = hash_password(secrets.token_hex(8))
+
+    # --- Worker pool ---
+    def _submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise AuthBusy("too many logins in flight")
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, timeout, fn, *args):
+        try:
+            return self._submit(fn, *args).result(timeout)
+        except FutureTimeout:
+            raise AuthBusy("the hashing pool is stalled") from None
+
+    def login(self, email, password, timeout=LOGIN_TIMEOUT):
+        """Verify credentials off-thread; returns a session token or ``None``."""
+        try:
+            with metrics.timer(metrics.STEP_SECONDS, step="login"):
+                token = self._run(timeout, self._login, email, password)
+        except AuthBusy:
+            metrics.LOGINS.inc(result="busy")
+            raise
+        metrics.LOGINS.inc(result="success" if token else "failure")
+        return token
+
+    def register(self, email, name, password, timeout=LOGIN_TIMEOUT):
+        """Hash off-thread and create the user; returns the id or ``None`` if taken.
+
+        Raises ``ValueError`` if ``email`` isn't a single plain address, so
+        nothing that could break a mail header gets stored. On a timeout the
+        job is not cancelled, so the account may still be created; retrying
+        then finds the email taken.
+        """
+        if not valid_address(email):
+            raise ValueError("not a valid email address")
+        return self._run(timeout, self._register, email, name, password)
+
+    def _login(self, email, password):
+        user = self.storage.get_user_by_email(email)
+        if user is None:
+            # Burn the same work as a real check so timing doesn't reveal unknown emails.
+            verify_password(password, self._dummy_hash)
+            return None
+        if not verify_password(password, user["password"]):
+            return None
+        if not is_hashed(user["password"]):
+            self.storage.set_password(user["id"], hash_password(password))
+        return self.issue_token(user)
+
+    def _register(self, email, name, password):
+        return self.storage.create_user(email, name, hash_password(password))
+
+    # --- Tokens ---
+    def _sign(self, payload):
+        return _b64(hmac.new(self._secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue_token(self, user):
+        expires_at = int(time.time()) + self.token_ttl
+        payload = f"{user['id']}.{expires_at}.{_b64(secrets.token_bytes(9))}"
+        token = f"{payload}.{self._sign(payload)}"
+        self._remember(token, user, expires_at)
+        return token
+
+    def _remember(self, token, user, expires_at):
+        public = {k: v for k, v in user.items() if k != "password"}
+        with self._tokens_lock:
+            if len(self._tokens) >= TOKEN_CACHE_SIZE:
+                now = time.time()
+                self._tokens = {t: e for t, e in self._tokens.items() if e[1] > now}
+            self._tokens[token] = (public, expires_at)
+        return public
+
+    def validate(self, token):
+        """User dict for a live token, or ``None`` if missing, forged or expired."""
+        if not token:
+            return None
+        cached = self._tokens.get(token)
+        now = time.time()
+        if cached is not None:
+            if cached[1] > now:
+                return cached[0]
+            self.revoke(token)
+            return None
+
+        # Cache miss (e.g. evicted): fall back to the signature, not the password.
+        try:
+            payload, signature = token.rsplit(".", 1)
+            user_id, expires_at, _ = payload.split(".")
+            expires_at = int(expires_at)
+        except ValueError:
+            return None
+        if expires_at <= now or token in self._revoked:
+            return None
+        if not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        user = self.storage.get_user(int(user_id))
+        if user is None:
+            return None
+        return self._remember(token, user, expires_at)
+
+    def revoke(self, token):
+        """Invalidate ``token`` (logout) for the rest of its lifetime."""
+        if not token:
+            return
+        with self._tokens_lock:
+            cached = self._tokens.pop(token, None)
+            now = time.time()
+            if len(self._revoked) >= TOKEN_CACHE_SIZE:
+                self._revoked = {t: e for t, e in self._revoked.items() if e > now}
+            self._revoked[token] = cached[1] if cached else now + self.token_ttl
+
@@ -0,0 +1,98 @@
+"""Expert consultation slots: capacity per day and time slot, atomic booking.
+
+Every (day, slot) pair is numbered ``day.toordinal() * len(SLOTS) + slot``,
+so the calendar is one line of integers. Full slots are linked into a
+disjoint-set forest pointing at the next slot that might still be free; with
+path compression "next available slot from here" costs amortized near-O(1)
+however many days ahead are booked out, and checking a slot is a dict lookup.
+
+Bookings are committed with :meth:`Storage.book_slot`, which re-counts the
+slot inside a ``BEGIN IMMEDIATE`` transaction, so two sessions (or two
+processes) racing for the last seat cannot both win. Reference IDs come from
+the table's AUTOINCREMENT key and are never reused.
+"""
+import threading
+from collections import namedtuple
+from datetime import date
+
+SLOTS = ("09:00", "11:00", "14:00", "16:00")
+EXPERTS_PER_SLOT = 2
+BOOKING_HORIZON_DAYS = 90
+
+Booking = namedtuple("Booking", "id reference day slot")
+
+
+class SlotFull(Exception):
+    """The requested slot has no capacity left; ``next_available`` suggests another."""
+
+    def __init__(self, next_available):
+        super().__init__("slot is fully booked")
+        self.next_available = next_available
+
+
+def reference(booking_id):
+    return f"GF-{booking_id:06d}"
+
+
+class Scheduler:
+    """Slot availability index over the bookings in :class:`Storage`."""
+
+    def __init__(self, storage, capacity=EXPERTS_PER_SLOT, slots=SLOTS):
+        self.storage = storage
+        self.capacity = capacity
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._counts = {}  # slot number -> bookings
+        self._next = {}  # full slot number -> a later slot that may be free
+        for (day, slot), count in storage.booking_counts(date.today().toordinal()).items():
+            self._set_count(self._number(day, slot), count)
+
+    def _number(self, day, slot):
+        return day * len(self.slots) + slot
+
+    def _unnumber(self, n):
+        day, slot = divmod(n, len(self.slots))
+        return date.fromordinal(day), slot
+
+    def _set_count(self, n, count):
+        # Seats are only ever taken, so a slot once full stays full.
+        self._counts[n] = count
+        if count >= self.capacity:
+            self._next.setdefault(n, n + 1)
+
+    def _find(self, n):
+        """First slot number ``>= n`` with room left. Caller holds the lock."""
+        root = n
+        while root in self._next:
+            root = self._next[root]
+        while n in self._next and self._next[n] != root:  # path compression
+            self._next[n], n = root, self._next[n]
+        return root
+
+    # --- Queries ---
+    def remaining(self, day, slot):
+        return max(0, self.capacity - self._counts.get(self._number(day.toordinal(), slot), 0))
+
+    def next_available(self, day, slot=0):
+        """``(date, slot)`` of the first slot with room at or after ``day``/``slot``."""
+        with self._lock:
+            return self._unnumber(self._find(self._number(day.toordinal(), slot)))
+
+    # --- Booking ---
+    def book(self, user_id, day, slot, name, phone, reason=""):
+        """Book one seat; returns a :class:`Booking` or raises :class:`SlotFull`.
+
+        Booking the same slot twice returns the user's existing booking.
+        """
+        n = self._number(day.toordinal(), slot)
+        with self._lock:
+            if n in self._next:
+                raise SlotFull(self._unnumber(self._find(n)))
+        booking_id, count = self.storage.book_slot(
+            user_id, day.toordinal(), slot, self.capacity, name, phone, reason
+        )
+        with self._lock:
+            self._set_count(n, count)
+            if booking_id is None:
+                raise SlotFull(self._unnumber(self._find(n)))
+        return Booking(booking_id, reference(booking_id), day, self.slots[slot])
@@ -0,0 +1,264 @@
+"""Streaming bulk import and export of gardens, for farms with thousands of plants.
+
+Imports read CSV (a header row with at least ``type``) or JSON lines, one
+row at a time. Each row is checked against the plant catalog; valid plants
+are inserted ``chunk_rows`` at a time, one transaction per chunk. Memory
+therefore stays at one chunk however long the file is. A rejected row is
+counted and skipped, and the first ``MAX_ERRORS`` are reported with their
+line numbers. Columns:
+
+- ``type``: a plant key or its catalog name, in any case
+- ``planted_at``: epoch seconds or an ISO date/time (UTC), from 2000 up to a
+  day ahead; now if empty
+- ``quantity``: plants for this row, a whole number from 1 to ``MAX_QUANTITY``;
+  1 if missing or empty
+
+Exports stream a garden's plants or its event history from SQLite, one
+batch of rows at a time. A plant export can be imported again; its
+``plant_id`` and ``stage`` columns are ignored.
+
+    python -m greenflow.bulk import farm@example.com towers.csv
+    python -m greenflow.bulk export farm@example.com garden.jsonl [--history]
+"""
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from greenflow.catalog import get_catalog
+from greenflow.garden import SECONDS_PER_DAY
+from greenflow.gardenlog import HARVEST, PLANT, REMOVE, STAGE, STAGES
+
+FORMATS = ("csv", "jsonl")
+MIMETYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+CHUNK_ROWS = 5_000
+EXPORT_BATCH = 1_000
+MAX_QUANTITY = 1_000
+MAX_ERRORS = 20
+MIN_PLANTED_AT = 946_684_800  # 2000-01-01 UTC
+
+PLANT_COLUMNS = ("plant_id", "type", "planted_at", "stage")
+HISTORY_COLUMNS = ("seq", "at", "event", "plant_id", "type", "value")
+EVENT_NAMES = {PLANT: "plant", REMOVE: "remove", STAGE: "stage", HARVEST: "harvest"}
+
+# ``errors`` holds ``(line, message)`` for the first ``MAX_ERRORS`` rejected rows.
+_Report = namedtuple("ImportReport", "rows plants rejected errors seconds")
+
+
+class ImportReport(_Report):
+    __slots__ = ()
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def detect_format(filename, default="csv"):
+    """``"jsonl"`` for ``.jsonl``/``.ndjson`` files, ``"csv"`` for ``.csv``, else ``default``."""
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+# ==========================================
+# IMPORT
+# ==========================================
+def _records(stream, fmt):
+    """``(line, record)`` per data row; JSON lines are decoded by the caller so bad ones become row errors."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None:
+            return
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        if "type" not in reader.fieldnames:
+            raise ValueError("the CSV header needs a 'type' column")
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for n, line in enumerate(stream, 1):
+            if line.strip():
+                yield n, line
+    else:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+
+
+def parse_planted_at(value, now):
+    """Epoch seconds for a ``planted_at`` value (epoch seconds or ISO date/time); ``now`` if empty.
+
+    Raises ``ValueError`` for anything else, or a time before 2000 or more than a day ahead.
+    """
+    if value is None or value == "":
+        return now
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError("planted_at must be a date or epoch seconds")
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError("planted_at must be a finite number")
+    if not isinstance(value, str):
+        at = int(value)
+    elif value.strip().lstrip("-").isdigit():
+        at = int(value)
+    else:
+        parsed = datetime.fromisoformat(value.strip())
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        at = int(parsed.timestamp())
+    if at > now + SECONDS_PER_DAY:
+        raise ValueError("planted_at is in the future")
+    if at < MIN_PLANTED_AT:
+        raise ValueError("planted_at is before 2000")
+    return at
+
+
+def _plant(record, lookup, now):
+    """``(plant_type, planted_at, quantity)`` for one record, or ``ValueError`` saying what's wrong."""
+    if isinstance(record, str):
+        record = json.loads(record)
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+    name = str(record.get("type") or "").strip()
+    plant_type = lookup.get(name.lower())
+    if plant_type is None:
+        raise ValueError(f"unknown plant type {name!r}" if name else "type is required")
+    return plant_type, parse_planted_at(record.get("planted_at"), now), _quantity(record.get("quantity"))
+
+
+def _quantity(value):
+    """A row's plant count: a whole number, 1 if missing or empty."""
+    if value is None or value == "":
+        return 1
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # JSON 3.0
+    elif isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            raise ValueError("quantity must be a whole number") from None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("quantity must be a whole number")
+    if not 1 <= value <= MAX_QUANTITY:
+        raise ValueError(f"quantity must be between 1 and {MAX_QUANTITY}")
+    return value
+
+
+def import_plants(storage, user_id, stream, fmt="csv", plants=None, chunk_rows=CHUNK_ROWS, now=None):
+    """Add every valid row of the text ``stream`` to ``user_id``'s garden; returns an :class:`ImportReport`.
+
+    Chunks commit as they fill, so if the stream fails partway the plants
+    before the failing chunk stay imported.
+    """
+    plants = get_catalog().plants if plants is None else plants
+    lookup = {key.lower(): key for key in plants}
+    lookup.update({plant["name"].lower(): key for key, plant in plants.items() if plant.get("name")})
+    now = int(time.time()) if now is None else now
+
+    started = time.perf_counter()
+    types, planted_at, errors = [], [], []
+    rows = added = rejected = 0
+    for line, record in _records(stream, fmt):
+        rows += 1
+        try:
+            plant_type, at, quantity = _plant(record, lookup, now)
+        except (TypeError, ValueError, OverflowError) as exc:
+            rejected += 1
+            if len(errors) < MAX_ERRORS:
+                errors.append((line, str(exc)))
+            continue
+        types.extend([plant_type] * quantity)
+        planted_at.extend([at] * quantity)
+        if len(types) >= chunk_rows:
+            added += len(storage.add_plants(user_id, types, planted_at))
+            types, planted_at = [], []
+    if types:
+        added += len(storage.add_plants(user_id, types, planted_at))
+    return ImportReport(rows, added, rejected, errors, time.perf_counter() - started)
+
+
+# ==========================================
+# EXPORT
+# ==========================================
+def _write(rows, columns, fmt, batch_rows):
+    """Encode ``rows`` as CSV (with a header) or JSON lines, yielding text every ``batch_rows`` rows."""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(columns)
+    for n, row in enumerate(rows, 1):
+        if fmt == "csv":
+            writer.writerow(row)
+        else:
+            buf.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(",", ":")))
+            buf.write("\n")
+        if n % batch_rows == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def export_plants(storage, user_id, fmt="csv", batch_rows=EXPORT_BATCH):
+    """Text chunks of ``user_id``'s current plants with their growth stage."""
+    rows = (
+        (plant_id, plant_type, planted_at, STAGES[stage])
+        for plant_id, plant_type, planted_at, stage in storage.garden_plants(user_id)
+    )
+    return _write(rows, PLANT_COLUMNS, fmt, batch_rows)
+
+
+def export_history(storage, user_id, fmt="csv", batch_rows=EXPORT_BATCH):
+    """Text chunks of ``user_id``'s garden event log, oldest first."""
+    rows = (
+        (e.seq, e.at, EVENT_NAMES[e.kind], e.plant_id, e.plant_type, e.value)
+        for e in storage.garden_events(user_id)
+    )
+    return _write(rows, HISTORY_COLUMNS, fmt, batch_rows)
+
+
+def main(argv=None):
+    from greenflow.core import get_storage
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("email")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--history", action="store_true", help="export the event log instead of current plants")
+    args = parser.parse_args(argv)
+
+    storage = get_storage()
+    user = storage.get_user_by_email(args.email)
+    if user is None:
+        parser.error(f"no user {args.email}")
+    fmt = args.format or detect_format(args.path)
+    started = time.perf_counter()
+    if args.command == "import":
+        with open(args.path, encoding="utf-8-sig", newline="") as f:
+            report = import_plants(storage, user["id"], f, fmt)
+        print(f"{report.rows:,} rows, {report.plants:,} plants added, {report.rejected:,} rejected "
+              f"in {report.seconds:.1f} s ({report.rows_per_second:,.0f} rows/s)")
+        for line, message in report.errors:
+            print(f"  line {line}: {message}", file=sys.stderr)
+    else:
+        export = export_history if args.history else export_plants
+        rows = 0
+        with open(args.path, "w", encoding="utf-8", newline="") as f:
+            for chunk in export(storage, user["id"], fmt):
+                f.write(chunk)
+                rows += chunk.count("\n")
+        rows -= fmt == "csv"  # header
+        seconds = time.perf_counter() - started
+        print(f"{rows:,} rows in {seconds:.1f} s ({rows / seconds if seconds else 0:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""A process-wide LRU cache with expiry that computes each missing key once.
+
+:class:`TTLCache` keeps up to ``maxsize`` values for ``ttl`` seconds each,
+least recently used first out. When several threads miss on the same key at
+once, only the first computes it; the rest wait for its result instead of
+repeating the work, and an exception raised by the computation is raised in
+every one of them. Nothing is cached for a computation that fails.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_TTL = 600.0
+
+HIT, MISS, COALESCED = "hit", "miss", "coalesced"
+
+
+class TTLCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, counter=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._counter = counter  # a metrics.Counter with a ``result`` label, if any
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest use first
+        self._inflight = {}  # key -> Future of the computation under way
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _count(self, result):
+        if self._counter is not None:
+            self._counter.inc(result=result)
+
+    def get(self, key, compute):
+        """The cached value for ``key``, or ``compute()``'s result, computed once across threads."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self._count(HIT)
+                    return entry[1]
+                del self._entries[key]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            self._count(COALESCED)
+            return future.result()
+
+        self._count(MISS)
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            self._entries[key] = (self._clock() + self.ttl, value)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
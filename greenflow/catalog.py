@@ -0,0 +1,67 @@
+"""Versioned product catalogs: plants, packages and assistant replies.
+
+The catalogs live in ``data/catalog.json`` (override with GREENFLOW_CATALOG).
+:func:`get_catalog` loads the file once per process and reloads it when its
+modification time changes, so editing the file reaches every session
+without a restart. Indexes derived from a catalog are built on first use and
+replaced together with it.
+"""
+import json
+import os
+import threading
+
+from greenflow.chatbot import ChatIndex
+from greenflow.garden import PlantCatalog
+from greenflow.planner import PackagePlanner
+
+CATALOG_PATH = os.environ.get(
+    "GREENFLOW_CATALOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "catalog.json")
+)
+
+
+class Catalog:
+    """One loaded version of the catalog file."""
+
+    def __init__(self, data, mtime=None):
+        self.version = data["version"]
+        self.plants = data["plants"]
+        self.packages = data["packages"]
+        self.bot_responses = data["bot_responses"]
+        self.mtime = mtime
+        self.plant_index = PlantCatalog(self.plants)
+        self._chat_index = None
+        self._planner = None
+
+    @property
+    def chat_index(self):
+        if self._chat_index is None:
+            self._chat_index = ChatIndex(self.bot_responses, self.plants)
+        return self._chat_index
+
+    @property
+    def planner(self):
+        if self._planner is None:
+            self._planner = PackagePlanner(self.packages, self.plant_index)
+        return self._planner
+
+
+def load_catalog(path=CATALOG_PATH):
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return Catalog(data, os.stat(path).st_mtime_ns)
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def get_catalog(path=CATALOG_PATH):
+    """The current :class:`Catalog` for ``path``, reloaded if the file changed."""
+    mtime = os.stat(path).st_mtime_ns
+    catalog = _loaded.get(path)
+    if catalog is None or catalog.mtime != mtime:
+        with _lock:
+            catalog = _loaded.get(path)
+            if catalog is None or catalog.mtime != mtime:
+                catalog = _loaded[path] = load_catalog(path)
+    return catalog
@@ -0,0 +1,52 @@
+"""Bounded, windowed chat history for one session.
+
+Only the newest ``window`` turns stay in memory, as ``(id, role, content)``
+tuples, and only those are rendered. Everything else lives in SQLite, where
+:class:`~greenflow.storage.Storage` keeps at most ``CHAT_CAP`` turns per
+user. Older turns are pulled in a page at a time when the user scrolls back.
+"""
+import re
+from collections import deque
+
+CHAT_WINDOW = 20
+CHAT_PAGE = 20
+
+_CHUNK_RE = re.compile(r"\S+\s*")
+
+
+class ChatHistory:
+    def __init__(self, storage, user_id, window=CHAT_WINDOW):
+        self.storage = storage
+        self.user_id = user_id
+        self.recent = deque(storage.recent_chat(user_id, window), maxlen=window)
+        self.older = []  # turns loaded by scrolling back, oldest first
+        self.exhausted = len(self.recent) < window
+
+    def __iter__(self):
+        yield from self.older
+        yield from self.recent
+
+    def append(self, role, content):
+        msg_id = self.storage.append_chat(self.user_id, role, content)
+        if len(self.recent) == self.recent.maxlen:
+            if self.older:
+                # Keep the back-scrolled view contiguous while the user has it open.
+                self.older.append(self.recent[0])
+            else:
+                self.exhausted = False  # the evicted turn is now only on disk
+        self.recent.append((msg_id, role, content))
+
+    def load_older(self, limit=CHAT_PAGE):
+        """Prepend the previous ``limit`` turns from disk."""
+        first = self.older[0] if self.older else (self.recent[0] if self.recent else None)
+        if first is None:
+            self.exhausted = True
+            return
+        page = self.storage.recent_chat(self.user_id, limit, before_id=first[0])
+        self.older[:0] = page
+        self.exhausted = len(page) < limit
+
+
+def stream_chunks(text):
+    """Yield ``text`` word by word for ``st.write_stream``."""
+    yield from _CHUNK_RE.findall(text)
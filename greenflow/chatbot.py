@@ -0,0 +1,236 @@
+"""Indexed retrieval for the GreenFlow assistant.
+
+Built once per process from ``BOT_RESPONSES``, ``PLANTS_DB`` and the chatbot
+topics documented in the README. Queries take two paths:
+
+* a token trie for exact intents ("ph", "watering", "tomatoes"), so words
+  that merely contain a keyword ("phone") no longer match it;
+* a TF-IDF cosine fallback over every intent's text for free-form questions,
+  scored as one matrix product per batch. It only answers when the message
+  shares at least ``MIN_SHARED_TERMS`` content words with the intent, so a
+  lone word borrowed from a reply ("my phone broke" vs. "expert phone
+  support") gets the default answer rather than a sales pitch.
+
+Tokenising a message already costs more than the old substring scan over
+``BOT_RESPONSES``, so keyword answers are memoized per message text, the way
+trie walks are per token: chat traffic is mostly the same few greetings and
+questions. Fallbacks are still scored every time.
+"""
+import re
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Suffixes a keyword may carry and still count as an exact hit
+# ("water" -> "watering", "pest" -> "pests"), but not "ph" -> "phone".
+INFLECTIONS = frozenset(["", "s", "es", "ing", "ed", "er", "ers", "y"])
+# Shorter keywords must match exactly, or "hi" would claim "his" and "ph" "phs".
+MIN_INFLECTED_LENGTH = 3
+
+STOP_WORDS = frozenset(
+    "a about all an and any are as at be but by can do does for from get has have "
+    "he her his how i if in is it its me much my no not of on or our please she "
+    "should so some than that the their them there they this to too up very was "
+    "we what when which who why will with would you your "
+    # Every message is about growing plants in the app; these pick no intent.
+    "app garden grow growing plant plants".split()
+)
+
+# README "Chatbot Commands" not covered by BOT_RESPONSES: key -> (aliases, response)
+README_TOPICS = {
+    "hello": (["hi", "hey", "namaste"], None),
+    "help": (["menu", "options"], "I can help with watering, nutrients, pH, lighting, harvest times, pests, pricing, subscriptions and booking a consultation."),
+    "nutrient": (["nutrition", "fertilizer", "feed"], "Top up nutrients weekly and keep TDS around 800-1000 ppm for leafy greens, a little higher for fruiting plants."),
+    "harvest": (["ready", "pick"], "Most leafy greens are ready in 25-40 days, tomatoes around 60 and strawberries around 90. Check My Garden for each plant's countdown."),
+    "cost": (["price", "pricing", "rupees", "buy"], None),
+    "subscription": (["premium", "subscribe", "plan"], "Premium is ₹499/month: app reminders, expert phone support, plant replacement warranty and growth analytics."),
+    "book": (["booking", "consultation", "appointment", "visit"], "A consultation costs ₹200. Use the Consultation page to pick a date and our team will call you."),
+}
+
+# Generic intents a plant-specific answer already covers.
+_PLANT_ASPECTS = frozenset(["ph", "harvest"])
+
+DEFAULT_MIN_SCORE = 0.2
+MIN_SHARED_TERMS = 2
+_BATCH_CHUNK = 4096
+_TOKEN_CACHE_SIZE = 100_000
+_MESSAGE_CACHE_SIZE = 100_000
+_UNSEEN = object()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _singular(word):
+    """``"tomatoes"`` -> ``"tomato"``, ``"berries"`` -> ``"berry"``, so keywords match their singular too."""
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+class _Trie:
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, word, intent):
+        node = self.root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = (intent, len(word) >= MIN_INFLECTED_LENGTH)
+
+    def match(self, token):
+        """Intent for the longest keyword prefixing ``token`` with an allowed suffix."""
+        if token.endswith("ies"):
+            token = token[:-3] + "y"
+        node, best = self.root, None
+        for i, ch in enumerate(token):
+            node = node.get(ch)
+            if node is None:
+                break
+            if None in node:
+                intent, inflects = node[None]
+                suffix = token[i + 1:]
+                if suffix == "" or (inflects and suffix in INFLECTIONS):
+                    best = intent
+        return best
+
+
+class ChatIndex:
+    """Precomputed intent index; ``query`` for one message, ``query_batch`` for many."""
+
+    def __init__(self, bot_responses, plants_db, min_score=DEFAULT_MIN_SCORE):
+        self.default = bot_responses.get("default", "")
+        self.min_score = min_score
+        self.names = []
+        self.responses = []
+        self.is_plant = []
+        self._trie = _Trie()
+        self._token_hits = {}
+        self._keyword_answers = {}
+        docs = []
+
+        def add(name, response, keywords, text, plant=False):
+            intent = len(self.names)
+            self.names.append(name)
+            self.responses.append(response)
+            self.is_plant.append(plant)
+            for word in keywords:
+                self._trie.insert(word, intent)
+                if _singular(word) != word:
+                    self._trie.insert(_singular(word), intent)
+            docs.append(" ".join(keywords) + " " + text)
+
+        for key, response in bot_responses.items():
+            if key == "default":
+                continue
+            aliases = README_TOPICS.get(key, ([], None))[0]
+            add(key, response, [key] + aliases, response)
+        for key, (aliases, response) in README_TOPICS.items():
+            if key not in bot_responses and response:
+                add(key, response, [key] + aliases, response)
+        for key, plant in plants_db.items():
+            response = (
+                f"{plant['icon']} **{plant['name']}**: ready in about {plant['days_to_harvest']} days, "
+                f"ideal pH {plant['ph']}. {plant['tips']}"
+            )
+            keywords = sorted(set(tokenize(key.replace("_", " ")) + tokenize(plant["name"])))
+            add("plant:" + key, response, keywords, f"{plant['name']} ph {plant['ph']} harvest days {plant['tips']}", plant=True)
+
+        self._build_tfidf(docs)
+
+    # --- TF-IDF ---
+    def _build_tfidf(self, docs):
+        tokenized = [[t for t in tokenize(doc) if t not in STOP_WORDS] for doc in docs]
+        self.vocab = {t: i for i, t in enumerate(sorted({t for doc in tokenized for t in doc}))}
+        tf = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, doc in enumerate(tokenized):
+            np.add.at(tf[row], [self.vocab[t] for t in doc], 1.0)
+        df = np.count_nonzero(tf, axis=0)
+        self.idf = (np.log((1.0 + len(docs)) / (1.0 + df)) + 1.0).astype(np.float32)
+        weighted = tf * self.idf
+        self.doc_matrix = weighted / np.linalg.norm(weighted, axis=1, keepdims=True)
+        self._doc_terms = (tf > 0).astype(np.float32)
+
+    def _scores(self, texts):
+        """Cosine similarity of each text against every intent, and the distinct terms they share.
+
+        Both are ``(len(texts), n_intents)``.
+        """
+        q = np.zeros((len(texts), len(self.vocab)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            ids = [self.vocab[t] for t in tokenize(text) if t in self.vocab]
+            if ids:
+                np.add.at(q[row], ids, 1.0)
+        shared = (q > 0).astype(np.float32) @ self._doc_terms.T
+        q *= self.idf
+        norms = np.linalg.norm(q, axis=1, keepdims=True)
+        np.divide(q, norms, out=q, where=norms > 0)
+        return q @ self.doc_matrix.T, shared
+
+    # --- Token fast path ---
+    def exact_intents(self, text):
+        """Intent ids hit by the tokens of ``text``, in order of appearance."""
+        hits = []
+        token_hits = self._token_hits
+        for token in _TOKEN_RE.findall(text.lower()):
+            intent = token_hits.get(token, -1)
+            if intent == -1:
+                intent = self._trie.match(token)
+                if len(token_hits) >= _TOKEN_CACHE_SIZE:
+                    token_hits.clear()
+                token_hits[token] = intent
+            if intent is not None and intent not in hits:
+                hits.append(intent)
+        if len(hits) > 1 and any(self.is_plant[i] for i in hits):
+            hits = [i for i in hits if self.names[i] not in _PLANT_ASPECTS]
+        return hits
+
+    def _compose(self, intents):
+        return "\n\n".join(self.responses[i] for i in intents)
+
+    def _keyword_answer(self, text):
+        """The answer to ``text``'s exact intents, or ``None`` if it needs the fallback."""
+        answer = self._keyword_answers.get(text, _UNSEEN)
+        if answer is _UNSEEN:
+            intents = self.exact_intents(text)
+            answer = self._compose(intents) if intents else None
+            if len(self._keyword_answers) >= _MESSAGE_CACHE_SIZE:
+                self._keyword_answers.clear()
+            self._keyword_answers[text] = answer
+        return answer
+
+    def query(self, text):
+        answer = self._keyword_answer(text)
+        return self.query_batch([text])[0] if answer is None else answer
+
+    def query_batch(self, texts):
+        """Answer many messages at once; fallbacks share one scoring pass per distinct text."""
+        answers = [None] * len(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            answer = self._keyword_answer(text)
+            if answer is None:
+                pending.setdefault(text, []).append(i)
+            else:
+                answers[i] = answer
+
+        unanswered = list(pending)
+        for start in range(0, len(unanswered), _BATCH_CHUNK):
+            chunk = unanswered[start:start + _BATCH_CHUNK]
+            scores, shared = self._scores(chunk)
+            best = scores.argmax(axis=1)
+            rows = np.arange(len(chunk))
+            for text, intent, score, overlap in zip(chunk, best, scores[rows, best], shared[rows, best]):
+                if score >= self.min_score and overlap >= MIN_SHARED_TERMS:
+                    answer = self.responses[intent]
+                else:
+                    answer = self.default
+                for i in pending[text]:
+                    answers[i] = answer
+        return answers
@@ -0,0 +1,164 @@
+"""Process-wide resources shared by every session of both apps.
+
+Each accessor builds its resource once per process, the way
+``st.cache_resource`` would, but without depending on a Streamlit runtime so
+scripts and benchmarks can use the same objects.
+"""
+import functools
+import logging
+import threading
+
+from greenflow import metrics
+from greenflow.alerts import AlertEngine, ph_window, sms_relay
+from greenflow.auth import Authenticator
+from greenflow.bookings import Scheduler
+from greenflow.cache import TTLCache
+from greenflow.catalog import get_catalog
+from greenflow.chatbot import tokenize
+from greenflow.orders import OrderQueue
+from greenflow.ratelimit import RateLimiter
+from greenflow.storage import DEMO_EMAIL, Storage
+from greenflow.telemetry import SimulatedFeeder, TelemetryStore
+
+DEMO_GARDEN = "demo"
+HISTORY_DAYS = 90
+CHAT_CACHE_SIZE = 4096
+CHAT_CACHE_TTL = 600.0
+CHAT_RATE = 0.5  # messages per second per user, sustained
+CHAT_BURST = 5
+
+_UNSET = object()
+logger = logging.getLogger(__name__)
+
+
+def process_resource(fn):
+    """Call ``fn`` once per process and return the same object afterwards."""
+    lock = threading.Lock()
+    value = _UNSET
+
+    @functools.wraps(fn)
+    def wrapper():
+        nonlocal value
+        if value is _UNSET:
+            with lock:
+                if value is _UNSET:
+                    value = fn()
+        return value
+
+    def clear():
+        nonlocal value
+        value = _UNSET
+
+    wrapper.clear = clear
+    return wrapper
+
+
+@process_resource
+def _storage():
+    storage = Storage(catalog=get_catalog().plant_index)
+    storage.seed_demo()
+    return storage
+
+
+def get_storage():
+    storage = _storage()
+    storage.use_catalog(get_catalog().plant_index)
+    return storage
+
+
+@process_resource
+def get_authenticator():
+    return Authenticator(get_storage())
+
+
+@process_resource
+def get_scheduler():
+    return Scheduler(get_storage())
+
+
+@process_resource
+def get_orders():
+    return OrderQueue(get_storage()).start()
+
+
+@process_resource
+def get_alerts():
+    engine = AlertEngine()
+    engine.subscribe(sms_relay(get_storage()))
+    return engine
+
+
+def _demo_limits(engine):
+    """A callable that re-derives the demo garden's pH limits once its plants or the catalog change."""
+    seen = (None, 0)  # the garden the limits came from, and its size then
+
+    def sync():
+        nonlocal seen
+        storage = get_storage()  # swaps in a reloaded catalog, which drops the cached gardens
+        demo = storage.get_user_by_email(DEMO_EMAIL)
+        if demo is None:
+            return
+        # Adds grow the cached garden in place; removals, other processes' writes and catalog reloads replace it.
+        garden = storage.garden(demo["id"])
+        if seen[0] is garden and seen[1] == len(garden):
+            return
+        seen = (garden, len(garden))
+        window = ph_window(garden.type_code[:len(garden)], garden.catalog)
+        if window is None:
+            engine.reset_limits(DEMO_GARDEN, "ph_window")
+        else:
+            engine.set_limits(DEMO_GARDEN, "ph_window", *window)
+
+    return sync
+
+
+@process_resource
+def get_telemetry():
+    store = TelemetryStore()
+    alerts = get_alerts()
+    sync_limits = _demo_limits(alerts)
+
+    def ingest(batches):
+        sync_limits()
+        alerts.ingest(batches)
+
+    store.subscribe(ingest)
+    SimulatedFeeder(store, [DEMO_GARDEN]).backfill(HISTORY_DAYS).start()
+    return store
+
+
+@process_resource
+def get_metrics_server():
+    """The ``/metrics`` listener for this process, or ``None`` if disabled or the port is taken."""
+    if not metrics.ENABLED or not metrics.METRICS_PORT:
+        return None
+    try:
+        return metrics.serve()
+    except OSError as exc:
+        # Another app process on this host already serves it; this one's counters go unexported.
+        logger.warning("metrics listener not started on port %s: %s", metrics.METRICS_PORT, exc)
+        return None
+
+
+@process_resource
+def get_chat_cache():
+    return TTLCache(CHAT_CACHE_SIZE, CHAT_CACHE_TTL, counter=metrics.CHAT_CACHE)
+
+
+@process_resource
+def get_chat_limiter():
+    """Shared by the apps and the API, keyed by user id."""
+    return RateLimiter(CHAT_RATE, CHAT_BURST)
+
+
+@metrics.timed(metrics.STEP_SECONDS, step="bot_response")
+def get_bot_response(user_input):
+    """The assistant's reply, cached per catalog version and normalized question.
+
+    The index only ever sees lowercase tokens, so questions differing in case,
+    punctuation or spacing get the same answer and share one cache entry.
+    """
+    metrics.CHAT_QUERIES.inc()
+    catalog = get_catalog()
+    question = " ".join(tokenize(user_input))
+    return get_chat_cache().get((catalog.mtime, question), lambda: catalog.chat_index.query(question))
@@ -0,0 +1,115 @@
+"""Struct-of-arrays garden state and vectorized progress.
+
+A garden is parallel arrays: an int16 plant type code, an int64
+``planted_at`` epoch (seconds) and the plant's storage id. Progress, days remaining and the
+ready-to-harvest mask for every plant come out of one NumPy pass, so the
+My Garden page only has to draw the handful of plants on the visible page.
+"""
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+DEFAULT_DAYS_TO_HARVEST = 60
+SECONDS_PER_DAY = 86400
+
+GardenStatus = namedtuple("GardenStatus", "days_passed total_days progress days_left ready")
+
+
+def parse_ph(text):
+    """``"5.8-6.5"`` -> ``(5.8, 6.5)``; ``None`` if missing or malformed."""
+    try:
+        low, high = (float(part) for part in str(text).split("-"))
+    except ValueError:
+        return None
+    return (low, high) if low <= high else None
+
+
+class PlantCatalog:
+    """Maps ``PLANTS_DB`` keys to dense codes with per-code harvest days and pH range.
+
+    pH ranges are parsed once into ``ph_low``/``ph_high`` (NaN where a plant
+    has no usable range).
+    """
+
+    def __init__(self, plants_db):
+        self.keys = list(plants_db)
+        self.codes = {key: code for code, key in enumerate(self.keys)}
+        self.days_to_harvest = np.array(
+            [plants_db[key].get("days_to_harvest", DEFAULT_DAYS_TO_HARVEST) for key in self.keys],
+            dtype=np.int64,
+        )
+        ph = [parse_ph(plants_db[key].get("ph")) or (np.nan, np.nan) for key in self.keys]
+        self.ph_low = np.array([low for low, _ in ph], dtype=np.float64)
+        self.ph_high = np.array([high for _, high in ph], dtype=np.float64)
+
+    def code(self, plant_type):
+        """Code for ``plant_type``; unknown types get a new code with the default cycle."""
+        code = self.codes.get(plant_type)
+        if code is None:
+            code = self.codes[plant_type] = len(self.keys)
+            self.keys.append(plant_type)
+            self.days_to_harvest = np.append(self.days_to_harvest, DEFAULT_DAYS_TO_HARVEST)
+            self.ph_low = np.append(self.ph_low, np.nan)
+            self.ph_high = np.append(self.ph_high, np.nan)
+        return code
+
+
+class GardenArrays:
+    """Growable parallel arrays of plant type codes, planting epochs and plant ids (-1 if unsaved)."""
+
+    def __init__(self, catalog, capacity=16):
+        self.catalog = catalog
+        self.type_code = np.empty(capacity, dtype=np.int16)
+        self.planted_at = np.empty(capacity, dtype=np.int64)
+        self.plant_id = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= len(self.type_code):
+            return
+        capacity = max(needed, 2 * len(self.type_code))
+        self.type_code = np.resize(self.type_code, capacity)
+        self.planted_at = np.resize(self.planted_at, capacity)
+        self.plant_id = np.resize(self.plant_id, capacity)
+
+    def add(self, plant_type, planted_at=None):
+        self.add_many([plant_type], [int(planted_at if planted_at is not None else time.time())])
+
+    def add_many(self, plant_types, planted_at, plant_ids=None):
+        codes = [self.catalog.code(t) for t in plant_types]
+        self._reserve(len(codes))
+        end = self.size + len(codes)
+        # Fill the slots before publishing the new size to concurrent readers.
+        self.type_code[self.size:end] = codes
+        self.planted_at[self.size:end] = planted_at
+        self.plant_id[self.size:end] = -1 if plant_ids is None else plant_ids
+        self.size = end
+
+    def plant_type(self, i):
+        return self.catalog.keys[self.type_code[i]]
+
+    def status(self, now=None):
+        """Vectorized :class:`GardenStatus` for every plant at ``now`` (epoch seconds)."""
+        now = int(now if now is not None else time.time())
+        size, type_code, planted_at = self.size, self.type_code, self.planted_at
+        days_passed = (now - planted_at[:size]) // SECONDS_PER_DAY
+        total_days = self.catalog.days_to_harvest[type_code[:size]]
+        progress = np.minimum(1.0, days_passed / total_days)
+        days_left = np.maximum(total_days - days_passed, 0)
+        return GardenStatus(days_passed, total_days, progress, days_left, progress >= 1.0)
+
+
+def paginate(rows, page, page_size):
+    """Slice ``rows`` to 1-based ``page``; returns ``(rows_on_page, page, page_count)``.
+
+    ``page`` is clamped into range, e.g. after a filter shrank the row set.
+    """
+    pages = max(1, math.ceil(len(rows) / page_size))
+    page = min(max(page, 1), pages)
+    return rows[(page - 1) * page_size:page * page_size], page, pages
@@ -0,0 +1,142 @@
+"""Process-wide harvest calendar: which plants, across every garden, ripen when.
+
+Every plant is filed under its ready day, the epoch day (UTC) on which
+``planted_at + days_to_harvest`` falls. The bulk of the calendar is a set of
+parallel NumPy arrays sorted by ready day, so "ready in the next N days" is
+two ``searchsorted`` calls and a slice instead of a pass over every garden.
+Plants added or removed since the last merge sit in a small overlay (a dict
+of additions and a set of removed ids) that is folded back into the sorted
+arrays once it grows past ``MERGE_THRESHOLD``.
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from greenflow.garden import SECONDS_PER_DAY
+
+MERGE_THRESHOLD = 4096
+
+HarvestWindow = namedtuple("HarvestWindow", "plant_id user_id type_code ready_day")
+
+
+def epoch_day(ts):
+    return int(ts) // SECONDS_PER_DAY
+
+
+def _empty_window():
+    return HarvestWindow(
+        np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int16), np.empty(0, np.int64)
+    )
+
+
+class HarvestCalendar:
+    """Plants of every user, ordered by the day they become ready to harvest."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._base = _empty_window()
+        self._added = {}  # plant_id -> (ready_day, user_id, type_code)
+        self._removed = set()  # ids still in the sorted arrays but no longer planted
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._base.plant_id) - len(self._removed) + len(self._added)
+
+    def _codes(self, plant_types):
+        kinds, inverse = np.unique(np.asarray(plant_types, dtype=object), return_inverse=True)
+        lookup = np.array([self.catalog.code(kind) for kind in kinds], dtype=np.int16)
+        return lookup[inverse] if len(kinds) else np.empty(0, np.int16)
+
+    def _ready_days(self, type_code, planted_at):
+        cycle = self.catalog.days_to_harvest[type_code] * SECONDS_PER_DAY
+        return (np.asarray(planted_at, dtype=np.int64) + cycle) // SECONDS_PER_DAY
+
+    # --- Updates ---
+    def load(self, plant_ids, user_ids, plant_types, planted_at):
+        """Replace the calendar with the given plants (e.g. every row of the plants table)."""
+        type_code = self._codes(plant_types)
+        ready_day = self._ready_days(type_code, planted_at)
+        order = np.argsort(ready_day, kind="stable")
+        base = HarvestWindow(
+            np.asarray(plant_ids, dtype=np.int64)[order],
+            np.asarray(user_ids, dtype=np.int64)[order],
+            type_code[order],
+            ready_day[order],
+        )
+        with self._lock:
+            self._base = base
+            self._added.clear()
+            self._removed.clear()
+
+    def add_many(self, plant_ids, user_id, plant_types, planted_at):
+        """File new plants; ``user_id`` may be one id for all of them or one per plant."""
+        type_code = self._codes(plant_types)
+        ready_day = self._ready_days(type_code, planted_at)
+        user_ids = np.broadcast_to(np.asarray(user_id, dtype=np.int64), ready_day.shape)
+        with self._lock:
+            for pid, day, uid, code in zip(plant_ids, ready_day.tolist(), user_ids.tolist(), type_code.tolist()):
+                self._added[int(pid)] = (day, uid, code)
+            if len(self._added) + len(self._removed) > MERGE_THRESHOLD:
+                self._merge()
+
+    def remove(self, plant_id):
+        """Forget a plant (removed or harvested); unknown ids are ignored."""
+        with self._lock:
+            if self._added.pop(plant_id, None) is None:
+                self._removed.add(plant_id)
+                if len(self._added) + len(self._removed) > MERGE_THRESHOLD:
+                    self._merge()
+
+    def _merge(self):
+        """Fold the overlay into the sorted arrays; O(n), no re-sort. Caller holds the lock."""
+        base = self._base
+        if self._removed:
+            keep = ~np.isin(base.plant_id, np.fromiter(self._removed, np.int64, len(self._removed)))
+            base = HarvestWindow(*(column[keep] for column in base))
+        if self._added:
+            added = self._overlay(-np.inf, np.inf)
+            at = np.searchsorted(base.ready_day, added.ready_day, side="right")
+            base = HarvestWindow(*(np.insert(b, at, a) for b, a in zip(base, added)))
+        self._base = base
+        self._added.clear()
+        self._removed.clear()
+
+    # --- Queries ---
+    def _overlay(self, lo, hi):
+        rows = sorted(
+            (day, pid, uid, code) for pid, (day, uid, code) in self._added.items() if lo <= day <= hi
+        )
+        if not rows:
+            return _empty_window()
+        day, pid, uid, code = zip(*rows)
+        return HarvestWindow(
+            np.array(pid, np.int64), np.array(uid, np.int64), np.array(code, np.int16), np.array(day, np.int64)
+        )
+
+    def _between(self, lo, hi):
+        """Plants with ``lo <= ready_day <= hi``, sorted by ready day. Caller holds the lock."""
+        base = self._base
+        i = np.searchsorted(base.ready_day, lo, side="left")
+        j = np.searchsorted(base.ready_day, hi, side="right")
+        window = HarvestWindow(*(column[i:j] for column in base))
+        if self._removed and j > i:
+            keep = ~np.isin(window.plant_id, np.fromiter(self._removed, np.int64, len(self._removed)))
+            window = HarvestWindow(*(column[keep] for column in window))
+        added = self._overlay(lo, hi)
+        if len(added.plant_id):
+            merged = HarvestWindow(*(np.concatenate(pair) for pair in zip(window, added)))
+            order = np.argsort(merged.ready_day, kind="stable")
+            window = HarvestWindow(*(column[order] for column in merged))
+        return window
+
+    def upcoming(self, days, now=None, overdue=False):
+        """Plants becoming ready within ``days`` days of ``now``, soonest first.
+
+        With ``overdue=True`` plants that ripened earlier and are still planted
+        are included too.
+        """
+        today = epoch_day(now if now is not None else time.time())
+        with self._lock:
+            return self._between(-np.inf if overdue else today, today + days)
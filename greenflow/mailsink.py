@@ -0,0 +1,166 @@
+"""A local SMTP server that accepts mail and keeps it, for development and benchmarks.
+
+It speaks just enough SMTP for :mod:`smtplib` (EHLO/HELO, MAIL, RCPT, DATA,
+RSET, NOOP, QUIT), one thread per connection. Nothing is delivered: the
+last ``keep`` messages are held in :attr:`MailSink.messages` and every one is
+counted in :attr:`MailSink.received`. ``fail_every`` answers every n-th
+message with a transient ``451`` and ``drop_every`` hangs up on every n-th
+one instead, so senders' retries can be exercised.
+
+    python -m greenflow.mailsink --port 1025
+"""
+import argparse
+import email
+import socketserver
+import threading
+from collections import deque, namedtuple
+from email import policy
+
+DEFAULT_PORT = 1025
+DEFAULT_KEEP = 1_000
+HOSTNAME = "greenflow-mailsink"
+
+Message = namedtuple("Message", "mail_from rcpt_to data")
+
+
+class _Session(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        self.reply(f"220 {HOSTNAME} ESMTP")
+        mail_from, rcpt_to = None, []
+        for raw in self.rfile:
+            command, _, arg = raw.decode("utf-8", "replace").rstrip("\r\n").partition(" ")
+            command = command.upper()
+            if command == "EHLO":
+                self.wfile.write(f"250-{HOSTNAME}\r\n250-8BITMIME\r\n250-SMTPUTF8\r\n250 PIPELINING\r\n".encode())
+            elif command == "HELO":
+                self.reply(f"250 {HOSTNAME}")
+            elif command == "MAIL":
+                if sink.hang_up():
+                    return
+                mail_from, rcpt_to = arg.partition(":")[2].split(" ")[0].strip("<>"), []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                if mail_from is None:
+                    self.reply("503 need MAIL first")
+                    continue
+                rcpt_to.append(arg.partition(":")[2].split(" ")[0].strip("<>"))
+                self.reply("250 OK")
+            elif command == "DATA":
+                if not rcpt_to:
+                    self.reply("503 need RCPT first")
+                    continue
+                self.reply("354 end with <CRLF>.<CRLF>")
+                lines = []
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line[1:] if line.startswith(b".") else line)
+                else:
+                    return
+                self.reply(sink.deliver(Message(mail_from, rcpt_to, b"".join(lines))))
+                mail_from, rcpt_to = None, []
+            elif command == "RSET":
+                mail_from, rcpt_to = None, []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("500 command not recognized")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class MailSink:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, keep=DEFAULT_KEEP, fail_every=0, drop_every=0):
+        self.messages = deque(maxlen=keep)
+        self.received = 0
+        self.fail_every = fail_every
+        self.drop_every = drop_every
+        self._attempts = 0  # messages started, for ``drop_every``
+        self._delivered = 0  # DATA commands completed, for ``fail_every``
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Session)
+        self._server.sink = self
+        self._thread = None
+
+    @property
+    def address(self):
+        """``(host, port)`` actually bound; use ``port=0`` to pick a free one."""
+        return self._server.server_address[:2]
+
+    def hang_up(self):
+        with self._lock:
+            self._attempts += 1
+            return bool(self.drop_every) and self._attempts % self.drop_every == 0
+
+    def deliver(self, message):
+        """The reply to a completed DATA command."""
+        with self._lock:
+            self._delivered += 1
+            if self.fail_every and self._delivered % self.fail_every == 0:
+                return "451 try again later"
+            self.received += 1
+            self.messages.append(message)
+        return "250 OK queued"
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve on a daemon thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="mailsink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every n-th message with 451")
+    parser.add_argument("--drop-every", type=int, default=0, help="hang up on every n-th message")
+    parser.add_argument("--show", action="store_true", help="print each message as it arrives")
+    args = parser.parse_args(argv)
+
+    sink = MailSink(args.host, args.port, fail_every=args.fail_every, drop_every=args.drop_every)
+    if args.show:
+        deliver = sink.deliver
+
+        def show(message):
+            reply = deliver(message)
+            print(f"--- {message.mail_from} -> {', '.join(message.rcpt_to)}: {reply}")
+            msg = email.message_from_bytes(message.data, policy=policy.default)
+            print(f"Subject: {msg['subject']}\n\n{msg.get_body().get_content()}")
+            return reply
+
+        sink.deliver = show
+    host, port = sink.address
+    print(f"mailsink listening on {host}:{port}")
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{sink.received:,} messages received")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Process-local counters and latency histograms, exported in Prometheus text format.
+
+Metrics are module-level objects created at import; recording one is a dict
+lookup and an add under that metric's lock. With ``GREENFLOW_METRICS=0``
+:func:`timed` hands back the function it was given, :func:`timer` a shared
+no-op context manager and ``inc``/``observe`` return straight away, so the
+instrumentation stays in the code at no measurable cost.
+
+The Streamlit apps serve :func:`render` at ``http://127.0.0.1:9108/metrics``
+(``GREENFLOW_METRICS_PORT``; ``0`` turns the listener off); the JSON API
+serves it at its own ``/metrics`` to loopback clients and the field team.
+"""
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED = os.environ.get("GREENFLOW_METRICS", "1") != "0"
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.environ.get("GREENFLOW_METRICS_PORT", "9108"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; a rerun is a few ms to a few hundred, a login's scrypt ~50 ms.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            values = sorted(self._copy().items())
+        for key, value in values:
+            lines.extend(self._samples(key, value))
+        return lines
+
+
+class Counter(_Metric):
+    """A monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _copy(self):
+        return dict(self._values)
+
+    def _samples(self, key, value):
+        yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """Observations counted into fixed ``buckets`` (upper bounds), plus their sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if not ENABLED:
+            return
+        self._observe(self._key(labels), value)
+
+    def _observe(self, key, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum; made cumulative on render.
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        series = self._values.get(self._key(labels))
+        return 0 if series is None else sum(series[0])
+
+    def _copy(self):
+        return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def _samples(self, key, value):
+        counts, total = value
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(bound))])} {cumulative}"
+        yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+        yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+# ==========================================
+# TIMING
+# ==========================================
+class _Timer:
+    __slots__ = ("histogram", "key", "started")
+
+    def __init__(self, histogram, key):
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram._observe(self.key, time.perf_counter() - self.started)
+        return False
+
+
+_NOOP = contextlib.nullcontext()
+
+
+def timer(histogram, **labels):
+    """``with timer(STEP_SECONDS, step="css"):`` observes the block's wall time."""
+    if not ENABLED:
+        return _NOOP
+    return _Timer(histogram, histogram._key(labels))
+
+
+def timed(histogram, **labels):
+    """Decorator form of :func:`timer`; a no-op when metrics are disabled."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        key = histogram._key(labels)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram._observe(key, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
+
+
+# ==========================================
+# EXPORT
+# ==========================================
+def render():
+    """Every registered metric in Prometheus text exposition format 0.0.4."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds; not worth a log line each time
+
+
+def serve(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve ``/metrics`` from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="greenflow-metrics", daemon=True).start()
+    return server
+
+
+# ==========================================
+# METRICS
+# ==========================================
+SCRIPT_RUNS = Counter("greenflow_script_runs_total", "Full Streamlit script runs.", ("app",))
+RERUNS = Counter("greenflow_reruns_total", "Reruns requested with st.rerun, by what asked for them.", ("source", "scope"))
+PAGE_SECONDS = Histogram("greenflow_page_seconds", "Time to render a page's script branch.", ("page",))
+STEP_SECONDS = Histogram("greenflow_step_seconds", "Time spent in instrumented helpers and fragments.", ("step",))
+LOGINS = Counter("greenflow_logins_total", "Login attempts by outcome.", ("result",))
+CHAT_QUERIES = Counter("greenflow_chat_queries_total", "Chatbot queries answered.")
+CHAT_CACHE = Counter("greenflow_chat_cache_total", "Chat response cache lookups by result.", ("result",))
+CHAT_RATE_LIMITED = Counter("greenflow_chat_rate_limited_total", "Chat messages refused by the per-user rate limit.")
+NOTIFICATIONS = Counter("greenflow_notifications_total", "Notifications by channel and outcome.", ("channel", "result"))
+PLANTS_ADDED = Counter("greenflow_plants_added_total", "Plants added to gardens.")
+HTTP_REQUESTS = Counter("greenflow_http_requests_total", "API requests by route and status.", ("route", "status"))
+HTTP_SECONDS = Histogram("greenflow_http_request_seconds", "API request latency by route.", ("route",))
@@ -0,0 +1,398 @@
+"""Weekly care-tip digests and the batched mail dispatcher that sends them.
+
+A weekly run is one streaming pass over every opted-in user's plants,
+counted per user and plant type in SQL (:meth:`Storage.digest_gardens`).
+:class:`DigestBuilder` renders each plant type's name, icon and care tips
+once per run, so a user's digest is a few string joins, not a catalog scan.
+
+:class:`Dispatcher` sends digests ``batch_size`` at a time on a bounded
+pool of worker threads, with at most two batches per worker queued, so a
+run over 100k users holds a few hundred messages in memory. Workers borrow
+connections from :class:`SMTPPool`, which keeps them open between
+messages. Transient failures (dropped connections, timeouts, 4xx replies)
+are retried with exponential backoff and jitter up to ``max_attempts``;
+permanent ones (5xx, refused recipients, addresses that can't go in a
+``To:`` header) are counted and skipped. A server that can't be reached, or
+that refuses the session itself (STARTTLS, login), stops the run rather than
+being retried for every user. Each batch is marked sent as it completes, so a run that
+stops partway through the week picks up where it left off.
+
+    python -m greenflow.mailsink &
+    python -m greenflow.notify weekly
+    python -m greenflow.notify preview demo@greenflow.com
+"""
+import argparse
+import base64
+import functools
+import logging
+import math
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.header import Header
+from email.utils import formataddr, formatdate, make_msgid, parseaddr
+from itertools import islice
+
+from greenflow import metrics
+from greenflow.addresses import valid_address
+from greenflow.garden import DEFAULT_DAYS_TO_HARVEST, SECONDS_PER_DAY
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.environ.get("GREENFLOW_SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("GREENFLOW_SMTP_PORT", "1025"))
+SMTP_USER = os.environ.get("GREENFLOW_SMTP_USER")
+SMTP_PASSWORD = os.environ.get("GREENFLOW_SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("GREENFLOW_SMTP_STARTTLS", "0") == "1"
+MAIL_FROM = os.environ.get("GREENFLOW_MAIL_FROM", "GreenFlow <tips@greenflow.in>")
+
+DEFAULT_WORKERS = 8
+DEFAULT_BATCH = 100
+MAX_ATTEMPTS = 4
+BACKOFF = 0.5  # seconds before the first retry; doubles per attempt
+MAX_BACKOFF = 30.0
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+
+Digest = namedtuple("Digest", "user_id to subject body")
+_Report = namedtuple("DispatchReport", "sent failed retries seconds")
+
+
+class DispatchReport(_Report):
+    __slots__ = ()
+
+    @property
+    def per_second(self):
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+def week_of(ts):
+    """Weeks since the epoch; one digest per user per week."""
+    return int(ts) // SECONDS_PER_WEEK
+
+
+# ==========================================
+# DIGESTS
+# ==========================================
+class DigestBuilder:
+    """Renders weekly digests from the per-type counts :meth:`Storage.digest_gardens` yields."""
+
+    def __init__(self, plants_db, now):
+        self.now = now
+        self.days_to_harvest = {
+            key: plant.get("days_to_harvest", DEFAULT_DAYS_TO_HARVEST) for key, plant in plants_db.items()
+        }
+        self._labels = {
+            key: f"{plant.get('icon', '🌱')} {plant.get('name', key)}" for key, plant in plants_db.items()
+        }
+        self._tips = {
+            key: f"{self._labels[key]}: {plant['tips']}" for key, plant in plants_db.items() if plant.get("tips")
+        }
+
+    def label(self, plant_type):
+        return self._labels.get(plant_type) or f"🌱 {plant_type.replace('_', ' ').title()}"
+
+    def _line(self, plant_type, plants, ready, next_ready_at):
+        parts = []
+        if ready:
+            parts.append(f"{ready} ready to harvest")
+        if next_ready_at is not None:
+            days = math.ceil((next_ready_at - self.now) / SECONDS_PER_DAY)
+            parts.append(f"next ready in {days} day{'s' if days != 1 else ''}")
+        return f"{self.label(plant_type)} × {plants}: {', '.join(parts)}"
+
+    def build(self, user, types):
+        """The :class:`Digest` for ``user`` given ``[(type, plants, ready, next_ready_at)]``."""
+        lines = [f"Hi {user['name'].split()[0] if user['name'].strip() else 'there'},", ""]
+        if types:
+            total = sum(row[1] for row in types)
+            ready = sum(row[2] for row in types)
+            subject = (f"🌿 {ready} plant{'s' if ready != 1 else ''} ready to harvest this week" if ready
+                       else f"🌿 Your garden this week: {total} plant{'s' if total != 1 else ''} growing")
+            lines += ["Here's your garden this week:", ""]
+            lines += [self._line(*row) for row in types]
+            tips = [self._tips[row[0]] for row in types if row[0] in self._tips]
+            if tips:
+                lines += ["", "Care tips:", ""] + tips
+        else:
+            subject = "🌿 Start your GreenFlow garden"
+            lines += ["Your garden is empty. Pick a starter package in the Store and we'll track it from here."]
+        lines += ["", "You get this email because weekly care tips are on; turn them off under Account Settings."]
+        return Digest(user["id"], user["email"], subject, "\n".join(lines))
+
+
+def weekly_digests(storage, builder, week, user_ids=None):
+    """A :class:`Digest` per user due ``week``'s digest, streamed."""
+    for user, types in storage.digest_gardens(builder.days_to_harvest, builder.now, week, user_ids):
+        yield builder.build(user, types)
+
+
+def preview_digest(storage, user_id, plants_db=None, now=None):
+    """This week's :class:`Digest` for ``user_id``, sent or not; ``None`` if they've turned tips off."""
+    from greenflow.catalog import get_catalog
+
+    now = int(time.time()) if now is None else now
+    builder = DigestBuilder(get_catalog().plants if plants_db is None else plants_db, now)
+    return next(weekly_digests(storage, builder, week_of(now), [user_id]), None)
+
+
+# ==========================================
+# SENDING
+# ==========================================
+class SMTPSetupError(smtplib.SMTPException):
+    """Opening a session failed: the server or our settings are at fault, not any one message."""
+
+
+# Replies to one message; the SMTP session is still usable after them.
+_REFUSED = (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused, smtplib.SMTPNotSupportedError)
+
+
+def _close(smtp):
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
+
+class SMTPPool:
+    """Up to ``size`` SMTP connections, reused between messages and replaced after an error."""
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, size=DEFAULT_WORKERS, timeout=10.0,
+                 starttls=SMTP_STARTTLS, username=SMTP_USER, password=SMTP_PASSWORD):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self.opened = 0
+        self._idle = queue.LifoQueue()  # most recently used first, so idle extras can time out
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        smtp = None
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except BaseException as exc:
+            if smtp is not None:
+                smtp.close()
+            if isinstance(exc, smtplib.SMTPException):  # a refused greeting, no STARTTLS, bad credentials
+                raise SMTPSetupError(f"{type(exc).__name__}: {exc}") from exc
+            raise
+        with self._lock:
+            self.opened += 1
+        return smtp
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                smtp = self._idle.get_nowait()
+            except queue.Empty:
+                smtp = self._connect()
+            try:
+                yield smtp
+            except _REFUSED as exc:
+                # The server refused this message but the session is still good, unless it's closing (421).
+                if getattr(exc, "smtp_code", None) == 421:
+                    _close(smtp)
+                else:
+                    self._idle.put(smtp)
+                raise
+            except BaseException:
+                _close(smtp)  # its state is unknown after a dropped connection or a bug
+                raise
+            self._idle.put(smtp)
+
+    def close(self):
+        while True:
+            try:
+                _close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def _transient(exc):
+    """Whether a failed send is worth retrying: 4xx replies and connection trouble are, 5xx are not."""
+    if isinstance(exc, SMTPSetupError):
+        return _transient(exc.__cause__)
+    if isinstance(exc, smtplib.SMTPNotSupportedError):
+        return False  # a UTF-8 address and a server without SMTPUTF8
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return True  # SMTPServerDisconnected, timeouts, refused connections
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_header(value):
+    """``value`` as RFC 2047 encoded words if it isn't plain ASCII; digests share a handful of subjects."""
+    return value if value.isascii() else Header(value, "utf-8").encode()
+
+
+def _batches(items, size):
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+class Dispatcher:
+    def __init__(self, pool, workers=DEFAULT_WORKERS, batch_size=DEFAULT_BATCH, max_attempts=MAX_ATTEMPTS,
+                 backoff=BACKOFF, max_backoff=MAX_BACKOFF, sender=MAIL_FROM, sleep=time.sleep):
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sender = sender
+        self._sleep = sleep
+        name, self._envelope_from = parseaddr(sender)
+        self._domain = self._envelope_from.rpartition("@")[2] or "localhost"
+        self._headers = (
+            f"From: {formataddr((name, self._envelope_from))}\r\nMIME-Version: 1.0\r\n"
+            'Content-Type: text/plain; charset="utf-8"\r\nContent-Transfer-Encoding: base64\r\n'
+        ).encode("ascii")
+
+    def delay(self, attempt):
+        """Seconds to wait after failed ``attempt`` (1-based): exponential, capped, with jitter."""
+        return min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    def _message(self, digest):
+        """The digest as message bytes, built directly: an :class:`email.message.EmailMessage` costs ~2 ms each.
+
+        Raises ``ValueError`` if ``digest.to`` isn't a :func:`valid_address`.
+        A non-ASCII address goes into the header as UTF-8, for SMTPUTF8.
+        """
+        if not valid_address(digest.to):
+            raise ValueError("not a valid email address")
+        return b"".join((
+            self._headers,
+            f"To: {digest.to}\r\nSubject: {_encode_header(digest.subject)}\r\n"
+            f"Date: {formatdate()}\r\nMessage-ID: {make_msgid(domain=self._domain)}\r\n\r\n".encode("utf-8"),
+            base64.encodebytes(digest.body.encode("utf-8")),
+        ))
+
+    def _send_batch(self, batch, on_sent, unreachable):
+        sent, failed, retries = [], 0, 0
+        for digest in batch:
+            if unreachable.is_set():
+                break
+            try:
+                msg = self._message(digest)
+            except ValueError as exc:
+                logger.warning("Not sending to %r: %s", digest.to, exc)
+                failed += 1
+                continue
+            options = () if digest.to.isascii() else ("SMTPUTF8",)
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    with self.pool.connection() as smtp:
+                        smtp.sendmail(self._envelope_from, [digest.to], msg, options)
+                except (smtplib.SMTPException, OSError) as exc:
+                    if attempt == self.max_attempts or not _transient(exc):
+                        logger.warning("Giving up on %s after %d attempt(s): %s", digest.to, attempt, exc)
+                        failed += 1
+                        if not isinstance(exc, _REFUSED):
+                            unreachable.set()  # the server, not this message: stop rather than retry every user
+                        break
+                    retries += 1
+                    self._sleep(self.delay(attempt))
+                else:
+                    sent.append(digest)
+                    break
+        if sent and on_sent is not None:
+            on_sent(sent)
+        metrics.NOTIFICATIONS.inc(len(sent), channel="email", result="sent")
+        metrics.NOTIFICATIONS.inc(failed, channel="email", result="failed")
+        metrics.NOTIFICATIONS.inc(retries, channel="email", result="retried")
+        return len(sent), failed, retries
+
+    def dispatch(self, digests, on_sent=None):
+        """Send every digest; ``on_sent(digests)`` is called from a worker after each batch. Returns a report.
+
+        Raises ``ConnectionError`` if a message runs out of attempts because
+        the server can't be reached or refuses the session (e.g. bad
+        credentials); the batches under way finish first.
+        """
+        started = time.perf_counter()
+        in_flight = threading.BoundedSemaphore(2 * self.workers)
+        unreachable = threading.Event()
+        futures = []
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="notify") as executor:
+            for batch in _batches(digests, self.batch_size):
+                in_flight.acquire()
+                if unreachable.is_set():
+                    break
+                future = executor.submit(self._send_batch, batch, on_sent, unreachable)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+        totals = [sum(counts) for counts in zip(*(f.result() for f in futures))] or [0, 0, 0]
+        report = DispatchReport(*totals, time.perf_counter() - started)
+        if unreachable.is_set():
+            raise ConnectionError(f"can't send through the mail server at {self.pool.host}:{self.pool.port} "
+                                  f"after {report.sent:,} sent; run again to resume")
+        return report
+
+
+def send_weekly_digests(storage, dispatcher, plants_db=None, now=None):
+    """Send this week's digest to every opted-in user who hasn't had it yet; returns a :class:`DispatchReport`."""
+    from greenflow.catalog import get_catalog
+
+    now = int(time.time()) if now is None else now
+    week = week_of(now)
+    builder = DigestBuilder(get_catalog().plants if plants_db is None else plants_db, now)
+
+    def mark(sent):
+        storage.mark_digests_sent([digest.user_id for digest in sent], week, now)
+
+    with metrics.timer(metrics.STEP_SECONDS, step="weekly_digests"):
+        return dispatcher.dispatch(weekly_digests(storage, builder, week), on_sent=mark)
+
+
+def main(argv=None):
+    from greenflow.core import get_storage
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    weekly = sub.add_parser("weekly", help="send this week's digests (run it from cron)")
+    weekly.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    weekly.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    preview = sub.add_parser("preview", help="print a user's digest without sending it")
+    preview.add_argument("email")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    storage = get_storage()
+    if args.command == "preview":
+        user = storage.get_user_by_email(args.email)
+        if user is None:
+            parser.error(f"no user {args.email}")
+        digest = preview_digest(storage, user["id"])
+        print(f"Subject: {digest.subject}\n\n{digest.body}" if digest else f"{args.email} has weekly tips turned off")
+        return
+
+    pool = SMTPPool(size=args.workers)
+    try:
+        report = send_weekly_digests(storage, Dispatcher(pool, args.workers, args.batch))
+    except ConnectionError as exc:
+        parser.exit(1, f"{exc}\n")
+    finally:
+        pool.close()
+    print(f"{report.sent:,} sent, {report.failed:,} failed, {report.retries:,} retries "
+          f"in {report.seconds:.1f} s ({report.per_second:,.0f} messages/s)")
+
+
+if __name__ == "__main__":
+    main()
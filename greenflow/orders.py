@@ -0,0 +1,135 @@
+"""Idempotent order intake with a background batching writer.
+
+A purchase never touches SQLite on the script thread. :meth:`OrderQueue.submit`
+records the order as ``pending`` in an in-memory status cache and puts it on
+a queue; one writer thread drains the queue and commits everything it finds
+in a single transaction. Every order carries an idempotency key: a key still
+in the cache returns the existing order, and a key already on disk is
+skipped by the writer's ``INSERT OR IGNORE`` and resolves to the stored
+order, so double clicks, reruns and client retries never create a second one.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH = 256
+DEFAULT_LINGER = 0.02  # seconds the writer waits for a batch to fill
+STATUS_CACHE_SIZE = 100_000
+
+PENDING, PLACED, FAILED = "pending", "placed", "failed"
+
+# ``items`` is ``{package_key: quantity}``; ``id`` is set once the order is on disk.
+Order = namedtuple("Order", "key user_id items total status id")
+
+
+def _from_row(row):
+    return Order(row["key"], row["user_id"], row["items"], row["total"], row["status"], row["id"])
+
+
+class OrderQueue:
+    """Accepts orders from any thread and writes them to :class:`Storage` in batches."""
+
+    def __init__(self, storage, batch=DEFAULT_BATCH, linger=DEFAULT_LINGER):
+        self.storage = storage
+        self.batch = batch
+        self.linger = linger
+        self._queue = queue.Queue()
+        self._status = OrderedDict()  # key -> Order, most recently touched last
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _remember(self, order):
+        """Caller holds the lock."""
+        self._status[order.key] = order
+        self._status.move_to_end(order.key)
+        while len(self._status) > STATUS_CACHE_SIZE:
+            key, oldest = next(iter(self._status.items()))
+            if oldest.status == PENDING:
+                break  # never forget an order the writer hasn't settled
+            del self._status[key]
+
+    # --- Intake ---
+    def submit(self, key, user_id, items, total):
+        """Enqueue an order under idempotency ``key``; returns the (possibly existing) :class:`Order`.
+
+        Only a key whose earlier write failed is queued again.
+        """
+        with self._lock:
+            known = self._status.get(key)
+            if known is not None and known.status != FAILED:
+                return known
+            order = Order(key, user_id, dict(items), int(total), PENDING, None)
+            self._remember(order)
+        self._queue.put(order)
+        return order
+
+    def status(self, key):
+        """The cached :class:`Order` for ``key``, falling back to storage; ``None`` if unknown."""
+        order = self._status.get(key)
+        if order is None:
+            row = self.storage.get_order(key)
+            if row is not None:
+                order = _from_row(row)
+                with self._lock:
+                    self._remember(order)
+        return order
+
+    # --- Writer ---
+    def _drain(self, timeout=None):
+        """Block for one order, then collect whatever arrives within ``linger``."""
+        try:
+            orders = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.linger
+        while len(orders) < self.batch:
+            remaining = deadline - time.monotonic()
+            try:
+                orders.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return orders
+
+    def flush_batch(self, orders):
+        """Commit ``orders`` in one transaction and publish their final status."""
+        try:
+            rows = self.storage.insert_orders(orders, status=PLACED)
+            settled = [_from_row(rows[o.key]) for o in orders]
+        except Exception:
+            logger.exception("writing %d orders failed", len(orders))
+            settled = [o._replace(status=FAILED) for o in orders]
+        with self._lock:
+            for order in settled:
+                self._remember(order)
+        return settled
+
+    def flush(self):
+        """Write everything queued so far on the calling thread (tests, shutdown)."""
+        while True:
+            orders = self._drain(timeout=0)
+            if not orders:
+                return
+            self.flush_batch(orders)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="greenflow-orders", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            orders = self._drain(timeout=0.5)
+            if orders:
+                self.flush_batch(orders)
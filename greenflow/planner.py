@@ -0,0 +1,189 @@
+"""Low-cost package combinations for a requested plant mix.
+
+Every package is one system with one reservoir, so a system can only hold
+plants whose pH windows overlap. A mix is first split into the fewest
+pH-compatible groups (:func:`~greenflow.reservoirs.plan_reservoirs`), then
+each group of ``n`` plants is covered by the cheapest multiset of packages
+with at least ``n`` slots. That cover is an unbounded min-cost knapsack whose
+table ``best[n]`` is shared by every quote and only ever extended, so a batch
+of hundreds of quotes costs little more than its largest group.
+
+The grouping only minimises the number of reservoirs, so plants whose range
+fits more than one group are then moved into other groups' spare slots
+whenever that lets a group drop to a cheaper cover. That local search is not
+guaranteed to find the cheapest quote for every mix, only one no single such
+move can improve.
+
+Mixes are capped at ``MAX_MIX_PLANTS`` plants and batches at
+``MAX_BATCH_PLANTS``, which also bounds the shared table.
+"""
+import threading
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from greenflow.reservoirs import plan_reservoirs
+
+QUOTE_CACHE_SIZE = 10_000
+MAX_MIX_PLANTS = 10_000
+MAX_BATCH_PLANTS = 100_000
+
+# One installed system: which package, the pH window it runs in and the plants it holds.
+QuoteSystem = namedtuple("QuoteSystem", "package ph_low ph_high plants")
+Quote = namedtuple("Quote", "total packages systems")
+
+
+class PackagePlanner:
+    """Quotes plant mixes against ``PACKAGES`` using a :class:`PlantCatalog`'s pH ranges."""
+
+    def __init__(self, packages, catalog):
+        self.catalog = catalog
+        # Largest first, so a cover fills big systems before small ones.
+        self.keys = sorted(packages, key=lambda k: -packages[k]["plants_count"])
+        self.capacity = [packages[k]["plants_count"] for k in self.keys]
+        self.price = [packages[k]["price"] for k in self.keys]
+        self._best = [0]  # cheapest price covering n plants
+        self._choice = [-1]  # package index that achieves it
+        self._lock = threading.Lock()
+        self._quotes = {}  # frozen mix -> Quote
+
+    def _extend(self, n):
+        """Grow the cover table through ``n`` plants."""
+        with self._lock:
+            best, choice = self._best, self._choice
+            for m in range(len(best), n + 1):
+                options = [
+                    (price + best[max(0, m - cap)], i)
+                    for i, (cap, price) in enumerate(zip(self.capacity, self.price))
+                ]
+                cost, i = min(options)
+                best.append(cost)
+                choice.append(i)
+
+    def cover(self, n):
+        """``(price, [package index, ...])`` of the cheapest packages with ``n`` slots."""
+        if n >= len(self._best):
+            self._extend(n)
+        picks = []
+        while n > 0:
+            i = self._choice[n]
+            picks.append(i)
+            n -= self.capacity[i]
+        picks.sort()
+        return sum(self.price[i] for i in picks), picks
+
+    def _window(self, counts):
+        """``[low, high]`` pH shared by the types in ``counts``; NaN if none has a known range."""
+        low, high = self.catalog.ph_low, self.catalog.ph_high
+        known = [c for c, n in counts.items() if n and not np.isnan(low[c])]
+        if not known:
+            return [np.nan, np.nan]
+        return [max(low[c] for c in known), min(high[c] for c in known)]
+
+    def _fits(self, window, code):
+        """Window after adding type ``code`` to a group in ``window``, or ``None`` if they don't overlap."""
+        low, high = self.catalog.ph_low[code], self.catalog.ph_high[code]
+        if np.isnan(low):
+            return window
+        if np.isnan(window[0]):
+            return [low, high]
+        merged = [max(window[0], low), min(window[1], high)]
+        return merged if merged[0] <= merged[1] else None
+
+    def _spare(self, n):
+        """Slots left over in the cheapest cover of ``n`` plants."""
+        return sum(self.capacity[i] for i in self.cover(n)[1]) - n if n else 0
+
+    def _rebalance(self, groups):
+        """Move plants between ``groups`` (``[Counter(code -> plants)]``) while that lowers the total."""
+        windows = [self._window(g) for g in groups]
+        improved = True
+        while improved:
+            improved = False
+            for g, counts in enumerate(groups):
+                n = sum(counts.values())
+                if not n:
+                    continue
+                self.cover(n)
+                cheaper = next(m for m in range(n - 1, -1, -1) if self._best[m] < self._best[n])
+                excess = n - cheaper
+                spare = [self._spare(sum(other.values())) if h != g else 0 for h, other in enumerate(groups)]
+                trial = [Counter(other) for other in groups]
+                trial_windows = [list(w) for w in windows]
+                for code in sorted(counts):
+                    for h in range(len(groups)):
+                        if not excess:
+                            break
+                        take = min(excess, trial[g][code], spare[h])
+                        merged = self._fits(trial_windows[h], code) if take else None
+                        if merged is None:
+                            continue
+                        trial[g][code] -= take
+                        trial[h][code] += take
+                        trial_windows[h] = merged
+                        spare[h] -= take
+                        excess -= take
+                if not excess:
+                    groups[:] = [+counts for counts in trial]
+                    windows = [self._window(counts) for counts in groups]
+                    improved = True
+                    break
+        return [(counts, window) for counts, window in zip(groups, windows) if counts]
+
+    def quote(self, mix):
+        """A low-cost :class:`Quote` for ``mix`` (``{plant_type: count}``).
+
+        Raises ``ValueError`` for unknown plant types, negative counts or more
+        than ``MAX_MIX_PLANTS`` plants.
+        """
+        key = frozenset((t, int(c)) for t, c in mix.items() if int(c))
+        cached = self._quotes.get(key)
+        if cached is not None:
+            return cached
+        unknown = [t for t, _ in key if t not in self.catalog.codes]
+        if unknown:
+            raise ValueError(f"unknown plant types: {', '.join(sorted(unknown))}")
+        if any(c < 0 for _, c in key):
+            raise ValueError("plant counts must not be negative")
+        if sum(c for _, c in key) > MAX_MIX_PLANTS:
+            raise ValueError(f"a mix can hold at most {MAX_MIX_PLANTS:,} plants")
+
+        types = sorted(key)
+        codes = np.array([self.catalog.codes[t] for t, _ in types], dtype=np.int64)
+        counts = np.array([c for _, c in types], dtype=np.int64)
+        per_plant = np.repeat(codes, counts)
+        groups = [Counter(per_plant[group.rows].tolist()) for group in plan_reservoirs(per_plant, self.catalog)]
+
+        total, packages, systems = 0, Counter(), []
+        for counts, (ph_low, ph_high) in self._rebalance(groups):
+            remaining = Counter({self.catalog.keys[c]: n for c, n in counts.items()})
+            price, picks = self.cover(sum(counts.values()))
+            total += price
+            for i in picks:
+                # Hand out the group's plants to its systems, largest system first.
+                held, room = {}, self.capacity[i]
+                for plant_type in sorted(remaining):
+                    take = min(room, remaining[plant_type])
+                    if take:
+                        held[plant_type] = take
+                        room -= take
+                        remaining[plant_type] -= take
+                packages[self.keys[i]] += 1
+                systems.append(QuoteSystem(self.keys[i], float(ph_low), float(ph_high), held))
+        quote = Quote(total, dict(packages), systems)
+        if len(self._quotes) >= QUOTE_CACHE_SIZE:
+            self._quotes.clear()
+        self._quotes[key] = quote
+        return quote
+
+    def quote_many(self, mixes):
+        """Quotes for a batch of mixes; the cover table is grown once for the largest.
+
+        Raises ``ValueError`` if the batch holds more than ``MAX_BATCH_PLANTS`` plants.
+        """
+        sizes = [sum(max(0, int(c)) for c in mix.values()) for mix in mixes]
+        if sum(sizes) > MAX_BATCH_PLANTS:
+            raise ValueError(f"a batch can hold at most {MAX_BATCH_PLANTS:,} plants")
+        if sizes:
+            self._extend(min(max(sizes), MAX_MIX_PLANTS))
+        return [self.quote(mix) for mix in mixes]
@@ -0,0 +1,46 @@
+"""Per-key token buckets, so one user can't flood a shared process.
+
+Each key (a user id) gets a bucket of ``burst`` tokens that refills at
+``rate`` tokens per second; every request takes one. Buckets are two floats
+created on a key's first request. Once more than ``max_keys`` exist, the ones
+that have refilled to full are dropped: a new bucket starts full, so
+forgetting them changes nothing.
+"""
+import threading
+import time
+
+DEFAULT_MAX_KEYS = 10_000
+
+
+class RateLimiter:
+    def __init__(self, rate, burst, max_keys=DEFAULT_MAX_KEYS, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets = {}  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Spend one of ``key``'s tokens; returns 0.0 if allowed, else seconds until one is available."""
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._forget_full(now)
+                bucket = self._buckets[key] = [self.burst, now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= 1.0:
+                bucket[0] = tokens - 1.0
+                return 0.0
+            bucket[0] = tokens
+            return (1.0 - tokens) / self.rate
+
+    def _forget_full(self, now):
+        """Drop buckets that have refilled completely. Caller holds the lock."""
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if bucket[0] + (now - bucket[1]) * self.rate < self.burst
+        }
@@ -0,0 +1,62 @@
+"""Shared-reservoir planning from the catalog's pH ranges.
+
+Plants can share a reservoir when their pH windows intersect, so the fewest
+reservoirs is the fewest pH values that land inside every plant's range,
+i.e. interval stabbing. The greedy sweep solves that exactly: walk the ranges
+by upper bound and open a new reservoir at the upper bound of the first
+range the current one misses. Plants of one type share a range, so the sweep
+only visits the distinct types in the garden, and plants are assigned to
+reservoirs with a single vectorized lookup.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# ``rows`` are indices into the garden arrays; the window is NaN for a
+# reservoir holding only plants without a known pH range.
+Reservoir = namedtuple("Reservoir", "ph_low ph_high type_codes rows")
+
+
+def plan_reservoirs(type_code, catalog):
+    """Split plants (by ``type_code``) into the fewest reservoirs with a common pH window.
+
+    Plants without a pH range go into the first reservoir. Returns a list of
+    :class:`Reservoir` ordered by pH.
+    """
+    type_code = np.asarray(type_code, dtype=np.int64)
+    if not len(type_code):
+        return []
+    codes, inverse = np.unique(type_code, return_inverse=True)
+    low, high = catalog.ph_low[codes], catalog.ph_high[codes]
+    known = np.flatnonzero(~np.isnan(low))
+
+    group = np.zeros(len(codes), dtype=np.int64)
+    windows = []  # [low, high] shared by each reservoir so far
+    point = -np.inf  # pH the newest reservoir is held at (its upper bound)
+    sweep = known[np.argsort(high[known], kind="stable")]
+    assigned = []
+    for lo, hi in zip(low[sweep].tolist(), high[sweep].tolist()):
+        if lo > point:
+            point = hi
+            windows.append([lo, hi])
+        elif lo > windows[-1][0]:
+            windows[-1][0] = lo
+        assigned.append(len(windows) - 1)
+    group[sweep] = assigned
+    if not windows:
+        windows.append([np.nan, np.nan])
+
+    edges = np.arange(len(windows) + 1)
+    by_group = np.argsort(group, kind="stable")
+    type_bounds = np.searchsorted(group[by_group], edges)
+    plant_group = group[inverse]
+    rows = np.argsort(plant_group, kind="stable")
+    row_bounds = np.searchsorted(plant_group[rows], edges)
+    return [
+        Reservoir(
+            float(lo), float(hi),
+            codes[by_group[type_bounds[g]:type_bounds[g + 1]]],
+            rows[row_bounds[g]:row_bounds[g + 1]],
+        )
+        for g, (lo, hi) in enumerate(windows)
+    ]
@@ -0,0 +1,293 @@
+"""Build step and in-memory serving for the single-page HTML sites.
+
+Each page's inline ``<style>`` and ``<script>`` blocks are minified and
+moved into ``/assets/<name>.<hash>.css|js`` files named by a hash of their
+content, so they can be cached forever and a new build gets new URLs. The
+page itself is minified and revalidated by ETag on every visit. Every file is
+gzipped once at build time; serving is a dict lookup, an ETag comparison and
+a write of bytes that are already compressed.
+
+The minifiers only remove comments and collapse whitespace; they know
+about strings, template literals and regex literals and never rewrite
+code. Google Fonts and Chart.js still come from their CDNs, but the pages
+now open those connections early, load the font stylesheet without blocking
+the first render, and defer the scripts.
+
+    python -m greenflow.site build/site    # write the files and gzip variants for a CDN or nginx
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import namedtuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITE_PAGES = {"/": "greenflow-v6.html", "/haryali": "haryali (1).html"}
+ASSET_PREFIX = "/assets/"
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+GZIP_LEVEL = 9
+GZIP_MIN_SIZE = 512  # smaller bodies aren't worth a Content-Encoding
+
+FONT_HOSTS = ("https://fonts.googleapis.com", "https://fonts.gstatic.com")
+
+# ``gzip`` is None when compression doesn't shrink the file.
+Asset = namedtuple("Asset", "body gzip etag mimetype cache_control")
+
+_INLINE_BLOCK = re.compile(r"<(style|script)>(.*?)</\1>", re.S)
+_HTML_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_RAW_TAGS = re.compile(r"(<(textarea|pre)\b.*?</\2>)", re.S)
+_FONT_LINK = re.compile(r'<link href="(https://fonts\.googleapis\.com/[^"]+)" rel="stylesheet"/?>')
+_CDN_SCRIPT = re.compile(r'<script src="(https://[^"]+)"></script>')
+
+_CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|[^"\'/]+|/)', re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_TIGHT = re.compile(r" ?([{};,>]) ?|(:) ")
+
+_JS_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = ("return", "typeof", "case", "do", "else", "in", "of", "void", "throw", "delete", "new", "instanceof", "yield", "await")
+_JS_PUNCT = set("{}()[];,:=<>+-*/%!&|?~^.")
+
+
+# ==========================================
+# MINIFIERS
+# ==========================================
+def minify_css(css):
+    out = []
+    for token in _CSS_TOKENS.findall(css):
+        if token.startswith("/*"):
+            continue
+        if token[0] in "\"'":
+            out.append(token)
+        else:
+            out.append(_CSS_SPACE.sub(" ", token))
+    # Strings are single tokens, so tightening around punctuation never reaches inside one.
+    return _CSS_TIGHT.sub(lambda m: m.group(1) or m.group(2), "".join(out)).replace(";}", "}").strip()
+
+
+def _regex_allowed(out):
+    """Whether a ``/`` after ``out`` starts a regex literal rather than a division."""
+    tail = "".join(out[-12:]).rstrip()
+    if not tail or tail[-1] in _JS_REGEX_AFTER:
+        return True
+    word = re.search(r"[A-Za-z_$][\w$]*$", tail)
+    return word is not None and word.group() in _JS_REGEX_KEYWORDS
+
+
+def _skip_quoted(src, i, quote):
+    """Index just past the string starting at ``src[i]``."""
+    i += 1
+    while src[i] != quote:
+        i += 2 if src[i] == "\\" else 1
+    return i + 1
+
+
+def _separator(pending, prev, nxt):
+    """What whitespace ``pending`` (``" "``/``"\\n"``) between ``prev`` and ``nxt`` must stay as."""
+    if not prev:
+        return ""
+    if prev in "+-" and (nxt in "+-" or pending == "\n"):
+        return pending  # ``a - -b``, and ``a++`` ending a statement
+    if pending == "\n" and (prev in ")]}_$'\"`" or prev.isalnum()) and (nxt in "_$'\"`([{+-/!~" or nxt.isalnum()):
+        return pending  # this newline may be ending a statement
+    if prev in _JS_PUNCT or nxt in _JS_PUNCT:
+        return ""
+    return " "
+
+
+def minify_js(src):
+    """Drop comments and collapse whitespace; newlines that may end a statement are kept."""
+    out, i, n = [], 0, len(src)
+    pending = ""  # whitespace (or comments) seen since the last token
+    templates = []  # open ``{`` depth inside each ``${`` we are in
+    in_template = False
+
+    def emit(token):
+        nonlocal pending
+        if pending:
+            prev = out[-1][-1] if out else ""
+            out.append(_separator(pending, prev, token[0]))
+            pending = ""
+        out.append(token)
+
+    while i < n:
+        c = src[i]
+        if in_template:
+            j = i
+            while src[j] != "`" and not src.startswith("${", j):
+                j += 2 if src[j] == "\\" else 1
+            if src[j] == "`":
+                out.append(src[i:j + 1])
+                in_template = False
+                i = j + 1
+            else:
+                out.append(src[i:j + 2])
+                templates.append(0)
+                in_template = False
+                i = j + 2
+        elif c in "\"'":
+            j = _skip_quoted(src, i, c)
+            emit(src[i:j])
+            i = j
+        elif c == "`":
+            emit("`")
+            in_template = True
+            i += 1
+        elif c.isspace() or src.startswith("//", i) or src.startswith("/*", i):
+            if c.isspace():
+                j = i
+                while j < n and src[j].isspace():
+                    j += 1
+            elif c == "/" and src[i + 1] == "/":
+                j = src.find("\n", i)
+                j = n if j < 0 else j
+            else:
+                j = src.index("*/", i + 2) + 2
+            if "\n" in src[i:j] or pending == "\n":
+                pending = "\n"
+            else:
+                pending = " "
+            i = j
+        elif c == "/" and _regex_allowed(out):
+            j, in_class = i + 1, False
+            while in_class or src[j] != "/":
+                if src[j] == "\\":
+                    j += 1
+                elif src[j] == "[":
+                    in_class = True
+                elif src[j] == "]":
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and src[j].isalpha():
+                j += 1
+            emit(src[i:j])
+            i = j
+        else:
+            if c == "{" and templates:
+                templates[-1] += 1
+            elif c == "}" and templates:
+                if templates[-1] == 0:
+                    templates.pop()
+                    in_template = True
+                else:
+                    templates[-1] -= 1
+            emit(c)
+            i += 1
+    return "".join(out)
+
+
+def minify_html(html):
+    """Strip comments and collapse whitespace outside ``<pre>``/``<textarea>``."""
+    html = _HTML_COMMENT.sub("", html)
+    parts = _RAW_TAGS.split(html)
+    out = []
+    for n, part in enumerate(parts):
+        if n % 3 == 1:
+            out.append(part)
+        elif n % 3 == 0:
+            out.append(re.sub(r"\s*\n\s*", "\n", re.sub(r"[ \t]+", " ", part)))
+    return "".join(out).strip()
+
+
+# ==========================================
+# BUILD
+# ==========================================
+def _asset(body, mimetype, cache_control):
+    etag = hashlib.sha1(body).hexdigest()
+    packed = gzip.compress(body, GZIP_LEVEL, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+    if packed is not None and len(packed) >= len(body):
+        packed = None
+    return Asset(body, packed, etag, mimetype, cache_control)
+
+
+def _early_hints(html):
+    """Open the font hosts early, load fonts without blocking render and defer CDN scripts."""
+    hints = "".join(
+        f'<link rel="preconnect" href="{host}"{" crossorigin" if "gstatic" in host else ""}/>' for host in FONT_HOSTS
+    )
+    html = _FONT_LINK.sub(
+        lambda m: f'{hints}<link href="{m.group(1)}" rel="stylesheet" media="print" onload="this.media=\'all\'"/>'
+                  f'<noscript><link href="{m.group(1)}" rel="stylesheet"/></noscript>',
+        html,
+    )
+    return _CDN_SCRIPT.sub(r'<script src="\1" defer></script>', html)
+
+
+def build_page(html, name):
+    """``(page_html, {url: Asset})``: ``html`` with its inline blocks moved into hashed assets."""
+    assets = {}
+
+    def extract(match):
+        tag, body = match.groups()
+        if tag == "style":
+            code, ext, mimetype = minify_css(body), "css", "text/css"
+        else:
+            code, ext, mimetype = minify_js(body), "js", "text/javascript"
+        data = code.encode("utf-8")
+        url = f"{ASSET_PREFIX}{name}.{hashlib.sha1(data).hexdigest()[:12]}.{ext}"
+        assets[url] = _asset(data, mimetype, IMMUTABLE)
+        if tag == "style":
+            return f'<link rel="stylesheet" href="{url}"/>'
+        # Deferred scripts run in document order, after the deferred CDN scripts before them.
+        return f'<script src="{url}" defer></script>'
+
+    page = minify_html(_INLINE_BLOCK.sub(extract, _early_hints(html)))
+    return page, assets
+
+
+def build_site(pages=SITE_PAGES, root=ROOT):
+    """``{url: Asset}`` for every page in ``pages`` (``{url: file}``) and its assets."""
+    site = {}
+    for url, filename in pages.items():
+        with open(os.path.join(root, filename), encoding="utf-8") as f:
+            html = f.read()
+        name = re.sub(r"[^a-z0-9]+", "-", os.path.splitext(filename)[0].lower()).strip("-")
+        page, assets = build_page(html, name)
+        site.update(assets)
+        site[url] = _asset(page.encode("utf-8"), "text/html", REVALIDATE)
+    return site
+
+
+def write_site(site, out_dir):
+    """Write every file (``index.html`` for page URLs) with a ``.gz`` sibling and a manifest."""
+    manifest = {}
+    for url, asset in site.items():
+        path = url.strip("/") or "index"
+        if asset.mimetype == "text/html":
+            path += ".html"
+        target = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(asset.body)
+        if asset.gzip is not None:
+            with open(target + ".gz", "wb") as f:
+                f.write(asset.gzip)
+        manifest[url] = {"file": path, "etag": asset.etag, "bytes": len(asset.body),
+                         "gzip_bytes": len(asset.gzip) if asset.gzip else None}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+_site = None
+_site_lock = threading.Lock()
+
+
+def get_site():
+    """The built site, once per process."""
+    global _site
+    if _site is None:
+        with _site_lock:
+            if _site is None:
+                _site = build_site()
+    return _site
+
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "build", "site")
+    for url, entry in write_site(build_site(), out).items():
+        print(f"{url:<40} {entry['bytes']:>8,} B  gzip {entry['gzip_bytes'] or 0:>7,} B  -> {entry['file']}")
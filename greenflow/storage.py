@@ -0,0 +1,731 @@
+"""Process-wide SQLite storage for users, gardens, garden history and chat.
+
+One :class:`Storage` is shared by every Streamlit session in the process.
+Connections come from a small pool so concurrent script threads never share
+a cursor; the database runs in WAL mode so readers are not blocked by the
+occasional write.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+
+from greenflow import metrics
+from greenflow.auth import hash_password
+from greenflow.garden import DEFAULT_DAYS_TO_HARVEST, SECONDS_PER_DAY, GardenArrays
+from greenflow.gardenlog import HARVEST, PLANT, REMOVE, STAGE, STAGES, Event, GardenState, GrowthPoint, Yield
+from greenflow.harvest import HarvestCalendar
+
+DEFAULT_DB_PATH = os.environ.get("GREENFLOW_DB", "greenflow.db")
+DEFAULT_POOL_SIZE = 8
+CHAT_CAP = 500  # turns kept on disk per user
+PREFERENCE_DEFAULTS = {"weekly_tips": True, "sms_water_alerts": False}
+
+DEMO_EMAIL = "demo@greenflow.com"
+DEMO_PASSWORD = "password123"
+DEMO_GARDEN = [("cherry_tomatoes", 45), ("lettuce", 10), ("basil", 20)]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    password TEXT NOT NULL,
+    subscription INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS plants (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    type TEXT NOT NULL,
+    planted_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plants_by_user ON plants(user_id);
+CREATE TABLE IF NOT EXISTS plant_types (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS garden_events (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    seq INTEGER NOT NULL,
+    at INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    plant_id INTEGER NOT NULL,
+    type_id INTEGER REFERENCES plant_types(id),
+    value INTEGER,
+    PRIMARY KEY (user_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS garden_log_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO garden_log_version (id, version) VALUES (1, 0);
+CREATE TABLE IF NOT EXISTS garden_snapshots (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id),
+    seq INTEGER NOT NULL,
+    state BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chat_by_user ON chat_messages(user_id, id);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    items TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_by_user ON orders(user_id, id);
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    day INTEGER NOT NULL,
+    slot INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    UNIQUE (user_id, day, slot)
+);
+CREATE INDEX IF NOT EXISTS bookings_by_slot ON bookings(day, slot);
+CREATE TABLE IF NOT EXISTS preferences (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (user_id, name)
+);
+CREATE TABLE IF NOT EXISTS digests_sent (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    week INTEGER NOT NULL,
+    sent_at INTEGER NOT NULL,
+    PRIMARY KEY (user_id, week)
+) WITHOUT ROWID;
+"""
+
+_USER_COLUMNS = "id, email, name, password, subscription, created_at"
+
+
+_ORDER_COLUMNS = "id, idempotency_key, user_id, items, total, status, created_at"
+
+
+def _order_row(row):
+    if row is None:
+        return None
+    return {
+        "id": row[0], "key": row[1], "user_id": row[2], "items": json.loads(row[3]),
+        "total": row[4], "status": row[5], "created_at": row[6],
+    }
+
+
+def _user_row(row):
+    if row is None:
+        return None
+    return {
+        "id": row[0], "email": row[1], "name": row[2], "password": row[3],
+        "subscription": bool(row[4]), "created_at": row[5],
+    }
+
+
+def _last_seq(conn, user_id):
+    """The seq of ``user_id``'s latest garden event, 0 if none."""
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM garden_events WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+
+def _log_version(conn):
+    """Bumped by every garden write, in any process."""
+    return conn.execute("SELECT version FROM garden_log_version").fetchone()[0]
+
+
+def _opted_in(name, column="id", param="?"):
+    """SQL condition on users' ``column`` for having preference ``name`` on; the name is bound as ``param``."""
+    if PREFERENCE_DEFAULTS.get(name):
+        return f"{column} NOT IN (SELECT user_id FROM preferences WHERE name = {param} AND value = 0)"
+    return f"{column} IN (SELECT user_id FROM preferences WHERE name = {param} AND value = 1)"
+
+
+class Storage:
+    """Pooled SQLite access plus a per-user cache of garden arrays and a harvest calendar."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, catalog=None, pool_size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self.catalog = catalog
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        self._gardens = {}
+        self._garden_seqs = {}  # user_id -> last garden_events seq the cached garden reflects
+        self._states = {}  # user_id -> GardenState
+        self._harvest = None
+        self._harvest_version = None  # garden_log_version the calendar reflects
+        self._garden_lock = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self._type_ids = dict(conn.execute("SELECT key, id FROM plant_types").fetchall())
+        self._backfill_garden_log()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    # --- Users ---
+    def get_user(self, user_id):
+        with self.connection() as conn:
+            return _user_row(conn.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE id = ?", (user_id,)).fetchone())
+
+    def get_user_by_email(self, email):
+        with self.connection() as conn:
+            return _user_row(conn.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE email = ?", (email,)).fetchone())
+
+    def create_user(self, email, name, password):
+        """Insert a user and return its id, or ``None`` if the email is taken.
+
+        ``password`` is stored as given; callers pass a hash from :mod:`greenflow.auth`.
+        """
+        try:
+            with self.transaction() as conn:
+                cur = conn.execute(
+                    "INSERT INTO users (email, name, password, created_at) VALUES (?, ?, ?, ?)",
+                    (email, name, password, int(time.time())),
+                )
+                return cur.lastrowid
+        except sqlite3.IntegrityError:
+            return None
+
+    def set_password(self, user_id, password):
+        with self.transaction() as conn:
+            conn.execute("UPDATE users SET password = ? WHERE id = ?", (password, user_id))
+
+    def set_subscription(self, user_id, active):
+        with self.transaction() as conn:
+            conn.execute("UPDATE users SET subscription = ? WHERE id = ?", (int(bool(active)), user_id))
+
+    # --- Preferences ---
+    def get_preferences(self, user_id):
+        with self.connection() as conn:
+            rows = conn.execute("SELECT name, value FROM preferences WHERE user_id = ?", (user_id,)).fetchall()
+        return {**PREFERENCE_DEFAULTS, **{name: bool(value) for name, value in rows}}
+
+    def set_preference(self, user_id, name, value):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO preferences (user_id, name, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id, name) DO UPDATE SET value = excluded.value",
+                (user_id, name, int(bool(value))),
+            )
+
+    def users_with_preference(self, name):
+        """Ids of users who have ``name`` switched on (explicitly or by default)."""
+        with self.connection() as conn:
+            rows = conn.execute(f"SELECT id FROM users WHERE {_opted_in(name)} ORDER BY id", (name,)).fetchall()
+        return [row[0] for row in rows]
+
+    def users_opted_in(self, name):
+        """Users with ``name`` switched on, as :func:`get_user` dicts, in one query."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {_USER_COLUMNS} FROM users WHERE {_opted_in(name)} ORDER BY id", (name,)
+            ).fetchall()
+        return [_user_row(row) for row in rows]
+
+    # --- Weekly digests ---
+    def digest_gardens(self, days_to_harvest, now, week, user_ids=None):
+        """``(user, [(type, plants, ready, next_ready_at)])`` per user due ``week``'s digest, streamed from disk.
+
+        Due means opted in to ``weekly_tips`` and not yet marked sent for
+        ``week``; ``user_ids`` narrows that to the given users and skips the
+        sent check. Plants are counted per type in the one query, using
+        ``days_to_harvest`` (type -> days) for the types it knows;
+        ``next_ready_at`` is the soonest harvest still ahead, or ``None``. An
+        empty garden comes back as an empty list.
+        """
+        known = list(days_to_harvest.items()) or [("", DEFAULT_DAYS_TO_HARVEST)]
+        params = {
+            "now": now, "week": week, "pref": "weekly_tips", "default": DEFAULT_DAYS_TO_HARVEST * SECONDS_PER_DAY,
+        }
+        for i, (plant_type, d) in enumerate(known):
+            params[f"t{i}"], params[f"s{i}"] = plant_type, int(d) * SECONDS_PER_DAY
+        days = ", ".join(f"(:t{i}, :s{i})" for i in range(len(known)))
+        if user_ids is None:
+            due = "u.id NOT IN (SELECT user_id FROM digests_sent WHERE week = :week)"
+        else:
+            params.update({f"u{i}": int(user_id) for i, user_id in enumerate(user_ids)})
+            due = f"u.id IN ({', '.join(f':u{i}' for i in range(len(user_ids)))})" if user_ids else "0"
+        ready_at = "p.planted_at + COALESCE(d.seconds, :default)"
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"WITH days (type, seconds) AS (VALUES {days}) "
+                "SELECT u.id, u.email, u.name, u.password, u.subscription, u.created_at, p.type, COUNT(p.id), "
+                f"  SUM({ready_at} <= :now), MIN(CASE WHEN {ready_at} > :now THEN {ready_at} END) "
+                "FROM users u LEFT JOIN plants p ON p.user_id = u.id LEFT JOIN days d ON d.type = p.type "
+                f"WHERE {_opted_in('weekly_tips', column='u.id', param=':pref')} AND {due} "
+                "GROUP BY u.id, p.type ORDER BY u.id, p.type",
+                params,
+            )
+            for _, group in groupby(rows, key=itemgetter(0)):
+                group = list(group)
+                yield _user_row(group[0][:6]), [
+                    (row[6], row[7], row[8] or 0, row[9]) for row in group if row[6] is not None
+                ]
+
+    def mark_digests_sent(self, user_ids, week, sent_at=None):
+        """Record ``week``'s digest as sent to ``user_ids``, so a rerun of the week skips them."""
+        sent_at = int(time.time()) if sent_at is None else int(sent_at)
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO digests_sent (user_id, week, sent_at) VALUES (?, ?, ?)",
+                [(user_id, week, sent_at) for user_id in user_ids],
+            )
+
+    # --- Garden ---
+    def use_catalog(self, catalog):
+        """Switch to a reloaded plant catalog, dropping gardens coded against the old one."""
+        if catalog is not self.catalog:
+            with self._garden_lock:
+                self.catalog = catalog
+                self._gardens.clear()
+                self._garden_seqs.clear()
+                self._harvest = None
+
+    def garden(self, user_id):
+        """The user's :class:`GardenArrays`, kept in sync with this process's writes.
+
+        Other processes write the same database, so each call also checks the
+        user's latest logged seq and reloads the garden if it has moved on.
+        """
+        with self._garden_lock:
+            with self.connection() as conn:
+                seq = _last_seq(conn, user_id)
+            garden = self._gardens.get(user_id)
+            if garden is None or self._garden_seqs.get(user_id) != seq:
+                with self.connection() as conn:
+                    rows = conn.execute(
+                        "SELECT id, type, planted_at FROM plants WHERE user_id = ? ORDER BY id", (user_id,)
+                    ).fetchall()
+                garden = GardenArrays(self.catalog, capacity=max(16, len(rows)))
+                if rows:
+                    plant_ids, types, planted_at = zip(*rows)
+                    garden.add_many(types, planted_at, plant_ids)
+                self._gardens[user_id] = garden
+                self._garden_seqs[user_id] = seq
+            return garden
+
+    def harvest_calendar(self):
+        """The :class:`HarvestCalendar` over every user's plants, kept in sync with this process's writes.
+
+        Each call checks ``garden_log_version``, which every garden write
+        bumps, and rebuilds the calendar if another process has written since.
+        """
+        with self._garden_lock:
+            with self.connection() as conn:
+                version = _log_version(conn)
+                if self._harvest is None or self._harvest_version != version:
+                    rows = conn.execute("SELECT id, user_id, type, planted_at FROM plants").fetchall()
+                    self._harvest = HarvestCalendar(self.catalog)
+                    self._harvest_version = version
+                    if rows:
+                        self._harvest.load(*zip(*rows))
+            return self._harvest
+
+    def add_plants(self, user_id, plant_types, planted_at):
+        """Insert plants for ``user_id``; returns their ids."""
+        self._intern_types(plant_types)
+        with self._garden_lock:
+            with self.transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO plants (user_id, type, planted_at) VALUES (?, ?, ?)",
+                    [(user_id, t, int(p)) for t, p in zip(plant_types, planted_at)],
+                )
+                # BEGIN IMMEDIATE keeps other writers out, so the new rowids are consecutive.
+                last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                plant_ids = list(range(last_id - len(plant_types) + 1, last_id + 1))
+                version, events = self._log_events(conn, user_id, [
+                    (int(p), PLANT, plant_id, t, None) for plant_id, t, p in zip(plant_ids, plant_types, planted_at)
+                ])
+            # Looked up after the commit: a garden dropped meanwhile reloads with these rows.
+            garden = self._gardens.get(user_id)
+            if garden is not None and self._followed(user_id, events):
+                garden.add_many(plant_types, planted_at, plant_ids)
+            if self._calendar_followed(version):
+                self._harvest.add_many(plant_ids, user_id, plant_types, planted_at)
+            self._publish(user_id)
+        metrics.PLANTS_ADDED.inc(len(plant_ids))
+        return plant_ids
+
+    def add_plant(self, user_id, plant_type, planted_at=None):
+        return self.add_plants(user_id, [plant_type], [int(planted_at if planted_at is not None else time.time())])[0]
+
+    def remove_plant(self, user_id, plant_id):
+        """Delete one of ``user_id``'s plants; returns ``False`` if it wasn't theirs."""
+        with self._garden_lock:
+            with self.transaction() as conn:
+                removed = conn.execute(
+                    "DELETE FROM plants WHERE id = ? AND user_id = ?", (plant_id, user_id)
+                ).rowcount
+                if not removed:
+                    return False
+                version, _ = self._log_events(conn, user_id, [(int(time.time()), REMOVE, plant_id, None, None)])
+            self._dropped(user_id, plant_id, version)
+            self._publish(user_id)
+        return True
+
+    def advance_stage(self, user_id, plant_id):
+        """Move a plant to its next growth stage; returns the new stage index, or ``None``
+        if the plant isn't ``user_id``'s or is already at the last stage."""
+        state = self.garden_state(user_id)
+        with self._garden_lock:
+            stage = state.stage(plant_id)
+            if stage is None or stage + 1 >= len(STAGES):
+                return None
+            with self.transaction() as conn:
+                if conn.execute("SELECT 1 FROM plants WHERE id = ? AND user_id = ?", (plant_id, user_id)).fetchone() is None:
+                    return None
+                version, events = self._log_events(conn, user_id, [(int(time.time()), STAGE, plant_id, None, stage + 1)])
+            self._followed(user_id, events)
+            self._calendar_followed(version)
+            self._publish(user_id)
+        return stage + 1
+
+    def harvest_plant(self, user_id, plant_id, grams, final=True):
+        """Record a harvest of ``grams`` from one of ``user_id``'s plants.
+
+        A ``final`` harvest also removes the plant; pass ``final=False`` for
+        crops that keep producing. Returns ``False`` if the plant wasn't theirs.
+        """
+        now = int(time.time())
+        with self._garden_lock:
+            with self.transaction() as conn:
+                row = conn.execute("SELECT type FROM plants WHERE id = ? AND user_id = ?", (plant_id, user_id)).fetchone()
+                if row is None:
+                    return False
+                changes = [(now, HARVEST, plant_id, row[0], int(grams))]
+                if final:
+                    conn.execute("DELETE FROM plants WHERE id = ?", (plant_id,))
+                    changes.append((now, REMOVE, plant_id, None, None))
+                version, events = self._log_events(conn, user_id, changes)
+            if final:
+                self._dropped(user_id, plant_id, version)
+            else:
+                self._followed(user_id, events)
+                self._calendar_followed(version)
+            self._publish(user_id)
+        return True
+
+    def _followed(self, user_id, events):
+        """Whether the cached garden was current right up to ``events``; then it counts as covering them.
+
+        Otherwise another process wrote in between and the garden is dropped
+        to be reloaded. Caller holds the garden lock.
+        """
+        if self._garden_seqs.get(user_id) == events[0].seq - 1:
+            self._garden_seqs[user_id] = events[-1].seq
+            return True
+        self._gardens.pop(user_id, None)
+        self._garden_seqs.pop(user_id, None)
+        return False
+
+    def _calendar_followed(self, version):
+        """Like :meth:`_followed`, for the harvest calendar and the write that set ``version``."""
+        if self._harvest is not None and self._harvest_version == version - 1:
+            self._harvest_version = version
+            return True
+        self._harvest = None
+        return False
+
+    def _dropped(self, user_id, plant_id, version):
+        """Caller holds the garden lock."""
+        self._gardens.pop(user_id, None)  # reloaded in order on next access
+        self._garden_seqs.pop(user_id, None)
+        if self._calendar_followed(version):
+            self._harvest.remove(plant_id)
+
+    # --- Garden history ---
+    def _intern_types(self, plant_types):
+        """Make sure every plant type has a ``plant_types`` id before it is logged."""
+        new = set(plant_types) - self._type_ids.keys()
+        if not new:
+            return
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO plant_types (key) VALUES (?)", [(t,) for t in new])
+            ids = conn.execute(
+                f"SELECT key, id FROM plant_types WHERE key IN ({', '.join('?' * len(new))})", tuple(new)
+            ).fetchall()
+        self._type_ids.update(ids)
+
+    def _type_id(self, conn, plant_type):
+        type_id = self._type_ids.get(plant_type)
+        if type_id is None:  # interned by another process
+            type_id = self._type_ids[plant_type] = conn.execute(
+                "SELECT id FROM plant_types WHERE key = ?", (plant_type,)
+            ).fetchone()[0]
+        return type_id
+
+    def _log_events(self, conn, user_id, changes):
+        """Append ``(at, kind, plant_id, plant_type, value)`` changes inside an open transaction.
+
+        Returns ``(version, events)``: the bumped ``garden_log_version`` and the logged :class:`Event` s.
+        """
+        seq = _last_seq(conn, user_id)
+        events = [Event(seq + n, *change) for n, change in enumerate(changes, 1)]
+        conn.executemany(
+            "INSERT INTO garden_events (user_id, seq, at, kind, plant_id, type_id, value) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (user_id, e.seq, e.at, e.kind, e.plant_id,
+                 None if e.plant_type is None else self._type_id(conn, e.plant_type), e.value)
+                for e in events
+            ],
+        )
+        version = conn.execute("UPDATE garden_log_version SET version = version + 1 RETURNING version").fetchall()[0][0]
+        return version, events
+
+    def _publish(self, user_id):
+        """Bring the cached state, if loaded, up to date after a commit. Caller holds the garden lock."""
+        state = self._states.get(user_id)
+        if state is not None:
+            self._catch_up(user_id, state)
+            self._maybe_snapshot(user_id, state)
+
+    def _catch_up(self, user_id, state):
+        """Fold in every logged event after ``state.seq``.
+
+        Other processes append to the same log, so a state only ever catches
+        up from disk: folding in just this process's events would leave gaps,
+        and a snapshot taken from it would claim a seq it doesn't cover.
+        """
+        for event in self.garden_events(user_id, state.seq):
+            state.apply(event)
+
+    def _maybe_snapshot(self, user_id, state):
+        if not state.snapshot_due():
+            return
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT INTO garden_snapshots (user_id, seq, state) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET seq = excluded.seq, state = excluded.state "
+                "WHERE excluded.seq > garden_snapshots.seq",
+                (user_id, state.seq, state.encode()),
+            )
+        state.snapshot_seq = state.seq
+
+    def garden_events(self, user_id, after_seq=0):
+        """``user_id``'s :class:`Event` log after ``after_seq``, oldest first, streamed from disk."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT e.seq, e.at, e.kind, e.plant_id, t.key, e.value FROM garden_events e "
+                "LEFT JOIN plant_types t ON t.id = e.type_id WHERE e.user_id = ? AND e.seq > ? ORDER BY e.seq",
+                (user_id, after_seq),
+            )
+            for row in rows:
+                yield Event(*row)
+
+    def garden_plants(self, user_id):
+        """``(plant_id, type, planted_at, stage)`` for each of ``user_id``'s plants, streamed from disk."""
+        with self.connection() as conn:
+            # Stages only ever advance, so the highest one logged is the current one.
+            rows = conn.execute(
+                "SELECT p.id, p.type, p.planted_at, COALESCE(s.stage, 0) FROM plants p LEFT JOIN ("
+                "  SELECT plant_id, MAX(value) AS stage FROM garden_events WHERE user_id = ? AND kind = ? GROUP BY plant_id"
+                ") s ON s.plant_id = p.id WHERE p.user_id = ? ORDER BY p.id",
+                (user_id, STAGE, user_id),
+            )
+            yield from rows
+
+    def replay_garden_state(self, user_id, from_snapshot=True):
+        """Rebuild ``user_id``'s :class:`GardenState` from its latest snapshot plus the events after it."""
+        state = GardenState()
+        if from_snapshot:
+            with self.connection() as conn:
+                row = conn.execute("SELECT seq, state FROM garden_snapshots WHERE user_id = ?", (user_id,)).fetchone()
+            if row is not None:
+                state = GardenState.decode(*row)
+        for event in self.garden_events(user_id, state.seq):
+            state.apply(event)
+        return state
+
+    def garden_state(self, user_id):
+        """The user's :class:`GardenState`, replayed once and then caught up with the log on each call."""
+        with self._garden_lock:
+            state = self._states.get(user_id)
+            if state is None:
+                state = self._states[user_id] = self.replay_garden_state(user_id)
+            else:
+                self._catch_up(user_id, state)
+            self._maybe_snapshot(user_id, state)
+            return state
+
+    def growth_history(self, user_id):
+        """:class:`GrowthPoint` per day on which ``user_id``'s plant count changed."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT at / ? AS day, SUM(SUM(CASE kind WHEN ? THEN 1 ELSE -1 END)) OVER (ORDER BY at / ?) "
+                "FROM garden_events WHERE user_id = ? AND kind IN (?, ?) GROUP BY day ORDER BY day",
+                (SECONDS_PER_DAY, PLANT, SECONDS_PER_DAY, user_id, PLANT, REMOVE),
+            ).fetchall()
+        return [GrowthPoint(*row) for row in rows]
+
+    def harvest_yield(self, user_id):
+        """``{plant_type: Yield(harvests, grams)}`` over everything ``user_id`` has harvested."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT t.key, COUNT(*), SUM(e.value) FROM garden_events e JOIN plant_types t ON t.id = e.type_id "
+                "WHERE e.user_id = ? AND e.kind = ? GROUP BY t.key",
+                (user_id, HARVEST),
+            ).fetchall()
+        return {plant_type: Yield(harvests, grams) for plant_type, harvests, grams in rows}
+
+    def _backfill_garden_log(self):
+        """Log a PLANT event for each plant stored before the event log existed."""
+        with self.connection() as conn:
+            if conn.execute("SELECT 1 FROM garden_events LIMIT 1").fetchone() is not None:
+                return
+            rows = conn.execute("SELECT id, user_id, type, planted_at FROM plants ORDER BY user_id, id").fetchall()
+        if not rows:
+            return
+        self._intern_types({row[2] for row in rows})
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM garden_events LIMIT 1").fetchone() is not None:
+                return  # another process got there first
+            for user_id, plants in groupby(rows, key=itemgetter(1)):
+                self._log_events(conn, user_id, [
+                    (planted_at, PLANT, plant_id, plant_type, None) for plant_id, _, plant_type, planted_at in plants
+                ])
+
+    # --- Chat ---
+    def recent_chat(self, user_id, limit, before_id=None):
+        """Up to ``limit`` ``(id, role, content)`` turns before ``before_id``, oldest first."""
+        with self.connection() as conn:
+            if before_id is None:
+                rows = conn.execute(
+                    "SELECT id, role, content FROM chat_messages WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                    (user_id, limit),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT id, role, content FROM chat_messages WHERE user_id = ? AND id < ? "
+                    "ORDER BY id DESC LIMIT ?",
+                    (user_id, before_id, limit),
+                ).fetchall()
+        rows.reverse()
+        return rows
+
+    def append_chat(self, user_id, role, content, cap=CHAT_CAP):
+        """Store a turn, dropping the user's oldest turns beyond ``cap``; returns its id."""
+        with self.transaction() as conn:
+            msg_id = conn.execute(
+                "INSERT INTO chat_messages (user_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, role, content, int(time.time())),
+            ).lastrowid
+            conn.execute(
+                "DELETE FROM chat_messages WHERE user_id = ? AND id <= "
+                "(SELECT id FROM chat_messages WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (user_id, user_id, cap),
+            )
+        return msg_id
+
+    # --- Orders ---
+    def get_order(self, key):
+        with self.connection() as conn:
+            return _order_row(conn.execute(
+                f"SELECT {_ORDER_COLUMNS} FROM orders WHERE idempotency_key = ?", (key,)
+            ).fetchone())
+
+    def insert_orders(self, orders, status="placed"):
+        """Insert orders (with ``key``, ``user_id``, ``items``, ``total``) in one transaction.
+
+        Keys already stored are left alone. Returns ``{key: stored order}``
+        for every key in ``orders``.
+        """
+        now = int(time.time())
+        keys = [o.key for o in orders]
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO orders (idempotency_key, user_id, items, total, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(o.key, o.user_id, json.dumps(o.items), int(o.total), status, now) for o in orders],
+            )
+            rows = conn.execute(
+                f"SELECT {_ORDER_COLUMNS} FROM orders WHERE idempotency_key IN ({', '.join('?' * len(keys))})",
+                keys,
+            ).fetchall()
+        return {row["key"]: row for row in map(_order_row, rows)}
+
+    # --- Bookings ---
+    def booking_counts(self, from_day):
+        """``{(day, slot): bookings}`` for days (ordinals) from ``from_day`` on."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT day, slot, COUNT(*) FROM bookings WHERE day >= ? GROUP BY day, slot", (from_day,)
+            ).fetchall()
+        return {(day, slot): count for day, slot, count in rows}
+
+    def book_slot(self, user_id, day, slot, capacity, name, phone, reason):
+        """Take a seat in ``(day, slot)`` if fewer than ``capacity`` are taken.
+
+        Returns ``(booking_id, seats_taken)``; ``booking_id`` is ``None`` when
+        the slot is full, or the existing id if the user already holds a seat.
+        """
+        with self.transaction() as conn:
+            existing = conn.execute(
+                "SELECT id FROM bookings WHERE user_id = ? AND day = ? AND slot = ?", (user_id, day, slot)
+            ).fetchone()
+            taken = conn.execute(
+                "SELECT COUNT(*) FROM bookings WHERE day = ? AND slot = ?", (day, slot)
+            ).fetchone()[0]
+            if existing is not None:
+                return existing[0], taken
+            if taken >= capacity:
+                return None, taken
+            booking_id = conn.execute(
+                "INSERT INTO bookings (user_id, day, slot, name, phone, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user_id, day, slot, name, phone, reason, int(time.time())),
+            ).lastrowid
+        return booking_id, taken + 1
+
+    # --- Demo data ---
+    def seed_demo(self):
+        """Create the demo account and its starter garden on first run."""
+        if self.get_user_by_email(DEMO_EMAIL) is not None:
+            return
+        user_id = self.create_user(DEMO_EMAIL, "Demo User", hash_password(DEMO_PASSWORD))
+        if user_id is None:  # another thread won the race
+            return
+        now = int(time.time())
+        self.add_plants(user_id, [t for t, _ in DEMO_GARDEN], [now - days * 86400 for _, days in DEMO_GARDEN])
@@ -0,0 +1,210 @@
+"""Columnar sensor telemetry.
+
+Every garden owns one NumPy ring buffer: an int64 timestamp column plus one
+float64 column per sensor. Feeders push readings in batches and the dashboard
+asks for the latest row and its delta, both O(1) regardless of history size.
+Listeners (the alert engine) see each live batch right after it is stored.
+"""
+import threading
+import time
+
+import numpy as np
+
+from greenflow.timeseries import MAX_CHART_POINTS, RollupSet, lttb
+
+SENSORS = ("temperature", "humidity", "ph", "tds", "water_level")
+SENSOR_INDEX = {name: i for i, name in enumerate(SENSORS)}
+
+DEFAULT_CAPACITY = 4096
+
+
+class SensorRing:
+    """Fixed-capacity ring of ``(timestamp, reading per sensor)`` rows."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, n_sensors=len(SENSORS)):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((capacity, n_sensors), np.nan, dtype=np.float64)
+        self.count = 0  # rows ever written; the head is count % capacity
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, ts, values):
+        """Append a batch of rows. ``values`` has shape ``(len(ts), n_sensors)``."""
+        ts = np.asarray(ts, dtype=np.int64).reshape(-1)
+        values = np.asarray(values, dtype=np.float64).reshape(len(ts), -1)
+        total = len(ts)
+        if total == 0:
+            return
+        skipped = max(0, total - self.capacity)
+        if skipped:
+            ts, values = ts[skipped:], values[skipped:]
+        n = len(ts)
+
+        with self._lock:
+            start = (self.count + skipped) % self.capacity
+            first = min(n, self.capacity - start)
+            self.ts[start:start + first] = ts[:first]
+            self.values[start:start + first] = values[:first]
+            if first < n:
+                self.ts[:n - first] = ts[first:]
+                self.values[:n - first] = values[first:]
+            self.count += total
+
+    def latest(self, lag=1):
+        """Return ``(ts, values, deltas)`` for the newest row, or ``None``.
+
+        ``deltas`` compare against the row ``lag`` samples back (or the oldest
+        retained row if the buffer is shorter than that).
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            head = (self.count - 1) % self.capacity
+            back = min(lag, len(self) - 1)
+            prev = (self.count - 1 - back) % self.capacity
+            current = self.values[head].copy()
+            deltas = current - self.values[prev]
+            return int(self.ts[head]), current, deltas
+
+    def window(self, last=None):
+        """Copy the newest ``last`` rows (default: all retained) oldest first."""
+        with self._lock:
+            n = len(self) if last is None else min(last, len(self))
+            end = self.count % self.capacity
+            idx = (np.arange(end - n, end)) % self.capacity
+            return self.ts[idx].copy(), self.values[idx].copy()
+
+
+class TelemetryStore:
+    """Process-wide map of garden id -> :class:`SensorRing` plus its rollups."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._rings = {}
+        self._rollups = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def ring(self, garden_id):
+        ring = self._rings.get(garden_id)
+        if ring is None:
+            with self._lock:
+                ring = self._rings.setdefault(garden_id, SensorRing(self.capacity))
+                self._rollups.setdefault(garden_id, RollupSet(len(SENSORS)))
+        return ring
+
+    def gardens(self):
+        return list(self._rings)
+
+    def append(self, garden_id, ts, values):
+        ring = self.ring(garden_id)
+        ring.append(ts, values)
+        self._rollups[garden_id].update(ts, values)
+
+    def subscribe(self, listener):
+        """Call ``listener(batches)`` after every :meth:`append_many`."""
+        self._listeners.append(listener)
+
+    def append_many(self, batches):
+        """Apply ``{garden_id: (ts, values)}`` as produced by a feeder tick."""
+        for garden_id, (ts, values) in batches.items():
+            self.append(garden_id, ts, values)
+        for listener in self._listeners:
+            listener(batches)
+
+    def latest(self, garden_id, lag=1):
+        ring = self._rings.get(garden_id)
+        return ring.latest(lag) if ring is not None else None
+
+    def history(self, garden_id, sensor, since, until=None, max_points=MAX_CHART_POINTS):
+        """Chart-ready ``(ts, values)`` for one sensor, at most ``max_points`` long.
+
+        Served from the raw ring while it still covers ``since``, otherwise
+        from the finest rollup that does (bucket means), then LTTB-downsampled.
+        """
+        ring = self._rings.get(garden_id)
+        if ring is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        col = SENSOR_INDEX[sensor]
+        ts, values = ring.window()
+        if len(ts) and ts[0] <= since:
+            mask = ts >= since if until is None else (ts >= since) & (ts < until)
+            ts, values = ts[mask], values[mask, col]
+        else:
+            ts, _, _, values = self._rollups[garden_id].pick(since).series(col, since, until)
+        keep = lttb(ts, values, max_points)
+        return ts[keep], values[keep]
+
+
+# ==========================================
+# LOCAL FEEDER
+# ==========================================
+# Baseline and per-sample jitter for each sensor, in SENSORS order.
+_BASELINE = np.array([24.0, 65.0, 6.2, 850.0, 45.0])
+_JITTER = np.array([0.05, 0.2, 0.01, 2.0, 0.05])
+_BOUNDS = (np.array([15.0, 30.0, 4.5, 300.0, 0.0]), np.array([35.0, 95.0, 8.0, 1600.0, 100.0]))
+
+
+class SimulatedFeeder:
+    """Background thread standing in for the tower gateways.
+
+    Every ``interval`` seconds it emits ``batch`` random-walk samples per
+    garden and hands them to the store as one batched append. ``backfill``
+    fabricates per-minute history so charts have something to show.
+    """
+
+    def __init__(self, store, garden_ids, interval=2.0, batch=1, seed=None):
+        self.store = store
+        self.garden_ids = list(garden_ids)
+        self.interval = interval
+        self.batch = batch
+        self._rng = np.random.default_rng(seed)
+        self._state = {g: _BASELINE.copy() for g in self.garden_ids}
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add_garden(self, garden_id):
+        if garden_id not in self._state:
+            self._state[garden_id] = _BASELINE.copy()
+            self.garden_ids.append(garden_id)
+
+    def tick(self, now=None):
+        now = int(now if now is not None else time.time())
+        step = max(1, int(self.interval / self.batch))
+        ts = now - step * np.arange(self.batch - 1, -1, -1, dtype=np.int64)
+        batches = {}
+        for garden_id in list(self.garden_ids):
+            walk = self._rng.normal(0.0, _JITTER, size=(self.batch, len(SENSORS)))
+            rows = np.clip(self._state[garden_id] + np.cumsum(walk, axis=0), *_BOUNDS)
+            self._state[garden_id] = rows[-1]
+            batches[garden_id] = (ts, rows)
+        self.store.append_many(batches)
+
+    def backfill(self, days, step=60, now=None):
+        now = int(now if now is not None else time.time())
+        ts = np.arange(now - days * 86400, now - self.interval, step, dtype=np.int64)
+        daily = np.sin(2 * np.pi * (ts % 86400) / 86400.0)[:, None]
+        for garden_id in list(self.garden_ids):
+            noise = self._rng.normal(0.0, _JITTER * 3, size=(len(ts), len(SENSORS)))
+            rows = np.clip(_BASELINE + daily * _JITTER * 20 + noise, *_BOUNDS)
+            self.store.append(garden_id, ts, rows)
+            self._state[garden_id] = rows[-1]
+        return self
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self.tick()  # so the first render already has a reading
+        self._thread = threading.Thread(target=self._run, name="greenflow-feeder", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.tick()
@@ -0,0 +1,157 @@
+"""Multi-resolution rollups and chart downsampling for sensor history.
+
+Rollups are rings of fixed-width buckets (minute/hour/day) holding
+min/max/sum/count per sensor. They are folded in batch by batch with
+``reduceat`` so ingest cost is proportional to the batch, never to history.
+``lttb`` then trims whatever range is requested to a browser-friendly size.
+"""
+import threading
+
+import numpy as np
+
+# name -> (bucket width in seconds, buckets retained)
+RESOLUTIONS = {
+    "minute": (60, 60 * 24 * 14),
+    "hour": (3600, 24 * 400),
+    "day": (86400, 365 * 10),
+}
+
+MAX_CHART_POINTS = 1500
+
+
+class Rollup:
+    """Ring of ``width``-second buckets with min/max/sum/count per sensor."""
+
+    def __init__(self, width, capacity, n_sensors):
+        self.width = width
+        self.capacity = capacity
+        self.bucket = np.zeros(capacity, dtype=np.int64)  # bucket start // width
+        self.min = np.full((capacity, n_sensors), np.nan)
+        self.max = np.full((capacity, n_sensors), np.nan)
+        self.sum = np.zeros((capacity, n_sensors))
+        self.n = np.zeros(capacity, dtype=np.int64)
+        self.count = 0  # buckets ever opened; the open bucket is count - 1
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def update(self, ts, values):
+        """Fold a time-ordered batch into the buckets.
+
+        Rows older than the currently open bucket are dropped: feeders emit in
+        time order and we do not reopen closed buckets.
+        """
+        ids = np.asarray(ts, dtype=np.int64) // self.width
+        values = np.asarray(values, dtype=np.float64).reshape(len(ids), -1)
+        if len(ids) == 0:
+            return
+
+        with self._lock:
+            if self.count:
+                head = (self.count - 1) % self.capacity
+                keep = ids >= self.bucket[head]
+                if not keep.all():
+                    ids, values = ids[keep], values[keep]
+                    if len(ids) == 0:
+                        return
+
+            starts = np.r_[0, np.flatnonzero(np.diff(ids)) + 1]
+            b_ids = ids[starts]
+            b_min = np.minimum.reduceat(values, starts, axis=0)
+            b_max = np.maximum.reduceat(values, starts, axis=0)
+            b_sum = np.add.reduceat(values, starts, axis=0)
+            b_n = np.diff(np.r_[starts, len(ids)])
+
+            if self.count and b_ids[0] == self.bucket[head]:
+                np.fmin(self.min[head], b_min[0], out=self.min[head])
+                np.fmax(self.max[head], b_max[0], out=self.max[head])
+                self.sum[head] += b_sum[0]
+                self.n[head] += b_n[0]
+                b_ids, b_min, b_max, b_sum, b_n = b_ids[1:], b_min[1:], b_max[1:], b_sum[1:], b_n[1:]
+
+            if len(b_ids) > self.capacity:
+                cut = len(b_ids) - self.capacity
+                self.count += cut
+                b_ids, b_min, b_max, b_sum, b_n = b_ids[cut:], b_min[cut:], b_max[cut:], b_sum[cut:], b_n[cut:]
+            if len(b_ids):
+                slots = (self.count + np.arange(len(b_ids))) % self.capacity
+                self.bucket[slots] = b_ids
+                self.min[slots] = b_min
+                self.max[slots] = b_max
+                self.sum[slots] = b_sum
+                self.n[slots] = b_n
+                self.count += len(b_ids)
+
+    def oldest(self):
+        """Start timestamp of the oldest retained bucket, or ``None``."""
+        if not self.count:
+            return None
+        return int(self.bucket[self.count % self.capacity if self.count > self.capacity else 0]) * self.width
+
+    def series(self, sensor, since=None, until=None):
+        """Return ``(ts, min, max, mean)`` for buckets starting in ``[since, until)``."""
+        with self._lock:
+            n = len(self)
+            idx = (np.arange(self.count - n, self.count)) % self.capacity
+            starts = self.bucket[idx] * self.width
+            lo = 0 if since is None else np.searchsorted(starts, since, side="left")
+            hi = n if until is None else np.searchsorted(starts, until, side="left")
+            idx = idx[lo:hi]
+            counts = self.n[idx]
+            mean = self.sum[idx, sensor] / np.maximum(counts, 1)
+            return starts[lo:hi].copy(), self.min[idx, sensor].copy(), self.max[idx, sensor].copy(), mean
+
+
+class RollupSet:
+    """The minute/hour/day rollups for one garden."""
+
+    def __init__(self, n_sensors, resolutions=RESOLUTIONS):
+        self.levels = {
+            name: Rollup(width, capacity, n_sensors)
+            for name, (width, capacity) in resolutions.items()
+        }
+
+    def update(self, ts, values):
+        for rollup in self.levels.values():
+            rollup.update(ts, values)
+
+    def pick(self, since):
+        """Finest level whose retention still reaches back to ``since``."""
+        for rollup in self.levels.values():
+            oldest = rollup.oldest()
+            if oldest is not None and oldest <= since:
+                return rollup
+        return list(self.levels.values())[-1]
+
+
+def lttb(x, y, threshold=MAX_CHART_POINTS):
+    """Largest-triangle-three-buckets downsampling.
+
+    Keeps the first and last points and, from each of ``threshold - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Mean of each bucket, used as the third vertex for the bucket before it.
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / np.diff(edges)
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / np.diff(edges)
+    avg_x = np.r_[avg_x[1:], x[-1]]
+    avg_y = np.r_[avg_y[1:], y[-1]]
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
@@ -0,0 +1,53 @@
+"""Page modules. Each is imported the first time its page is opened.
+
+app2's console has its own overview, store and settings layouts
+(``console_*``) over the same catalogs, storage and helpers.
+"""
+import importlib
+
+import streamlit as st
+
+from greenflow import metrics
+
+PAGES = {
+    "Login": "login",
+    "Dashboard": "dashboard",
+    "My Garden": "my_garden",
+    "Store": "store",
+    "AI Expert": "ai_expert",
+    "Consultation": "consultation",
+    "Settings": "settings",
+}
+CONSOLE_PAGES = {
+    **PAGES,
+    "System Overview": "console_overview",
+    "Store": "console_store",
+    "Settings": "console_settings",
+}
+
+
+def render(page, pages=PAGES):
+    module = importlib.import_module(f"{__name__}.{pages[page]}")
+    with metrics.timer(metrics.PAGE_SECONDS, page=page):
+        module.render()
+
+
+def rerun(source, scope="app"):
+    """``st.rerun``, counted by ``source`` so rerun cascades show up in the metrics."""
+    metrics.RERUNS.inc(source=source, scope=scope)
+    st.rerun(scope=scope)
+
+
+def time_series_chart(times, values, y_title, x_title="Time", step=False, zero=True):
+    """Vega-Lite line chart of ``values`` against epoch-second ``times``, for ``st.vega_lite_chart``.
+
+    A plain spec because ``st.line_chart`` would rebuild an Altair chart on every rerun.
+    """
+    return {
+        "data": {"values": [{"time": t * 1000, "value": v} for t, v in zip(times, values)]},
+        "mark": {"type": "line", "interpolate": "step-after"} if step else "line",
+        "encoding": {
+            "x": {"field": "time", "type": "temporal", "title": x_title},
+            "y": {"field": "value", "type": "quantitative", "title": y_title, "scale": {"zero": zero}},
+        },
+    }
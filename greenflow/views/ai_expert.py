@@ -0,0 +1,67 @@
+import math
+import uuid
+
+import streamlit as st
+
+from greenflow.chat_history import ChatHistory, stream_chunks
+from greenflow.core import get_bot_response, get_chat_limiter, get_storage
+from greenflow.metrics import CHAT_RATE_LIMITED, STEP_SECONDS, timed
+from greenflow.storage import DEMO_EMAIL
+
+CHAT_GREETING = "Hi! Ask me anything about your hydroponic setup."
+
+
+def session_history(user_id):
+    history = st.session_state.get("chat_history")
+    if history is None or history.user_id != user_id:
+        history = st.session_state.chat_history = ChatHistory(get_storage(), user_id)
+    return history
+
+
+def limit_key(user):
+    """Rate-limit bucket: the user, or this session for the demo account every app2 visitor shares."""
+    if user["email"] != DEMO_EMAIL:
+        return user["id"]
+    if "chat_session" not in st.session_state:
+        st.session_state.chat_session = uuid.uuid4().hex
+    return (user["id"], st.session_state.chat_session)
+
+
+# Sending a message reruns only this panel, not the whole page.
+@st.fragment
+@timed(STEP_SECONDS, step="chat_panel")
+def chat_panel(user):
+    history = session_history(user["id"])
+
+    # Older turns are fetched from disk only when asked for
+    if not history.exhausted and st.button("Load older messages"):
+        history.load_older()
+    if history.exhausted:
+        with st.chat_message("assistant"):
+            st.markdown(CHAT_GREETING)
+
+    # Display chat history (bounded window)
+    for _, role, content in history:
+        with st.chat_message(role):
+            st.markdown(content)
+
+    # Chat input
+    prompt = st.chat_input("Ask about pH, lighting, pests, or watering...")
+    if prompt and (wait := get_chat_limiter().take(limit_key(user))):
+        CHAT_RATE_LIMITED.inc()
+        st.warning(f"You're sending messages quickly. Please wait {math.ceil(wait)} s and try again.")
+    elif prompt:
+        # User message
+        history.append("user", prompt)
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        # Bot response, streamed as it is produced
+        with st.chat_message("assistant"):
+            response_text = st.write_stream(stream_chunks(get_bot_response(prompt)))
+        history.append("assistant", response_text)
+
+
+def render():
+    st.title("🤖 GreenFlow Assistant")
+    chat_panel(st.session_state.current_user)
@@ -0,0 +1,39 @@
+import streamlit as st
+
+from greenflow.core import DEMO_GARDEN
+from greenflow.metrics import STEP_SECONDS, timed
+from greenflow.views.dashboard import (
+    CHART_RANGES, SENSOR_LABELS, TILE_REFRESH, alert_panel, sensor_chart, sensor_metrics,
+)
+
+HUB_SENSORS = ["temperature", "humidity", "ph", "tds"]
+
+
+# The bordered tiles refresh on their own timer, like the dashboard's.
+@st.fragment(run_every=TILE_REFRESH)
+@timed(STEP_SECONDS, step="hub_tiles")
+def hub_tiles(garden_id):
+    metrics = sensor_metrics(garden_id)
+    for col, name in zip(st.columns(len(HUB_SENSORS)), HUB_SENSORS):
+        with col:
+            with st.container(border=True):
+                st.metric(SENSOR_LABELS[name], *metrics[name])
+
+
+def render():
+    st.markdown('<p style="color:#4CAF50; font-weight:700; letter-spacing:2px; margin-bottom:0;">SYSTEM ACTIVE</p>', unsafe_allow_html=True)
+    st.markdown('# SYSTEM OVERVIEW', unsafe_allow_html=True)
+
+    st.markdown("### 🧠 GreenFlow Intelligence Hub")
+    hub_tiles(DEMO_GARDEN)
+
+    st.markdown("### 🔔 Live Intelligence Alerts")
+    alert_panel(DEMO_GARDEN)
+
+    st.markdown("### 📈 Growth Analytics")
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1:
+        chart_sensor = st.selectbox("Sensor", list(SENSOR_LABELS), format_func=SENSOR_LABELS.get)
+    with chart_col2:
+        chart_range = st.select_slider("Range", list(CHART_RANGES), value="24 hours")
+    st.vega_lite_chart(sensor_chart(DEMO_GARDEN, chart_sensor, chart_range), width="stretch")
@@ -0,0 +1,23 @@
+import streamlit as st
+
+from greenflow.views import rerun
+from greenflow.views.settings import preferences
+
+
+def render():
+    user = st.session_state.current_user
+    st.markdown("<h1>⚙️ Account Settings</h1>", unsafe_allow_html=True)
+
+    with st.container(border=True):
+        st.markdown("### 👤 User Profile")
+        st.text_input("Display Name", value=user['name'])
+        st.text_input("Email Address", value=user['email'])
+
+        st.markdown("### 🔔 Preferences")
+        preferences(user['id'])
+
+    st.markdown("---")
+
+    if st.button("Reset Application Data", width="stretch"):
+        st.session_state.clear()
+        rerun("reset_demo")
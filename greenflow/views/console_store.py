@@ -0,0 +1,20 @@
+import streamlit as st
+
+from greenflow.catalog import get_catalog
+from greenflow.views.store import order_panel, place_order
+
+
+def render():
+    st.markdown("<h1>🛒 Subscription Kits</h1>", unsafe_allow_html=True)
+    cols = st.columns(3)
+    for idx, (key, pkg) in enumerate(get_catalog().packages.items()):
+        with cols[idx]:
+            with st.container(border=True):
+                st.header(pkg['name'])
+                st.subheader(f"₹{pkg['price']:,}")
+                st.write(pkg['desc'])
+                st.write(f"**Contains:** {pkg['plants_count']} plants")
+                description = f"the {pkg['name']}"
+                if not order_panel(key, description) and st.button("Purchase Now", key=f"btn_{key}", width="stretch"):
+                    place_order(key, {key: 1}, pkg['price'])
+                    order_panel(key, description)
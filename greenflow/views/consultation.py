@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+import streamlit as st
+
+from greenflow.bookings import BOOKING_HORIZON_DAYS, SLOTS, SlotFull
+from greenflow.core import get_scheduler
+
+
+def render():
+    st.title("📞 Book an Expert")
+    st.write("Need hands-on help? Schedule a visit.")
+
+    scheduler = get_scheduler()
+    today = date.today()
+    c_date = st.date_input("Preferred Date", min_value=today, max_value=today + timedelta(days=BOOKING_HORIZON_DAYS))
+    c_slot = st.selectbox("Time Slot", range(len(SLOTS)), format_func=SLOTS.__getitem__)
+    st.caption(" · ".join(f"{time}: {scheduler.remaining(c_date, s)} of {scheduler.capacity} free"
+                          for s, time in enumerate(SLOTS)))
+
+    with st.form("consultation_form"):
+        c_name = st.text_input("Name", value=st.session_state.current_user['name'])
+        c_phone = st.text_input("Phone Number")
+        c_reason = st.text_area("What do you need help with?")
+
+        if st.form_submit_button("Book Appointment"):
+            if not c_name.strip() or not c_phone.strip():
+                st.error("Please enter your name and phone number.")
+                return
+            try:
+                booking = scheduler.book(
+                    st.session_state.current_user['id'], c_date, c_slot, c_name.strip(), c_phone.strip(), c_reason
+                )
+            except SlotFull as full:
+                day, slot = full.next_available
+                st.warning(f"That slot is fully booked. Next available: {day:%a %d %b} at {SLOTS[slot]}.")
+                return
+            st.success(f"Booking Confirmed for {booking.day:%a %d %b} at {booking.slot}! Our team will contact you within 24 hours.")
+            st.info(f"Ref ID: {booking.reference}")
@@ -0,0 +1,88 @@
+import time
+
+import streamlit as st
+
+from greenflow.core import DEMO_GARDEN, get_alerts, get_telemetry
+from greenflow.metrics import STEP_SECONDS, timed
+from greenflow.telemetry import SENSOR_INDEX
+from greenflow.views import time_series_chart
+
+DELTA_LAG = 30  # samples; about a minute at the feeder's 2s interval
+SENSOR_FORMATS = {
+    "temperature": ("{:.1f}°C", "{:+.1f}°C"),
+    "humidity": ("{:.0f}%", "{:+.0f}%"),
+    "ph": ("{:.1f}", "{:+.2f}"),
+    "tds": ("{:.0f} ppm", "{:+.0f} ppm"),
+    "water_level": ("{:.0f}%", "{:+.1f}%"),
+}
+SENSOR_LABELS = {
+    "temperature": "Temperature", "humidity": "Humidity", "ph": "Water pH", "tds": "TDS / EC",
+    "water_level": "Tank Level",
+}
+TILE_REFRESH = "5s"
+CHART_RANGES = {"6 hours": 6 * 3600, "24 hours": 86400, "7 days": 7 * 86400, "30 days": 30 * 86400, "90 days": 90 * 86400}
+
+
+def sensor_metrics(garden_id):
+    snapshot = get_telemetry().latest(garden_id, lag=DELTA_LAG)
+    if snapshot is None:
+        return {name: ("—", None) for name in SENSOR_FORMATS}
+    _, values, deltas = snapshot
+    metrics = {}
+    for name, (value_fmt, delta_fmt) in SENSOR_FORMATS.items():
+        i = SENSOR_INDEX[name]
+        metrics[name] = (value_fmt.format(values[i]), delta_fmt.format(deltas[i]))
+    return metrics
+
+
+def sensor_chart(garden_id, sensor, range_label):
+    ts, values = get_telemetry().history(garden_id, sensor, time.time() - CHART_RANGES[range_label])
+    return time_series_chart(ts.tolist(), values.tolist(), SENSOR_LABELS[sensor], zero=False)
+
+
+# Re-executes on its own timer; the rest of the page is untouched.
+@st.fragment(run_every=TILE_REFRESH)
+@timed(STEP_SECONDS, step="sensor_tiles")
+def sensor_tiles(garden_id):
+    metrics = sensor_metrics(garden_id)
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Temperature", *metrics["temperature"])
+    with col2:
+        st.metric("Humidity", *metrics["humidity"])
+    with col3:
+        st.metric("Water pH", *metrics["ph"])
+    with col4:
+        st.metric("TDS / EC", *metrics["tds"])
+    with col5:
+        st.metric("Tank Level", *metrics["water_level"])
+
+
+@st.fragment(run_every=TILE_REFRESH)
+@timed(STEP_SECONDS, step="alert_panel")
+def alert_panel(garden_id):
+    alerts = get_alerts().active(garden_id)
+    if not alerts:
+        st.success("✅ All readings are within range.")
+    for alert in alerts:
+        show = st.error if alert.severity == "error" else st.warning
+        show(f"⚠️ {alert.message}")
+
+
+def render():
+    st.title("📊 System Overview")
+    
+    # Live Sensor Data
+    sensor_tiles(DEMO_GARDEN)
+
+    st.markdown("### 🔔 Alerts")
+    alert_panel(DEMO_GARDEN)
+    
+    st.markdown("### 📈 Growth Trends")
+    # Downsampled sensor history (never more than ~1.5k points)
+    chart_col1, chart_col2 = st.columns(2)
+    with chart_col1:
+        chart_sensor = st.selectbox("Sensor", list(SENSOR_LABELS), format_func=SENSOR_LABELS.get)
+    with chart_col2:
+        chart_range = st.select_slider("Range", list(CHART_RANGES), value="24 hours")
+    st.vega_lite_chart(sensor_chart(DEMO_GARDEN, chart_sensor, chart_range), width="stretch")
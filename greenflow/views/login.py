@@ -0,0 +1,61 @@
+import streamlit as st
+
+from greenflow.auth import AuthBusy
+from greenflow.core import get_authenticator
+from greenflow.views import rerun
+
+
+def login_user(email, password):
+    try:
+        token = get_authenticator().login(email, password)
+    except AuthBusy:
+        st.error("We're handling a lot of logins right now. Please try again in a moment.")
+        return
+    if token:
+        st.session_state.auth_token = token
+        rerun("login")
+    else:
+        st.error("Invalid email or password")
+
+
+def register_user(email, name, password):
+    try:
+        user_id = get_authenticator().register(email, name, password)
+    except ValueError:
+        st.error("Please enter a valid email address.")
+        return
+    except AuthBusy:
+        st.error("We're handling a lot of sign-ups right now. Please try again in a moment.")
+        return
+    if user_id is None:
+        st.error("User already exists!")
+    else:
+        st.success("Account created! Please log in.")
+
+
+def render():
+    st.title("Welcome to GreenFlow Hydroponics")
+    st.subheader("Smart Farming for Urban Spaces")
+    
+    tab1, tab2 = st.tabs(["Login", "Register"])
+    
+    with tab1:
+        with st.form("login_form"):
+            email = st.text_input("Email")
+            password = st.text_input("Password", type="password")
+            submitted = st.form_submit_button("Login")
+            if submitted:
+                login_user(email, password)
+        st.info("Demo Account: demo@greenflow.com / password123")
+
+    with tab2:
+        with st.form("register_form"):
+            new_name = st.text_input("Full Name")
+            new_email = st.text_input("Email")
+            new_pass = st.text_input("Password", type="password")
+            reg_submitted = st.form_submit_button("Register")
+            if reg_submitted:
+                if new_name and new_email and new_pass:
+                    register_user(new_email, new_name, new_pass)
+                else:
+                    st.warning("All fields are required.")
@@ -0,0 +1,176 @@
+import codecs
+import functools
+
+import numpy as np
+import streamlit as st
+
+from greenflow.bulk import MIMETYPES, detect_format, export_history, export_plants, import_plants
+from greenflow.catalog import get_catalog
+from greenflow.core import get_storage
+from greenflow.garden import SECONDS_PER_DAY, paginate
+from greenflow.gardenlog import STAGES
+from greenflow.metrics import STEP_SECONDS, timed
+from greenflow.reservoirs import plan_reservoirs
+from greenflow.views import rerun, time_series_chart
+
+GARDEN_PAGE_SIZE = 12
+GARDEN_VIEWS = ["All", "Ready to Harvest", "Growing"]
+
+
+# Filtering, paging and planting rerun only the grid.
+@st.fragment
+@timed(STEP_SECONDS, step="garden_grid")
+def garden_grid(user_id):
+    plants_db = get_catalog().plants
+    storage = get_storage()
+    garden = storage.garden(user_id)
+    state = storage.garden_state(user_id)
+    if not len(garden):
+        st.info("Your garden is empty. Visit the Store to get started!")
+    else:
+        # Calculate progress for every plant in one pass
+        status = garden.status()
+        growing = ~status.ready
+        sum1, sum2, sum3 = st.columns(3)
+        sum1.metric("Plants", len(garden))
+        sum2.metric("Ready to Harvest", int(status.ready.sum()))
+        sum3.metric("Next Harvest", f"{int(status.days_left[growing].min())} days" if growing.any() else "Now")
+
+        # Only the visible page is rendered
+        view = st.radio("Show", GARDEN_VIEWS, horizontal=True)
+        if view == "Ready to Harvest":
+            rows = np.flatnonzero(status.ready)
+        elif view == "Growing":
+            rows = np.flatnonzero(growing)
+        else:
+            rows = np.arange(len(garden))
+        rows, page, page_count = paginate(rows, st.session_state.get("garden_page", 1), GARDEN_PAGE_SIZE)
+        st.session_state.garden_page = page
+
+        grid_cols = st.columns(3)
+        for slot, i in enumerate(rows):
+            plant_info = plants_db.get(garden.plant_type(i), {})
+            plant_id = int(garden.plant_id[i])
+            stage = state.stage(plant_id) or 0
+            days_passed = int(status.days_passed[i])
+            total_days = int(status.total_days[i])
+
+            with grid_cols[slot % 3]:
+                with st.container(border=True):
+                    st.markdown(f"### {plant_info.get('icon', '🌱')} {plant_info.get('name', 'Unknown')}")
+                    st.progress(float(status.progress[i]), text=f"{days_passed}/{total_days} Days")
+                    st.caption(f"Stage: {STAGES[stage].title()}")
+
+                    if status.ready[i]:
+                        st.success("🎉 Ready to Harvest!")
+                        with st.popover("Harvest"):
+                            grams = st.number_input("Yield (g)", min_value=0, step=10, key=f"yield_{plant_id}")
+                            keep = st.checkbox("Keeps producing", key=f"keep_{plant_id}")
+                            if st.button("Record Harvest", key=f"harvest_{plant_id}"):
+                                storage.harvest_plant(user_id, plant_id, grams, final=not keep)
+                                rerun("harvest", scope="fragment")
+                    else:
+                        st.caption(f"Harvest in approx. {int(status.days_left[i])} days")
+                        if stage + 1 < len(STAGES) and st.button(
+                            f"Mark {STAGES[stage + 1].title()}", key=f"stage_{plant_id}"
+                        ):
+                            storage.advance_stage(user_id, plant_id)
+                            rerun("advance_stage", scope="fragment")
+                    
+                    with st.expander("Care Tips"):
+                        st.write(f"**pH Range:** {plant_info.get('ph')}")
+                        st.write(plant_info.get('tips'))
+
+        if page_count > 1:
+            st.number_input("Page", min_value=1, max_value=page_count, key="garden_page")
+
+        # Fewest shared reservoirs whose pH windows suit every plant in them
+        reservoirs = plan_reservoirs(garden.type_code[:len(garden)], garden.catalog)
+        with st.expander(f"💧 Reservoir Plan ({len(reservoirs)} reservoir{'s' if len(reservoirs) > 1 else ''})"):
+            for n, reservoir in enumerate(reservoirs, 1):
+                counts = np.bincount(garden.type_code[reservoir.rows], minlength=len(garden.catalog.keys))
+                members = ", ".join(
+                    f"{counts[code]} × {plants_db.get(garden.catalog.keys[code], {}).get('name', 'Unknown')}"
+                    for code in reservoir.type_codes
+                )
+                if np.isnan(reservoir.ph_low):
+                    st.write(f"**Reservoir {n}** · no pH range on file · {members}")
+                else:
+                    target = (reservoir.ph_low + reservoir.ph_high) / 2
+                    st.write(f"**Reservoir {n}** · pH {reservoir.ph_low:.1f}–{reservoir.ph_high:.1f} "
+                             f"(target {target:.1f}) · {members}")
+
+        # Add new plant interface
+        st.markdown("---")
+        st.subheader("Add New Plant")
+        with st.form("add_plant"):
+            new_plant_type = st.selectbox("Select Plant Type", list(plants_db.keys()), format_func=lambda x: plants_db[x]['name'])
+            if st.form_submit_button("Plant Seed"):
+                storage.add_plant(user_id, new_plant_type)
+                # A toast outlives the rerun, so there's no need to pause for the message.
+                st.toast(f"Added {plants_db[new_plant_type]['name']} to your garden!")
+                rerun("plant_seed", scope="fragment")
+
+    bulk_transfer(user_id)
+    garden_history(user_id)
+
+
+def _export_text(export, user_id, fmt):
+    return "".join(export(get_storage(), user_id, fmt))
+
+
+def bulk_transfer(user_id):
+    """Import a whole farm from CSV/JSON lines, and download the garden or its history."""
+    with st.expander("📦 Bulk Import / Export"):
+        report = st.session_state.pop("bulk_report", None)
+        if report is not None:
+            st.success(f"Imported {report.plants:,} plants from {report.rows:,} rows "
+                       f"in {report.seconds:.1f} s ({report.rows_per_second:,.0f} rows/s).")
+            if report.rejected:
+                st.warning(f"Skipped {report.rejected:,} rows:\n" + "\n".join(
+                    f"- line {line}: {message}" for line, message in report.errors
+                ))
+        st.caption("CSV with a `type` column (plant name or key) and optional `planted_at` "
+                   "(date or epoch seconds) and `quantity` columns, or the same fields as JSON lines.")
+        upload = st.file_uploader("Garden file", type=["csv", "jsonl", "ndjson"], key="bulk_upload")
+        if upload is not None and st.button("Import Plants"):
+            try:
+                st.session_state.bulk_report = import_plants(
+                    get_storage(), user_id, codecs.iterdecode(upload, "utf-8-sig"), detect_format(upload.name)
+                )
+            except (UnicodeDecodeError, ValueError) as exc:
+                st.error(f"Couldn't read {upload.name}: {exc}")
+            else:
+                rerun("bulk_import", scope="fragment")
+
+        fmt = st.radio("Download as", ["csv", "jsonl"], horizontal=True, format_func=str.upper, key="bulk_format")
+        col1, col2 = st.columns(2)
+        # Built only when clicked, off the script thread.
+        col1.download_button("Download Plants", functools.partial(_export_text, export_plants, user_id, fmt),
+                             file_name=f"garden.{fmt}", mime=MIMETYPES[fmt], on_click="ignore")
+        col2.download_button("Download History", functools.partial(_export_text, export_history, user_id, fmt),
+                             file_name=f"garden-history.{fmt}", mime=MIMETYPES[fmt], on_click="ignore")
+
+
+@timed(STEP_SECONDS, step="garden_history")
+def garden_history(user_id):
+    storage = get_storage()
+    growth = storage.growth_history(user_id)
+    if not growth:
+        return
+    with st.expander("📈 Garden History"):
+        st.vega_lite_chart(time_series_chart([point.day * SECONDS_PER_DAY for point in growth],
+                                             [point.plants for point in growth], "Plants", x_title="Date", step=True),
+                           width="stretch")
+        harvested = storage.harvest_yield(user_id)
+        if not harvested:
+            st.caption("No harvests recorded yet.")
+        plants_db = get_catalog().plants
+        for plant_type, totals in sorted(harvested.items()):
+            name = plants_db.get(plant_type, {}).get("name", plant_type)
+            st.write(f"**{name}:** {totals.grams:,} g from {totals.harvests} harvest{'s' if totals.harvests > 1 else ''}")
+
+
+def render():
+    st.title("🌱 My Garden Status")
+    garden_grid(st.session_state.current_user['id'])
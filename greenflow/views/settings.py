@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import streamlit as st
+
+from greenflow.core import get_storage
+from greenflow.notify import preview_digest
+from greenflow.views import rerun
+
+PREFERENCE_LABELS = {
+    "weekly_tips": "Receive weekly plant care tips via email",
+    "sms_water_alerts": "Enable SMS alerts for water levels",
+}
+
+
+# Toggling a preference reruns only these checkboxes.
+@st.fragment
+def preferences(user_id):
+    storage = get_storage()
+    saved = storage.get_preferences(user_id)
+    for name, label in PREFERENCE_LABELS.items():
+        if st.checkbox(label, value=saved[name]) != saved[name]:
+            storage.set_preference(user_id, name, not saved[name])
+    digest = preview_digest(storage, user_id)
+    if digest is not None:
+        with st.expander("Preview this week's care tips email"):
+            st.markdown(f"**{digest.subject}**")
+            st.text(digest.body)
+
+
+def render():
+    user = st.session_state.current_user
+    st.title("⚙️ Account Settings")
+    st.write(f"**Email:** {user.get('email', 'N/A')}")
+    st.write(f"**Member Since:** {datetime.fromtimestamp(user['created_at']).strftime('%B %Y')}")
+    
+    preferences(user['id'])
+    
+    if st.button("Clear App Data (Reset Demo)"):
+        st.session_state.clear()
+        rerun("reset_demo")
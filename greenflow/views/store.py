@@ -0,0 +1,139 @@
+import math
+import uuid
+
+import streamlit as st
+
+from greenflow.catalog import get_catalog
+from greenflow.core import get_orders
+from greenflow.metrics import STEP_SECONDS, timed
+from greenflow.orders import FAILED, PENDING
+from greenflow.planner import MAX_MIX_PLANTS
+from greenflow.views import rerun
+
+ORDER_REFRESH = "2s"
+
+
+# ==========================================
+# ORDERS
+# ==========================================
+def checkout_key(slot):
+    """Idempotency key for this session's current purchase from ``slot``.
+
+    It stays the same across reruns and repeated clicks, and only changes
+    when the user asks to buy again.
+    """
+    keys = st.session_state.setdefault("checkout_keys", {})
+    if slot not in keys:
+        keys[slot] = uuid.uuid4().hex
+    return keys[slot]
+
+
+def place_order(slot, items, total):
+    order = get_orders().submit(checkout_key(slot), st.session_state.current_user['id'], items, total)
+    st.session_state.setdefault("placed_orders", {})[slot] = order.key
+    return order
+
+
+def buy_again(slot):
+    st.session_state.get("checkout_keys", {}).pop(slot, None)
+    st.session_state.get("placed_orders", {}).pop(slot, None)
+
+
+def show_order(slot, key, description):
+    order = get_orders().status(key)
+    if order is None or order.status == PENDING:
+        st.info("⏳ Order received, confirming…")
+    elif order.status == FAILED:
+        st.error("We couldn't place this order.")
+        if st.button("Try again", key=f"retry_{slot}"):
+            place_order(slot, order.items, order.total)
+            rerun("retry_order")
+    else:
+        st.success(f"Thank you! Order #{order.id}: {description} will be shipped to your address.")
+        if st.button("Buy another", key=f"again_{slot}"):
+            buy_again(slot)
+            rerun("buy_again")
+
+
+# Only the status line reruns; the pending variant polls the status cache.
+order_status = st.fragment(show_order)
+pending_order_status = st.fragment(run_every=ORDER_REFRESH)(show_order)
+
+
+def order_panel(slot, description):
+    """Status of the session's order from ``slot``; ``False`` if there is none yet."""
+    key = st.session_state.get("placed_orders", {}).get(slot)
+    if key is None:
+        return False
+    order = get_orders().status(key)
+    panel = pending_order_status if order is None or order.status == PENDING else order_status
+    panel(slot, key, description)
+    return True
+
+
+# ==========================================
+# PAGE
+# ==========================================
+def render():
+    st.title("🛒 Hydroponic Kits")
+    st.write("Choose a package to start your sustainable farming journey.")
+
+    cols = st.columns(3)
+    for idx, (key, pkg) in enumerate(get_catalog().packages.items()):
+        with cols[idx]:
+            with st.container(border=True):
+                st.header(pkg['name'])
+                st.subheader(f"₹{pkg['price']:,}")
+                st.write(f"**Plants:** {pkg['plants_count']}")
+                st.write(f"**Area:** {pkg['area']}")
+                st.write(pkg['desc'])
+                description = f"the {pkg['name']}"
+                if not order_panel(key, description) and st.button(f"Buy {pkg['name']}", key=key):
+                    place_order(key, {key: 1}, pkg['price'])
+                    st.balloons()
+                    order_panel(key, description)
+
+    st.markdown("---")
+    st.subheader("🧮 Plan My System")
+    st.write("Tell us what you want to grow and we'll suggest a low-cost setup that fits.")
+    package_planner()
+
+
+# Editing the mix reruns only the planner.
+@st.fragment
+@timed(STEP_SECONDS, step="package_planner")
+def package_planner():
+    catalog = get_catalog()
+    with st.form("package_planner"):
+        cols = st.columns(len(catalog.plants))
+        mix = {}
+        for col, (key, plant) in zip(cols, catalog.plants.items()):
+            with col:
+                mix[key] = st.number_input(f"{plant.get('icon', '🌱')} {plant['name']}", min_value=0,
+                                           max_value=MAX_MIX_PLANTS, step=1, key=f"mix_{key}")
+        if st.form_submit_button("Get Quote"):
+            st.session_state.quote_mix = {k: v for k, v in mix.items() if v}
+            buy_again("plan")  # a new quote is a new purchase
+    mix = st.session_state.get("quote_mix")
+    if mix is None:
+        return
+    if not mix:
+        st.info("Add at least one plant to get a quote.")
+        return
+
+    try:
+        quote = catalog.planner.quote(mix)
+    except ValueError as exc:
+        st.error(str(exc).capitalize() + ".")
+        return
+    st.metric("Total", f"₹{quote.total:,}")
+    st.write(" + ".join(f"{count} × {catalog.packages[key]['name']}" for key, count in quote.packages.items()))
+    for n, system in enumerate(quote.systems, 1):
+        plants = ", ".join(f"{count} × {catalog.plants[t]['name']}" for t, count in system.plants.items())
+        ph = "any pH" if math.isnan(system.ph_low) else f"pH {system.ph_low:.1f}–{system.ph_high:.1f}"
+        st.caption(f"System {n}: {catalog.packages[system.package]['name']} at {ph} · {plants}")
+
+    if not order_panel("plan", "your setup") and st.button("Order This Setup"):
+        place_order("plan", quote.packages, quote.total)
+        st.balloons()
+        order_panel("plan", "your setup")